@@ -0,0 +1,81 @@
+"""
+Checkpoint write/read latency per conversation turn for each checkpointer.
+
+Drives a two-node message graph (no LLM) through ``turns`` turns on
+``threads`` threads, timing the graph run (checkpoint writes) and a
+``get_state`` call (checkpoint read) per turn.
+
+    python -m benchmarks.checkpoint [threads] [turns]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+
+from src.checkpoint import BoundedMemorySaver, SqliteSaver
+
+REPLY = "Here are three SUVs under $30k that fit a family of five. " * 20
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("supervisor", lambda state: {"messages": []})
+    graph.add_node("vehicle_agent", lambda state: {"messages": [AIMessage(REPLY)]})
+    graph.set_entry_point("supervisor")
+    graph.add_edge("supervisor", "vehicle_agent")
+    graph.add_edge("vehicle_agent", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return (
+        f"mean {statistics.fmean(samples) * 1e3:7.3f} ms  "
+        f"p50 {samples[len(samples) // 2] * 1e3:7.3f} ms  "
+        f"p99 {samples[int(len(samples) * 0.99)] * 1e3:7.3f} ms"
+    )
+
+
+async def bench(name, checkpointer, threads, turns):
+    app = build(checkpointer)
+    writes, reads = [], []
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"thread-{thread}"}}
+            start = perf_counter()
+            await app.ainvoke({"messages": [HumanMessage(f"turn {turn}")]}, config)
+            writes.append(perf_counter() - start)
+            start = perf_counter()
+            await app.aget_state(config)
+            reads.append(perf_counter() - start)
+    print(f"{name:<10} write/turn  {summary(writes)}")
+    print(f"{name:<10} read/turn   {summary(reads)}")
+
+
+async def main(threads, turns):
+    print(f"{threads} threads x {turns} turns")
+    await bench("memory", MemorySaver(), threads, turns)
+    await bench("bounded", BoundedMemorySaver(), threads, turns)
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = SqliteSaver(os.path.join(tmp, "checkpoints.db"))
+        await bench("sqlite", saver, threads, turns)
+        print(f"sqlite file: {saver.stats()['bytes'] / 1024:.0f} KiB")
+        saver.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(args or [20, 10])))
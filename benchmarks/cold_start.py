@@ -0,0 +1,82 @@
+"""
+Cold-start budget for the agent server: ``import src.main`` time and
+time from process spawn to the first successful ``GET /healthz``.
+
+    python -m benchmarks.cold_start [runs]
+
+Prints JSON so results can be compared across commits.
+"""
+
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_seconds() -> float:
+    """Seconds to import src.main in a fresh interpreter."""
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import time; t = time.perf_counter(); import src.main;"
+            " print(time.perf_counter() - t)",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def healthz_seconds(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 from /healthz."""
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/healthz", timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/healthz not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(runs: int = 3) -> dict:
+    imports = [import_seconds() for _ in range(runs)]
+    healthz = [healthz_seconds() for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_s": {"median": statistics.median(imports), "max": max(imports)},
+        "first_healthz_s": {"median": statistics.median(healthz), "max": max(healthz)},
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(main(int(sys.argv[1]) if len(sys.argv) > 1 else 3), indent=2))
@@ -0,0 +1,39 @@
+"""
+Per-turn crew setup overhead: rebuilding a crew every message vs borrowing
+a warm one from the pool.
+
+    python -m benchmarks.crew_setup [turns]
+"""
+
+import asyncio
+import os
+import sys
+from time import perf_counter
+
+# ChatOpenAI refuses to construct without a key; nothing is sent upstream
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.vehicle import build_crew, crews  # noqa: E402
+
+
+async def main(turns: int):
+    start = perf_counter()
+    for _ in range(turns):
+        build_crew()
+    rebuild = (perf_counter() - start) / turns
+
+    await crews.warm(1)
+    start = perf_counter()
+    for _ in range(turns):
+        crew = await crews.acquire()
+        crews.release(crew)
+    pooled = (perf_counter() - start) / turns
+
+    print(f"turns:             {turns}")
+    print(f"rebuild per turn:  {rebuild * 1e3:.3f} ms")
+    print(f"pooled per turn:   {pooled * 1e3:.3f} ms")
+    print(f"speedup:           {rebuild / pooled:.0f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
@@ -0,0 +1,96 @@
+"""
+Nearest-dealer and radius query latency over synthetic dealers: the grid
+index vs computing the distance to every dealer.
+
+    python -m benchmarks.dealer_index [dealers] [queries]
+"""
+
+import statistics
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from src.dealer_index import DealerIndex
+
+BRANDS = ["Toyota", "Honda", "Ford", "Chevrolet", "BMW", "Mercedes", "Audi", "Tesla",
+          "Mazda", "Hyundai", "Kia", "Subaru", "GMC", "Nissan"]
+SERVICES = ["Sales", "Service", "Financing", "Leasing", "Trade-In", "Warranty"]
+# Metro centres dealers cluster around, as in real inventory
+METROS = [(39.74, -104.99), (40.71, -74.01), (34.05, -118.24), (41.88, -87.63),
+          (29.76, -95.37), (33.45, -112.07), (47.61, -122.33), (25.76, -80.19)]
+
+
+def synthetic(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    clustered = n * 3 // 4
+    centres = np.array(METROS)[rng.integers(len(METROS), size=clustered)]
+    lat = np.concatenate([centres[:, 0] + rng.normal(0, 0.6, clustered),
+                          rng.uniform(25, 49, n - clustered)])
+    lon = np.concatenate([centres[:, 1] + rng.normal(0, 0.6, clustered),
+                          rng.uniform(-124, -67, n - clustered)])
+    return [
+        {
+            "id": f"d{i}",
+            "name": f"Dealer {i}",
+            "latitude": float(lat[i]),
+            "longitude": float(lon[i]),
+            "rating": round(float(rng.uniform(3, 5)), 1),
+            "brands": list(rng.choice(BRANDS, 3, replace=False)),
+            "services": list(rng.choice(SERVICES, 3, replace=False)),
+        }
+        for i in range(n)
+    ]
+
+
+def brute_force(index: DealerIndex, lat, lon, k, brand=None):
+    rows = np.arange(index.size)
+    if brand:
+        rows = rows[index.brands[brand.lower()]]
+    distances = index._distance(lat, lon, rows)
+    return rows[np.argsort(distances)[:k]]
+
+
+def timed(fn, points):
+    samples = []
+    for lat, lon in points:
+        start = perf_counter()
+        fn(lat, lon)
+        samples.append(perf_counter() - start)
+    samples.sort()
+    return (
+        f"mean {statistics.fmean(samples) * 1e3:6.3f} ms  "
+        f"p50 {samples[len(samples) // 2] * 1e3:6.3f} ms  "
+        f"p99 {samples[int(len(samples) * 0.99)] * 1e3:6.3f} ms"
+    )
+
+
+def main(n: int, queries: int):
+    rows = synthetic(n)
+    start = perf_counter()
+    index = DealerIndex(rows)
+    print(f"dealers:     {n}")
+    print(f"index build  {perf_counter() - start:6.2f} s")
+
+    rng = np.random.default_rng(1)
+    points = [(rows[i]["latitude"] + rng.normal(0, 0.05), rows[i]["longitude"] + rng.normal(0, 0.05))
+              for i in rng.integers(n, size=queries)]
+
+    for lat, lon in points[:20]:
+        got = [int(d["id"][1:]) for d in index.nearest(lat, lon, 5, brand="Tesla")]
+        assert got == brute_force(index, lat, lon, 5, brand="Tesla").tolist()
+
+    print(f"nearest 5              {timed(lambda a, o: index.nearest(a, o, 5), points)}")
+    print(f"nearest 5 (Tesla)      {timed(lambda a, o: index.nearest(a, o, 5, brand='Tesla'), points)}")
+    ocean = [(lat - 30, lon - 60) for lat, lon in points]
+    print(f"nearest 5 (far away)   {timed(lambda a, o: index.nearest(a, o, 5), ocean)}")
+    print(f"within 25 km           {timed(lambda a, o: index.within(a, o, 25, limit=10), points)}")
+    print(f"within 25 km (Leasing) {timed(lambda a, o: index.within(a, o, 25, service='Leasing', limit=10), points)}")
+    print(f"full scan nearest 5    {timed(lambda a, o: brute_force(index, a, o, 5), points)}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2_000,
+    )
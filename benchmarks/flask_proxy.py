@@ -0,0 +1,81 @@
+"""
+Flask proxy (blaxel_proxy_server.py) against a local stub upstream: the
+upstream hop as a fresh ``requests.post`` per call (the old proxy) vs the
+pooled session, then requests/sec through the whole proxy in production
+mode, then time to first byte of a streamed answer (20 events, 50 ms
+apart).
+
+    python -m benchmarks.flask_proxy [concurrency] [seconds] [upstream_latency_ms]
+"""
+
+import asyncio
+import statistics
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import httpx
+import requests
+
+from benchmarks.proxy import BODY, load, report
+from benchmarks.stub_upstream import serve
+
+AGENT_PATH = "/amo/agents/template-copilot-kit-py"
+PROXY_PATH = "/api/agent"
+
+
+def load_threads(send, concurrency: int, seconds: float) -> dict:
+    """``load`` for blocking clients: one thread per concurrent caller."""
+    async def run():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(concurrency) as pool:
+            return await load(lambda: loop.run_in_executor(pool, send), concurrency, seconds)
+
+    return asyncio.run(run())
+
+
+def main(concurrency: int, seconds: float, latency_ms: float):
+    with serve("benchmarks.stub_upstream:app", {"STUB_LATENCY_MS": str(latency_ms)}) as upstream:
+        url = upstream + AGENT_PATH
+        report("requests.post per call", load_threads(
+            lambda: requests.post(url, json=BODY, timeout=30), concurrency, seconds
+        ))
+
+        import blaxel_proxy_server
+
+        session = blaxel_proxy_server.create_session()
+        report("pooled session", load_threads(
+            lambda: session.post(url, json=BODY, timeout=30), concurrency, seconds
+        ))
+
+        with serve("blaxel_proxy_server.py", {"BLAXEL_BASE_URL": upstream}) as proxy:
+            async def through_proxy():
+                limits = httpx.Limits(max_connections=concurrency)
+                async with httpx.AsyncClient(base_url=proxy, limits=limits, timeout=30) as client:
+                    return await load(lambda: client.post(PROXY_PATH, json=BODY), concurrency, seconds)
+
+            report("through flask proxy", asyncio.run(through_proxy()))
+
+    stub = {"STUB_CHUNKS": "20", "STUB_CHUNK_DELAY_MS": "50"}
+    with serve("benchmarks.stub_upstream:app", stub) as upstream:
+        with serve("blaxel_proxy_server.py", {"BLAXEL_BASE_URL": upstream}) as proxy:
+            first, last = [], []
+            for _ in range(5):
+                start = perf_counter()
+                with requests.post(proxy + PROXY_PATH, json=BODY, stream=True) as response:
+                    for i, _ in enumerate(response.raw.stream(1024, decode_content=False)):
+                        if i == 0:
+                            first.append(perf_counter() - start)
+                last.append(perf_counter() - start)
+            print(
+                f"{'streamed answer':<28} first byte {statistics.median(first) * 1e3:7.1f} ms  "
+                f"last byte {statistics.median(last) * 1e3:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 5,
+    )
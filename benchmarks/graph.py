@@ -0,0 +1,92 @@
+"""
+Orchestration overhead of the supervisor graph, offline: every model call
+goes to the scripted fake backend (``LLM_BACKEND=fake``), so what is left
+is routing, crew kickoff, event streaming and checkpoint cost.
+
+Runs ``conversations`` threads of ``turns`` turns each, ``concurrency`` at
+a time, with ``token_ms`` of simulated latency per generated token.
+
+    python -m benchmarks.graph [conversations] [concurrency] [turns] [token_ms]
+
+Prints JSON: per-turn latency, turns/sec, crew executor queueing and
+checkpoint size.
+"""
+
+import os
+
+os.environ["LLM_BACKEND"] = "fake"
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import asyncio  # noqa: E402
+import contextlib  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from time import perf_counter  # noqa: E402
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+QUESTIONS = [
+    "Find me a reliable SUV under $30k",
+    "Which dealers near Denver do test drives?",
+    "Compare the RAV4 and the CR-V",
+    "What would I pay monthly over 60 months?",
+]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return round(samples[min(int(q * len(samples)), len(samples) - 1)] * 1e3, 2)
+
+
+async def main(conversations: int, concurrency: int, turns: int, token_ms: float):
+    os.environ["FAKE_LLM_TOKEN_MS"] = str(token_ms)
+    from src import agent as agent_module
+    from src.crew import executor
+
+    # Crews print every step; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = await agent_module.agent()
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def conversation(i):
+            async with semaphore:
+                config = {"configurable": {"thread_id": f"bench-{i}"}}
+                for turn in range(turns):
+                    question = QUESTIONS[(i + turn) % len(QUESTIONS)]
+                    start = perf_counter()
+                    await graph.ainvoke({"messages": [HumanMessage(question)]}, config)
+                    latencies.append(perf_counter() - start)
+
+        # One warm-up turn builds the crews and imports everything lazy
+        await conversation(-1)
+        latencies.clear()
+        start = perf_counter()
+        await asyncio.gather(*(conversation(i) for i in range(conversations)))
+        elapsed = perf_counter() - start
+
+    checkpointer = agent_module.checkpointer
+    print(json.dumps({
+        "config": {"conversations": conversations, "concurrency": concurrency,
+                   "turns": turns, "token_ms": token_ms},
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "turn_latency_ms": {
+            "p50": percentile(latencies, 0.5), "p95": percentile(latencies, 0.95),
+            "max": percentile(latencies, 1),
+        },
+        "crews": executor.stats(),
+        "checkpoints": checkpointer.stats() if hasattr(checkpointer, "stats") else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 3,
+            float(sys.argv[4]) if len(sys.argv) > 4 else 0,
+        )
+    )
@@ -0,0 +1,116 @@
+"""
+Inventory search latency over synthetic listings: the columnar engine vs a
+full-scan boolean mask over the same columns.
+
+    python -m benchmarks.inventory [listings] [queries]
+"""
+
+import statistics
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from src.inventory import Inventory
+
+MAKES = {
+    "Toyota": ["Camry", "Corolla", "RAV4", "Highlander", "Tacoma"],
+    "Honda": ["Civic", "Accord", "CR-V", "Pilot"],
+    "Ford": ["F-150", "Escape", "Explorer", "Mustang"],
+    "Chevrolet": ["Silverado", "Equinox", "Malibu", "Tahoe"],
+    "Tesla": ["Model 3", "Model Y"],
+    "BMW": ["3 Series", "X3", "X5"],
+}
+BODY_TYPES = ["SUV", "Sedan", "Truck", "Coupe", "Minivan"]
+FUEL_TYPES = ["Gasoline", "Hybrid", "Electric", "Diesel"]
+STATUSES = ["available"] * 8 + ["pending", "sold"]
+
+
+def synthetic(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    pairs = [(make, model) for make, models in MAKES.items() for model in models]
+    picks = rng.integers(len(pairs), size=n)
+    price = rng.uniform(8_000, 90_000, n).round(-2)
+    on_sale = rng.random(n) < 0.15
+    return {
+        "id": np.array([f"v{i}" for i in range(n)], dtype=object),
+        "make": np.array([pairs[i][0] for i in picks], dtype=object),
+        "model": np.array([pairs[i][1] for i in picks], dtype=object),
+        "year": rng.integers(2005, 2026, n),
+        "price": price,
+        "sale_price": np.where(on_sale, price * 0.93, np.nan),
+        "is_on_sale": on_sale,
+        "mileage": rng.integers(0, 200_000, n),
+        "body_type": rng.choice(BODY_TYPES, n).astype(object),
+        "fuel_type": rng.choice(FUEL_TYPES, n).astype(object),
+        "status": rng.choice(STATUSES, n).astype(object),
+    }
+
+
+QUERIES = [
+    dict(make="Toyota", body_type="SUV", price_max=30_000),
+    dict(year_min=2020, price_max=25_000, mileage_max=40_000),
+    dict(make="Tesla", model="Model Y", year_min=2022),
+    dict(fuel_type="Hybrid", price_min=20_000, price_max=35_000),
+    dict(body_type="Truck", sort="year", descending=True),
+]
+
+
+def full_scan(columns, effective_price, make=None, model=None, body_type=None,
+              fuel_type=None, year_min=None, year_max=None, price_min=None,
+              price_max=None, mileage_max=None, sort="price", descending=False,
+              limit=10):
+    mask = columns["status"] == "available"
+    for name, value in [("make", make), ("model", model), ("body_type", body_type),
+                        ("fuel_type", fuel_type)]:
+        if value:
+            mask &= columns[name] == value
+    for values, low, high in [(columns["year"], year_min, year_max),
+                              (effective_price, price_min, price_max),
+                              (columns["mileage"], None, mileage_max)]:
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    rows = np.flatnonzero(mask)
+    key = (effective_price if sort == "price" else columns[sort])[rows]
+    return rows[np.argsort(-key if descending else key)[:limit]]
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = perf_counter()
+        fn()
+        samples.append(perf_counter() - start)
+    samples.sort()
+    return statistics.fmean(samples), samples[int(len(samples) * 0.99)]
+
+
+def main(n: int, runs: int):
+    columns = synthetic(n)
+    start = perf_counter()
+    engine = Inventory(columns)
+    print(f"listings:   {n}")
+    print(f"index build {perf_counter() - start:7.2f} s")
+    effective_price = np.where(columns["is_on_sale"], columns["sale_price"], columns["price"])
+
+    for query in QUERIES:
+        result = engine.search(**query)
+        expected = full_scan(columns, effective_price, **query)
+        assert result["total"] >= len(expected)
+        engine_mean, engine_p99 = timed(lambda: engine.search(**query), runs)
+        scan_mean, scan_p99 = timed(lambda: full_scan(columns, effective_price, **query), runs)
+        print(
+            f"{query}\n"
+            f"  matches {result['total']:>8}  "
+            f"engine mean {engine_mean * 1e3:7.3f} ms p99 {engine_p99 * 1e3:7.3f} ms  "
+            f"scan mean {scan_mean * 1e3:7.3f} ms  speedup {scan_mean / engine_mean:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
@@ -0,0 +1,332 @@
+"""
+Load test for the agent server (``src.main:app``) and the production proxy:
+throughput, p50/p95/p99 latency, time to first byte and error rate under
+closed-loop concurrency or open-loop arrivals, with a mix of one-shot and
+multi-turn (thread) conversations. 429s (rate limited) and 503s (shed
+under load) are counted apart from other errors. Prints JSON for regression
+comparison.
+
+    python -m benchmarks.load main --concurrency 32 --duration 10
+    python -m benchmarks.load proxy --rate 200 --mix single=0.7,thread=0.3
+    python -m benchmarks.load http://localhost:8890 --path /proxy/agents/amo/template-copilot-kit-py
+    python -m benchmarks.load proxy --output run.json --baseline main.json
+
+``main`` and ``proxy`` start the app in a uvicorn subprocess. ``main`` runs
+CopilotKit's agent route (``--agent``, the supervisor by default) with every
+model call answered by the scripted fake backend, so the graph, crews and
+streaming are measured without provider latency; ``proxy`` runs in front of
+a local stub upstream. Any URL is load-tested as-is, with CopilotKit bodies
+for ``/agents/execute`` paths and Blaxel's ``{"inputs": ...}`` otherwise.
+Open-loop latency is measured from each request's scheduled start, so a
+stalled server shows up as latency rather than as fewer requests sent. Each
+simulated user sends its own ``X-Forwarded-User`` so per-user rate limits
+apply as they would to real users. With ``--baseline`` the exit status is 1 when a
+metric regressed by more than ``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import uuid
+from contextlib import ExitStack
+from time import perf_counter, sleep
+
+import httpx
+
+from benchmarks.stub_upstream import serve
+
+PROMPTS = [
+    "Find me a reliable SUV under $30k",
+    "Compare the 2022 Honda CR-V and Toyota RAV4",
+    "Which dealers near Denver service Subaru?",
+    "What would the monthly payment be on a $28,000 car over 60 months at 6.9%?",
+    "Show me hybrids with a third row",
+    "Any electric cars with over 250 miles of range on sale?",
+]
+FOLLOW_UPS = ["What about a used one?", "Which has the lowest price?", "Any near me?"]
+
+TARGETS = {
+    "main": {
+        "app": "src.main:app",
+        "path": "/copilotkit/agents/execute",
+        "env": {
+            "LLM_BACKEND": "fake", "LOG_LEVEL": "WARNING",
+            "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true",
+        },
+        # Agents build in the background after the server starts listening
+        "ready": "/copilotkit/info",
+    },
+    "proxy": {"app": "production_proxy:app", "path": "/proxy/agents/amo/template-copilot-kit-py"},
+}
+AGENT = "automotive-supervisor"
+THREAD_HEADER = "X-Blaxel-Thread-Id"
+
+
+def parse_mix(spec: str) -> dict:
+    """``single=0.7,thread=0.3`` -> weights by conversation kind."""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("single", "thread"):
+            raise ValueError(f"unknown conversation kind {kind!r}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def payload(path: str, prompt: str, thread_id: str | None, agent: str = AGENT) -> dict:
+    """CopilotKit's agent execution body for ``/agents/execute``, else Blaxel's."""
+    if not path.rstrip("/").endswith("/agents/execute"):
+        return {"inputs": prompt}
+    return {
+        "name": agent,
+        "threadId": thread_id or uuid.uuid4().hex,
+        "state": {},
+        "config": {},
+        "actions": [],
+        "messages": [{"id": uuid.uuid4().hex, "type": "TextMessage", "role": "user", "content": prompt}],
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.ttfbs = []
+        self.statuses = {}
+        self.errors = 0
+        self.conversations = 0
+        self.dropped = 0
+
+    def record(self, status, latency, ttfb):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+        else:
+            self.latencies.append(latency)
+            self.ttfbs.append(ttfb)
+
+    def summary(self, elapsed: float) -> dict:
+        requests = sum(self.statuses.values())
+        return {
+            "requests": requests,
+            "conversations": self.conversations,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0.0,
+            "rate_limited": self.statuses.get(429, 0),
+            "shed": self.statuses.get(503, 0),
+            "throughput_rps": round((requests - self.errors) / elapsed, 2),
+            "status": {str(k): v for k, v in sorted(self.statuses.items(), key=str)},
+            "latency_ms": distribution(self.latencies),
+            "ttfb_ms": distribution(self.ttfbs),
+        }
+
+
+def distribution(samples) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    samples = sorted(samples)
+
+    def at(q):
+        return round(samples[min(int(q * len(samples)), len(samples) - 1)] * 1e3, 2)
+
+    return {
+        "p50": at(0.5), "p95": at(0.95), "p99": at(0.99),
+        "mean": round(sum(samples) / len(samples) * 1e3, 2), "max": round(samples[-1] * 1e3, 2),
+    }
+
+
+async def send(client, path, body, headers, recorder, scheduled=None):
+    start = scheduled if scheduled is not None else perf_counter()
+    ttfb = None
+    try:
+        async with client.stream("POST", path, json=body, headers=headers) as response:
+            async for _ in response.aiter_raw():
+                if ttfb is None:
+                    ttfb = perf_counter() - start
+            status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    latency = perf_counter() - start
+    recorder.record(status, latency, latency if ttfb is None else ttfb)
+
+
+async def conversation(client, path, kind, turns, user, recorder, rng, scheduled=None, agent=AGENT):
+    recorder.conversations += 1
+    headers = {"X-Forwarded-User": f"load-user-{user}"}
+    thread_id = None
+    if kind == "thread":
+        thread_id = headers[THREAD_HEADER] = uuid.uuid4().hex
+    prompts = [rng.choice(PROMPTS)] + [rng.choice(FOLLOW_UPS) for _ in range(turns - 1)]
+    for turn, prompt in enumerate(prompts if kind == "thread" else prompts[:1]):
+        # Only the first turn was scheduled; later turns follow the answer
+        body = payload(path, prompt, thread_id, agent)
+        await send(client, path, body, headers, recorder, scheduled if turn == 0 else None)
+
+
+async def run(client, path: str, *, concurrency: int = 16, rate: float | None = None,
+              duration: float = 10.0, mix: dict | None = None, turns: int = 3, users: int = 100,
+              max_in_flight: int = 1000, seed: int = 0, agent: str = AGENT) -> dict:
+    """Drive ``client`` for ``duration`` seconds; returns the summary dict.
+
+    Closed loop (``rate`` None): ``concurrency`` users each start a new
+    conversation as soon as the last one ends. Open loop: conversations
+    arrive as a Poisson process at ``rate`` a second regardless of how fast
+    the server answers; arrivals beyond ``max_in_flight`` are dropped.
+    """
+    mix = mix or {"single": 1.0}
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    recorder = Recorder()
+    user_ids = itertools.cycle(range(users))
+    start = perf_counter()
+    deadline = start + duration
+
+    def next_kind():
+        return rng.choices(kinds, weights)[0]
+
+    if rate is None:
+        async def user():
+            while perf_counter() < deadline:
+                await conversation(
+                    client, path, next_kind(), turns, next(user_ids), recorder, rng, agent=agent
+                )
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    else:
+        tasks = set()
+        scheduled = start
+        while True:
+            scheduled += rng.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            if (delay := scheduled - perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= max_in_flight:
+                recorder.dropped += 1
+                continue
+            task = asyncio.create_task(conversation(
+                client, path, next_kind(), turns, next(user_ids), recorder, rng, scheduled, agent
+            ))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    result = recorder.summary(perf_counter() - start)
+    result["config"] = {
+        "path": path, "mode": "closed" if rate is None else "open",
+        "concurrency": concurrency if rate is None else None, "rate": rate,
+        "duration_s": duration, "mix": mix, "turns": turns, "users": users, "agent": agent,
+    }
+    return result
+
+
+# Metrics compared against a baseline, and which direction is worse
+HIGHER_IS_WORSE = [
+    ("latency_ms", "p50"), ("latency_ms", "p95"), ("latency_ms", "p99"),
+    ("ttfb_ms", "p50"), ("ttfb_ms", "p95"),
+]
+
+
+def compare(result: dict, baseline: dict, tolerance: float = 0.1) -> list[str]:
+    """Regressions of ``result`` against ``baseline`` beyond ``tolerance``."""
+    regressions = []
+    before, after = baseline["throughput_rps"], result["throughput_rps"]
+    if before and after < before * (1 - tolerance):
+        regressions.append(f"throughput_rps {before} -> {after}")
+    for group, name in HIGHER_IS_WORSE:
+        before, after = baseline[group][name], result[group][name]
+        if before is not None and after is not None and after > before * (1 + tolerance):
+            regressions.append(f"{group}.{name} {before} -> {after}")
+    # Absolute: a relative bound on a near-zero rate would trip on one error
+    if result["error_rate"] > baseline["error_rate"] + 0.01:
+        regressions.append(f"error_rate {baseline['error_rate']} -> {result['error_rate']}")
+    return regressions
+
+
+def arguments(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("target", help="main, proxy or a base URL")
+    parser.add_argument("--path", help="request path (default: per target)")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop users")
+    parser.add_argument("--rate", type=float, help="open-loop conversations per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default={"single": 1.0}, help="e.g. single=0.7,thread=0.3")
+    parser.add_argument("--turns", type=int, default=3, help="requests per thread conversation")
+    parser.add_argument("--users", type=int, default=100, help="distinct users sent")
+    parser.add_argument("--agent", default=AGENT, help="CopilotKit agent run by /agents/execute")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0, help="proxy target's stub")
+    parser.add_argument("--upstream-chunks", type=int, default=0, help="stub SSE events per answer")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the started app")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON result here")
+    parser.add_argument("--baseline", help="JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def wait_ready(url: str, timeout: float = 300.0):
+    """Poll ``url`` until it answers 200."""
+    deadline = perf_counter() + timeout
+    while True:
+        try:
+            if httpx.post(url, json={}, timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if perf_counter() > deadline:
+            raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+        sleep(0.5)
+
+
+def main(argv=None) -> int:
+    args = arguments(argv)
+    env = dict(item.split("=", 1) for item in args.env)
+    with ExitStack() as stack:
+        if args.target in TARGETS:
+            if args.target == "proxy":
+                upstream = stack.enter_context(serve("benchmarks.stub_upstream:app", {
+                    "STUB_LATENCY_MS": str(args.upstream_latency_ms),
+                    "STUB_CHUNKS": str(args.upstream_chunks),
+                }))
+                env = {"BLAXEL_BASE_URL": upstream, **env}
+            target = TARGETS[args.target]
+            url = stack.enter_context(serve(target["app"], {**target.get("env", {}), **env}))
+            if ready := target.get("ready"):
+                wait_ready(url + ready)
+            path = args.path or target["path"]
+        else:
+            url, path = args.target, args.path or "/"
+
+        async def drive():
+            limits = httpx.Limits(max_connections=args.max_in_flight)
+            async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+                return await run(
+                    client, path, concurrency=args.concurrency, rate=args.rate,
+                    duration=args.duration, mix=args.mix, turns=args.turns, users=args.users,
+                    max_in_flight=args.max_in_flight, seed=args.seed, agent=args.agent,
+                )
+
+        result = asyncio.run(drive())
+    result["config"]["target"] = args.target
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return 1 if result.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Logging cost per request through the server's middleware and error
+handlers: every request logged synchronously (the old access log) vs
+queued to the background JSON writer, and queued with sampled access
+lines and deduplicated errors (the defaults). One request in ten fails
+with a 500 and its traceback.
+
+    python -m benchmarks.logging_overhead [requests] [sink_latency_us]
+
+``sink_latency_us`` makes every write to the log sink take that long, like
+stdout piped to a slow collector. Prints JSON.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import statistics
+import sys
+import time
+from time import perf_counter
+
+import httpx
+from fastapi import FastAPI
+
+from src.server import error
+from src.server.error import ErrorLog, init_error_handlers
+from src.server.logs import setup_logging, stop_logging
+from src.server.metrics import AccessLog, RequestMetrics
+from src.server.middleware import MetricsMiddleware
+
+UNLIMITED = 1e9
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def build_app(access_log: AccessLog):
+    app = FastAPI()
+    init_error_handlers(app)
+    app.add_middleware(MetricsMiddleware, metrics=RequestMetrics(), access_log=access_log)
+
+    @app.get("/ok")
+    async def ok():
+        return {"status": "ok"}
+
+    @app.get("/fail")
+    async def fail():
+        raise RuntimeError("upstream unavailable")
+
+    return app
+
+
+async def drive(app, requests: int) -> list[float]:
+    latencies = []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(requests):
+            start = perf_counter()
+            await client.get("/fail" if i % 10 == 9 else "/ok")
+            latencies.append(perf_counter() - start)
+    return latencies
+
+
+def scenario(name: str, requests: int, sink_latency: float, *, use_queue: bool, log_format: str,
+             sampled: bool) -> dict:
+    sink = SlowSink(sink_latency)
+    setup_logging(sink, log_format, "INFO", use_queue=use_queue)
+    # The benchmark's own client logs every request too
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if sampled:
+        access_log, error_log = AccessLog(), ErrorLog()
+    else:
+        access_log, error_log = AccessLog(UNLIMITED), ErrorLog(window=0, per_minute=UNLIMITED)
+    error.error_log = error_log
+    app = build_app(access_log)
+    try:
+        asyncio.run(drive(app, 50))  # warm-up
+        latencies = asyncio.run(drive(app, requests))
+    finally:
+        flush_start = perf_counter()
+        stop_logging()
+        flush_s = perf_counter() - flush_start
+    latencies.sort()
+    return {
+        "scenario": name,
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+        "p99_us": round(latencies[int(0.99 * len(latencies))] * 1e6, 1),
+        "lines_written": sink.lines,
+        "flush_after_s": round(flush_s, 3),
+    }
+
+
+def main(requests: int = 2000, sink_latency_us: float = 0.0) -> dict:
+    sink_latency = sink_latency_us / 1e6
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    original_error_log = error.error_log
+    try:
+        results = [
+            scenario("sync_every_request", requests, sink_latency,
+                     use_queue=False, log_format="text", sampled=False),
+            scenario("queued_json_every_request", requests, sink_latency,
+                     use_queue=True, log_format="json", sampled=False),
+            scenario("queued_json_sampled", requests, sink_latency,
+                     use_queue=True, log_format="json", sampled=True),
+        ]
+    finally:
+        root.handlers, root.level = saved
+        error.error_log = original_error_log
+    return {"requests": requests, "sink_latency_us": sink_latency_us, "results": results}
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:]]
+    print(json.dumps(main(int(args[0]) if args else 2000, *args[1:]), indent=2))
@@ -0,0 +1,120 @@
+"""
+Proxy throughput against a local stub upstream: a new httpx client per
+request (the old proxy hop) vs the shared pooled client, then requests/sec
+through the whole proxy. Then time to first byte and to the last byte of
+a streamed answer (20 events, 50 ms apart) with the proxy streaming vs
+buffering.
+
+    python -m benchmarks.proxy [concurrency] [seconds] [upstream_latency_ms]
+
+Loopback has no TLS, so real gains against run.blaxel.ai are larger: every
+new client there also pays a TLS handshake.
+"""
+
+import asyncio
+import statistics
+import sys
+from time import perf_counter
+
+import httpx
+
+from benchmarks.stub_upstream import serve
+
+AGENT_PATH = "/amo/agents/template-copilot-kit-py"
+PROXY_PATH = "/proxy/agents/amo/template-copilot-kit-py"
+BODY = {"inputs": "Find me a reliable SUV under $30k"}
+
+
+async def load(send, concurrency: int, seconds: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = perf_counter() + seconds
+
+    async def worker():
+        nonlocal errors
+        while perf_counter() < deadline:
+            start = perf_counter()
+            try:
+                response = await send()
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(perf_counter() - start)
+            errors += not ok
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+        "mean_ms": statistics.fmean(latencies) * 1e3,
+        "errors": errors,
+    }
+
+
+def report(label, result):
+    print(
+        f"{label:<28} {result['rps']:8.0f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+        f"p99 {result['p99_ms']:7.2f} ms  errors {result['errors']}"
+    )
+
+
+async def main(concurrency: int, seconds: float, latency_ms: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    with serve("benchmarks.stub_upstream:app", {"STUB_LATENCY_MS": str(latency_ms)}) as upstream:
+        url = upstream + AGENT_PATH
+
+        async def per_request_client():
+            async with httpx.AsyncClient() as client:
+                return await client.post(url, json=BODY, timeout=30)
+
+        report("client per request", await load(per_request_client, concurrency, seconds))
+
+        async with httpx.AsyncClient(limits=limits) as shared:
+            report(
+                "shared pooled client",
+                await load(lambda: shared.post(url, json=BODY), concurrency, seconds),
+            )
+
+        with serve("production_proxy:app", {"BLAXEL_BASE_URL": upstream}) as proxy:
+            async with httpx.AsyncClient(base_url=proxy, limits=limits, timeout=30) as client:
+                result = await load(lambda: client.post(PROXY_PATH, json=BODY), concurrency, seconds)
+                report("through proxy", result)
+                print(f"proxy pool: {(await client.get('/stats')).json()['pool']}")
+
+        await streamed_answer()
+
+
+async def streamed_answer(runs: int = 5):
+    stub = {"STUB_CHUNKS": "20", "STUB_CHUNK_DELAY_MS": "50"}
+    with serve("benchmarks.stub_upstream:app", stub) as upstream:
+        for mode in ("true", "false"):
+            env = {"BLAXEL_BASE_URL": upstream, "PROXY_STREAMING": mode}
+            with serve("production_proxy:app", env) as proxy:
+                async with httpx.AsyncClient(base_url=proxy, timeout=30) as client:
+                    first, last = [], []
+                    for _ in range(runs):
+                        start = perf_counter()
+                        async with client.stream("POST", PROXY_PATH, json=BODY) as response:
+                            async for _ in response.aiter_raw():
+                                if len(first) < len(last) + 1:
+                                    first.append(perf_counter() - start)
+                        last.append(perf_counter() - start)
+            label = "streaming" if mode == "true" else "buffered"
+            print(
+                f"{label:<28} first byte {statistics.median(first) * 1e3:7.1f} ms  "
+                f"last byte {statistics.median(last) * 1e3:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 5,
+            float(sys.argv[3]) if len(sys.argv) > 3 else 5,
+        )
+    )
@@ -0,0 +1,136 @@
+"""
+Local stand-in for the Blaxel agent endpoint, for proxy benchmarks and
+tests. Answers every POST with a small JSON body after ``latency`` seconds
+(a number, or a callable returning one per request), fails the first
+``fail_first`` requests and a ``error_rate`` share of the rest with 503,
+and with ``chunks`` set streams the answer as that many server-sent events,
+``chunk_delay`` seconds apart.
+
+Tests mount ``StubUpstream`` in-process through ``httpx.ASGITransport``;
+benchmarks run apps with ``serve`` in their own uvicorn process so the
+load generator doesn't share a GIL with them:
+
+    STUB_LATENCY_MS=5 python -m uvicorn benchmarks.stub_upstream:app
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubUpstream:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, chunks: int = 0,
+                 chunk_delay: float = 0.0, seed: int = 0, fail_first: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.bodies = []
+        self._random = random.Random(seed)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.bodies.append(body)
+        try:
+            latency = self.latency() if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+            if self.requests <= self.fail_first or self._random.random() < self.error_rate:
+                await _respond(send, 503, b'{"error": "injected"}')
+            elif self.chunks:
+                await self._stream(send, body)
+            else:
+                await _respond(send, 200, json.dumps({"output": "ok", "echo": len(body)}).encode())
+        finally:
+            self.in_flight -= 1
+
+    async def _stream(self, send, body):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream")],
+        })
+        for i in range(self.chunks):
+            event = f"data: {json.dumps({'chunk': i})}\n\n".encode()
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+            await asyncio.sleep(self.chunk_delay)
+        await send({"type": "http.response.body", "body": b"data: [DONE]\n\n"})
+
+
+async def _respond(send, status, body):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(app: str, env: dict | None = None, port: int | None = None):
+    """Run ASGI app ``module:attr`` in a uvicorn subprocess, or a ``*.py``
+    script that listens on ``$PORT``; yields its URL."""
+    port = port or free_port()
+    if app.endswith(".py"):
+        argv = [sys.executable, app]
+        env = {**(env or {}), "PORT": str(port)}
+    else:
+        argv = [sys.executable, "-m", "uvicorn", app, "--port", str(port),
+                "--log-level", "warning", "--no-access-log"]
+    # Server output goes to stderr, keeping benchmarks' JSON on stdout clean
+    proc = subprocess.Popen(argv, cwd=ROOT, env={**os.environ, **(env or {})}, stdout=2)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(url, timeout=1)
+                break
+            except urllib.error.HTTPError:
+                break  # listening; the path just isn't served
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{app} did not start")
+                time.sleep(0.05)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+app = StubUpstream(
+    latency=float(os.getenv("STUB_LATENCY_MS", "0")) / 1e3,
+    error_rate=float(os.getenv("STUB_ERROR_RATE", "0")),
+    chunks=int(os.getenv("STUB_CHUNKS", "0")),
+    chunk_delay=float(os.getenv("STUB_CHUNK_DELAY_MS", "0")) / 1e3,
+)
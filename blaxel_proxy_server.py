@@ -4,76 +4,99 @@ Blaxel Agent Proxy Server - Solves CORS issues
 This server acts as a proxy to forward requests to Blaxel API
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from requests.adapters import HTTPAdapter
 import requests
+import logging
 import os
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
 # Configuration
-API_KEY = "bl_47yrrlxn6geic2wq9asrv5rapygyycj7"
-BASE_URL = "https://run.blaxel.ai/amo"
+API_KEY = os.getenv("BLAXEL_API_KEY", "bl_47yrrlxn6geic2wq9asrv5rapygyycj7")
+BASE_URL = os.getenv("BLAXEL_BASE_URL", "https://run.blaxel.ai") + "/amo"
 
-@app.route('/')
-def index():
-    """Serve the HTML interface"""
-    return send_file('blaxel-test-interface.html')
+# (connect, read) timeouts in seconds for upstream calls
+TIMEOUT = (
+    float(os.getenv("PROXY_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("PROXY_TIMEOUT", "30")),
+)
+# Upstream connections kept per process; callers beyond it wait for one
+POOL_SIZE = int(os.getenv("PROXY_POOL_SIZE", "32"))
+# Upstream headers passed on; the body is relayed still encoded
+FORWARDED_HEADERS = {"content-type", "content-encoding", "cache-control"}
+
+
+def create_session():
+    """Keep-alive session shared by all request threads (urllib3's pool is
+    thread-safe). Connections open lazily, so forked workers don't share any."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, pool_block=True, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Authorization"] = f"Bearer {API_KEY}"
+    return session
+
+
+session = create_session()
+
+
+def forward(method, endpoint):
+    """Send the browser's request on to Blaxel and stream the answer back"""
+    headers = {"Content-Type": "application/json"}
 
-@app.route('/api/agent', methods=['GET', 'POST'])
-def agent_proxy():
-    """Proxy requests to the Blaxel agent endpoint"""
-    endpoint = f"{BASE_URL}/agents/template-copilot-kit-py"
-    
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
     # Add thread ID if provided
     thread_id = request.headers.get('X-Thread-Id')
     if thread_id:
         headers["X-Blaxel-Thread-Id"] = thread_id
-    
+
     try:
-        if request.method == 'GET':
-            response = requests.get(endpoint, headers=headers)
-        else:
-            response = requests.post(
-                endpoint, 
-                headers=headers, 
-                json=request.get_json()
-            )
-        
-        return jsonify(response.json()), response.status_code
+        upstream = session.request(
+            method,
+            endpoint,
+            headers=headers,
+            data=request.get_data() if method == "POST" else None,
+            timeout=TIMEOUT,
+            stream=True,
+        )
+    except requests.Timeout:
+        return jsonify({"error": "Blaxel API timeout"}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    def body():
+        try:
+            # Raw bytes as they arrive; SSE events reach the browser one by one
+            yield from upstream.raw.stream(8192, decode_content=False)
+        finally:
+            upstream.close()
+
+    response_headers = {
+        name: value for name, value in upstream.headers.items() if name.lower() in FORWARDED_HEADERS
+    }
+    if upstream.headers.get("content-type", "").startswith("text/event-stream"):
+        response_headers["X-Accel-Buffering"] = "no"
+    return Response(stream_with_context(body()), status=upstream.status_code, headers=response_headers)
+
+@app.route('/')
+def index():
+    """Serve the HTML interface"""
+    return send_file('blaxel-test-interface.html')
+
+@app.route('/api/agent', methods=['GET', 'POST'])
+def agent_proxy():
+    """Proxy requests to the Blaxel agent endpoint"""
+    return forward(request.method, f"{BASE_URL}/agents/template-copilot-kit-py")
+
 @app.route('/api/copilotkit', methods=['POST'])
 def copilotkit_proxy():
     """Proxy requests to the CopilotKit endpoint"""
-    endpoint = f"{BASE_URL}/copilotkit"
-    
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    # Add thread ID if provided
-    thread_id = request.headers.get('X-Thread-Id')
-    if thread_id:
-        headers["X-Blaxel-Thread-Id"] = thread_id
-    
-    try:
-        response = requests.post(
-            endpoint, 
-            headers=headers, 
-            json=request.get_json()
-        )
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return forward("POST", f"{BASE_URL}/copilotkit")
 
 @app.route('/test')
 def test():
@@ -87,12 +110,48 @@ def test():
         ]
     })
 
+def serve(host, port):
+    """Production serving: gunicorn threaded workers when installed,
+    otherwise Werkzeug's threaded server without the debugger/reloader"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning("gunicorn is not installed; serving with Werkzeug's threaded server")
+        from werkzeug.serving import run_simple
+        run_simple(host, port, app, threaded=True)
+        return
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": int(os.getenv("WEB_CONCURRENCY", "2")),
+        "worker_class": "gthread",
+        "threads": int(os.getenv("PROXY_THREADS", str(POOL_SIZE))),
+        # Let upstream timeouts answer before gunicorn kills the worker
+        "timeout": int(TIMEOUT[1]) + 10,
+        "keepalive": 5,
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Server().run()
+
 if __name__ == '__main__':
+    host = os.getenv("HOST", "127.0.0.1")
+    port = int(os.getenv("PORT", "5000"))
     print("🚀 Starting Blaxel Proxy Server...")
     print("📡 API Key:", API_KEY[:20] + "...")
-    print("🌐 Access the interface at: http://localhost:5000")
+    print(f"🌐 Access the interface at: http://localhost:{port}")
     print("✅ Proxy endpoints:")
-    print("   - http://localhost:5000/api/agent")
-    print("   - http://localhost:5000/api/copilotkit")
+    print(f"   - http://localhost:{port}/api/agent")
+    print(f"   - http://localhost:{port}/api/copilotkit")
     print("\n⚡ Server running with CORS enabled - no more CORS errors!")
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    if os.getenv("FLASK_DEBUG", "").lower() in ("1", "true"):
+        app.run(debug=True, host=host, port=port)
+    else:
+        serve(host, port)
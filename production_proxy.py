@@ -6,12 +6,19 @@ Handles CORS, authentication, and provides browser-friendly access to Blaxel age
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
 import httpx
 import os
 import json
 import logging
+import math
+import random
+import time
 from datetime import datetime
+from proxy_resilience import AdaptiveLimiter, CircuitBreaker, LatencyWindow, RetryBudget
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,14 +26,181 @@ logger = logging.getLogger(__name__)
 
 # Configuration
 BLAXEL_API_KEY = os.getenv("BLAXEL_API_KEY", "YOUR_API_KEY_HERE")  # Set in environment variables
-BLAXEL_BASE_URL = "https://run.blaxel.ai"
+BLAXEL_BASE_URL = os.getenv("BLAXEL_BASE_URL", "https://run.blaxel.ai")
 WORKSPACE = "amo"
 AGENT = "template-copilot-kit-py"
 
+# Upstream connection pool, shared by every request
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("PROXY_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("PROXY_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("PROXY_KEEPALIVE_EXPIRY", "30")),
+)
+TIMEOUT = httpx.Timeout(
+    float(os.getenv("PROXY_TIMEOUT", "30")),
+    connect=float(os.getenv("PROXY_CONNECT_TIMEOUT", "5")),
+    pool=float(os.getenv("PROXY_POOL_TIMEOUT", "5")),
+)
+
+
+def http2_enabled():
+    """HTTP/2 needs the optional h2 package (pip install 'httpx[http2]')"""
+    if os.getenv("PROXY_HTTP2", "true").lower() != "true":
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("h2 is not installed; upstream connections use HTTP/1.1")
+        return False
+    return True
+
+
+def create_client(**kwargs):
+    """Pooled keep-alive client for Blaxel; extra kwargs are for tests"""
+    return httpx.AsyncClient(
+        base_url=BLAXEL_BASE_URL,
+        headers={"Authorization": f"Bearer {BLAXEL_API_KEY}"},
+        http2=http2_enabled(),
+        limits=POOL_LIMITS,
+        timeout=TIMEOUT,
+        **kwargs,
+    )
+
+
+def pool_stats(client):
+    """Connection counts read from httpx's transport (private, so best effort)"""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    return {
+        "connections": len(connections),
+        "idle": sum(c.is_idle() for c in connections),
+        "http2": sum("HTTP/2" in c.info() for c in connections),
+        "max_connections": POOL_LIMITS.max_connections,
+        "max_keepalive": POOL_LIMITS.max_keepalive_connections,
+    }
+
+
+# Stream upstream responses through as they arrive (false: buffer, then send)
+STREAMING = os.getenv("PROXY_STREAMING", "true").lower() == "true"
+# Upstream headers passed on; the body is relayed still encoded
+FORWARDED_HEADERS = {"content-type", "content-encoding", "cache-control"}
+
+# Share one upstream call among identical stateless requests in flight
+COALESCE = os.getenv("PROXY_COALESCE", "false").lower() == "true"
+# Chunks buffered per joined request before the shared call waits for it
+FLIGHT_BUFFER = int(os.getenv("PROXY_FLIGHT_BUFFER", "16"))
+
+# Failure handling (proxy_resilience.py)
+BREAKER_FAILURES = int(os.getenv("PROXY_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("PROXY_BREAKER_RESET", "30"))
+MAX_RETRIES = int(os.getenv("PROXY_MAX_RETRIES", "2"))
+RETRY_BUDGET = float(os.getenv("PROXY_RETRY_BUDGET", "0.2"))
+RETRY_RESERVE = float(os.getenv("PROXY_RETRY_RESERVE", "10"))
+RETRY_BACKOFF = float(os.getenv("PROXY_RETRY_BACKOFF", "0.05"))
+# Only answers that mean the upstream never ran the request are retried
+RETRY_STATUSES = {502, 503}
+HEDGE = os.getenv("PROXY_HEDGE", "false").lower() == "true"
+HEDGE_MIN_SAMPLES = int(os.getenv("PROXY_HEDGE_MIN_SAMPLES", "20"))
+ADAPTIVE_CONCURRENCY = os.getenv("PROXY_ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+LATENCY_TOLERANCE = float(os.getenv("PROXY_LATENCY_TOLERANCE", "2"))
+# The adaptive limit never drops below this (default: a quarter of the pool)
+MIN_CONCURRENCY = int(os.getenv("PROXY_MIN_CONCURRENCY", "0"))
+# Seconds a request over the limit waits for a slot before a 503
+CONCURRENCY_WAIT = float(os.getenv("PROXY_CONCURRENCY_WAIT", "0.5"))
+
+upstream_stats = {
+    "requests": 0, "errors": 0, "timeouts": 0, "in_flight": 0, "coalesced": 0,
+    "retries": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0,
+}
+
+# Upstream health is probed in the background; /health serves the last result.
+# The agent's own /healthz answers without running the agent.
+HEALTH_PATH = os.getenv("PROXY_HEALTH_PATH", f"/{WORKSPACE}/agents/{AGENT}/healthz")
+HEALTH_INTERVAL = float(os.getenv("PROXY_HEALTH_INTERVAL", "10"))
+HEALTH_TIMEOUT = float(os.getenv("PROXY_HEALTH_TIMEOUT", "5"))
+# A result older than this is reported stale and fails readiness
+HEALTH_STALE_AFTER = float(os.getenv("PROXY_HEALTH_STALE_AFTER", str(3 * HEALTH_INTERVAL)))
+
+upstream_health = {
+    "status": "unknown",
+    "blaxel_status": None,
+    "latency_ms": None,
+    "error": None,
+    "checked_at": None,
+    "consecutive_failures": 0,
+}
+_checked_at = None  # monotonic time of the last probe
+
+
+async def probe(client):
+    """Check the upstream once and record the result in upstream_health"""
+    global _checked_at
+    started = time.monotonic()
+    try:
+        response = await client.get(HEALTH_PATH, timeout=HEALTH_TIMEOUT)
+        healthy = response.status_code == 200
+        upstream_health.update(
+            status="healthy" if healthy else "unhealthy",
+            blaxel_status=response.status_code,
+            error=None if healthy else response.text[:200],
+        )
+    except Exception as e:
+        healthy = False
+        upstream_health.update(status="unhealthy", blaxel_status=None, error=str(e) or type(e).__name__)
+    upstream_health["consecutive_failures"] = 0 if healthy else upstream_health["consecutive_failures"] + 1
+    upstream_health["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    upstream_health["checked_at"] = datetime.now().isoformat()
+    _checked_at = time.monotonic()
+    return healthy
+
+
+async def prober(client):
+    while True:
+        was = upstream_health["status"]
+        await probe(client)
+        if upstream_health["status"] != was:
+            logger.info(f"Blaxel upstream is {upstream_health['status']}")
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+
+def health_snapshot():
+    """The last probe result with its age; ``stale`` once it is too old"""
+    age = None if _checked_at is None else time.monotonic() - _checked_at
+    stale = age is None or age > HEALTH_STALE_AFTER
+    status = upstream_health["status"]
+    if stale and status != "unknown":
+        status = "stale"
+    return {
+        **upstream_health,
+        "status": status,
+        "age_seconds": None if age is None else round(age, 3),
+        "stale": stale,
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.client = create_client()
+    app.state.breakers = {}
+    app.state.latency = {}
+    app.state.retry_budget = RetryBudget(RETRY_BUDGET, RETRY_RESERVE)
+    app.state.limiter = AdaptiveLimiter(
+        initial=POOL_LIMITS.max_connections,
+        minimum=MIN_CONCURRENCY or max(POOL_LIMITS.max_connections // 4, 1),
+        maximum=POOL_LIMITS.max_connections,
+        tolerance=LATENCY_TOLERANCE,
+    )
+    health_task = asyncio.create_task(prober(app.state.client))
+    yield
+    health_task.cancel()
+    await app.state.client.aclose()
+
+
 app = FastAPI(
     title="Blaxel Proxy Server",
     description="Production-ready proxy for Blaxel agents with CORS support",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware for browser access
@@ -48,6 +222,9 @@ async def root():
         "endpoints": {
             "agent": f"/proxy/agents/{WORKSPACE}/{AGENT}",
             "health": "/health",
+            "liveness": "/livez",
+            "readiness": "/readyz",
+            "stats": "/stats",
             "test": "/test"
         },
         "timestamp": datetime.now().isoformat()
@@ -55,32 +232,28 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
-    try:
-        # Test connection to Blaxel
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{BLAXEL_BASE_URL}/{WORKSPACE}/agents/{AGENT}",
-                headers={
-                    "Authorization": f"Bearer {BLAXEL_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={"inputs": "healthcheck"},
-                timeout=10.0
-            )
-            
-        return {
-            "status": "healthy",
-            "blaxel_connection": "ok" if response.status_code == 200 else "error",
-            "blaxel_status": response.status_code,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    """Upstream health from the background prober; never calls Blaxel itself"""
+    snapshot = health_snapshot()
+    return {
+        **snapshot,
+        "blaxel_connection": "ok" if snapshot["status"] == "healthy" else "error",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/livez")
+async def livez():
+    """Liveness: the proxy process is serving requests"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the last upstream probe succeeded and is recent"""
+    snapshot = health_snapshot()
+    ready = snapshot["status"] == "healthy"
+    return JSONResponse(
+        {"status": "ready" if ready else "not ready", "upstream": snapshot},
+        status_code=200 if ready else 503,
+    )
 
 @app.post("/proxy/agents/{workspace}/{agent}")
 async def proxy_to_blaxel(workspace: str, agent: str, request: Request):
@@ -88,11 +261,12 @@ async def proxy_to_blaxel(workspace: str, agent: str, request: Request):
     Proxy requests to Blaxel agents with authentication
     """
     try:
-        # Get request body
-        request_data = await request.json()
+        # Forward the client's bytes as-is; parse only to validate
+        body = await request.body()
+        request_data = json.loads(body)
         
         # Validate request format
-        if "inputs" not in request_data:
+        if not isinstance(request_data, dict) or "inputs" not in request_data:
             raise HTTPException(
                 status_code=400, 
                 detail="Missing 'inputs' field in request body. Use {'inputs': 'your message'}"
@@ -101,34 +275,28 @@ async def proxy_to_blaxel(workspace: str, agent: str, request: Request):
         # Get thread ID from headers if present
         thread_id = request.headers.get("X-Blaxel-Thread-Id")
         
-        # Prepare headers for Blaxel
-        blaxel_headers = {
-            "Authorization": f"Bearer {BLAXEL_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        # Prepare headers for Blaxel (auth is set on the shared client)
+        blaxel_headers = {"Content-Type": "application/json"}
         
         if thread_id:
             blaxel_headers["X-Blaxel-Thread-Id"] = thread_id
         
-        # Make request to Blaxel
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{BLAXEL_BASE_URL}/{workspace}/agents/{agent}",
-                headers=blaxel_headers,
-                json=request_data,
-                timeout=30.0
-            )
-            
-        # Return response
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Blaxel API error: {response.text}"
-            )
+        # Make request to Blaxel over a pooled keep-alive connection
+        state = request.app.state
+        path = f"/{workspace}/agents/{agent}"
+        # Duplicates of a thread request could act twice on its conversation
+        hedge = HEDGE and not thread_id
+        if COALESCE and not thread_id:
+            # Stateless and identical to a request already in flight: share it
+            key = (workspace, agent, hashlib.sha256(body).hexdigest())
+            return await join_flight(key, state, path, blaxel_headers, body, hedge)
+        response = await open_upstream(state, path, blaxel_headers, body, hedge)
+        return await relay(state, response)
             
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
+        upstream_stats["timeouts"] += 1
         raise HTTPException(status_code=504, detail="Blaxel API timeout")
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON in request body")
@@ -136,6 +304,319 @@ async def proxy_to_blaxel(workspace: str, agent: str, request: Request):
         logger.error(f"Proxy error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Proxy server error: {str(e)}")
 
+async def open_upstream(state, path, headers, body, hedge=False):
+    """Send a request to Blaxel and return the response once headers arrive.
+
+    Refused with 503 while the upstream's circuit breaker is open or the
+    adaptive concurrency limit is reached. Connection failures and 502/503
+    answers (the upstream never ran the request) are retried within the
+    retry budget; with ``hedge`` a second copy is sent if the first has no
+    headers after the upstream's p95 latency. Non-200 responses are read,
+    closed and raised as HTTPException; others must be passed to
+    close_upstream.
+    """
+    breaker = state.breakers.setdefault(
+        path, CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_TIMEOUT)
+    )
+    if not breaker.allow():
+        upstream_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Blaxel upstream unavailable (circuit open)",
+            headers={"Retry-After": str(math.ceil(breaker.retry_after()) or 1)},
+        )
+    if ADAPTIVE_CONCURRENCY and not await state.limiter.acquire(CONCURRENCY_WAIT):
+        upstream_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503, detail="Proxy at upstream concurrency limit", headers={"Retry-After": "1"}
+        )
+
+    upstream_stats["requests"] += 1
+    upstream_stats["in_flight"] += 1
+    state.retry_budget.deposit()
+    try:
+        response = await attempt_upstream(state, breaker, path, headers, body, hedge)
+    except BaseException:
+        release_upstream(state)
+        raise
+
+    if response.status_code != 200:
+        upstream_stats["errors"] += 1
+        try:
+            await response.aread()
+        finally:
+            await close_upstream(state, response)
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Blaxel API error: {response.text}"
+        )
+    return response
+
+def release_upstream(state):
+    upstream_stats["in_flight"] -= 1
+    if ADAPTIVE_CONCURRENCY:
+        state.limiter.release()
+
+async def close_upstream(state, response):
+    release_upstream(state)
+    await response.aclose()
+
+async def attempt_upstream(state, breaker, path, headers, body, hedge):
+    """Send with retries; returns the last response or raises the last error"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            if hedge:
+                response = await send_hedged(state, breaker, path, headers, body)
+            else:
+                response = await send_upstream(state, breaker, path, headers, body)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            if attempt == MAX_RETRIES or not can_retry(state, breaker):
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES \
+                    or not can_retry(state, breaker):
+                return response
+            await response.aclose()
+        upstream_stats["retries"] += 1
+        # Jittered exponential backoff
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+
+def can_retry(state, breaker):
+    return state.retry_budget.withdraw() and breaker.allow()
+
+async def send_upstream(state, breaker, path, headers, body):
+    """One upstream call up to its headers, recorded for breaker and limits"""
+    upstream_request = state.client.build_request("POST", path, headers=headers, content=body)
+    started = time.monotonic()
+    try:
+        response = await state.client.send(upstream_request, stream=True)
+    except httpx.PoolTimeout:
+        raise  # our own pool is full; says nothing about the upstream
+    except httpx.TransportError:
+        breaker.record_failure()
+        state.limiter.update(None, failed=True)
+        raise
+    elapsed = time.monotonic() - started
+    failed = response.status_code >= 500
+    if failed:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+        state.latency.setdefault(path, LatencyWindow()).record(elapsed)
+    state.limiter.update(elapsed, failed=failed)
+    return response
+
+async def send_hedged(state, breaker, path, headers, body):
+    """Send; if no headers arrive within the p95 latency, race a second copy.
+
+    The first good response wins and the other call is cancelled. Hedges
+    spend the retry budget, so a slow upstream is not sent double load.
+    """
+    window = state.latency.get(path)
+    delay = window.percentile(95) if window and len(window) >= HEDGE_MIN_SAMPLES else None
+    first = asyncio.create_task(send_upstream(state, breaker, path, headers, body))
+    if delay is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done or not state.retry_budget.withdraw():
+        return await first
+
+    upstream_stats["hedged"] += 1
+    second = asyncio.create_task(send_upstream(state, breaker, path, headers, body))
+    pending = {first, second}
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None and task.result().status_code < 500:
+                if task is second:
+                    upstream_stats["hedge_wins"] += 1
+                await discard(pending | (done - {task}))
+                return task.result()
+        if not pending:
+            # Both failed: answer with the last one
+            last = done.pop()
+            await discard(done)
+            return last.result()
+        await discard(done)
+
+async def discard(tasks):
+    for task in tasks:
+        task.cancel()
+    for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(outcome, httpx.Response):
+            await outcome.aclose()
+
+def forwarded_headers(response):
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name.lower() in FORWARDED_HEADERS
+    }
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        # Stop intermediaries (nginx, ingress) from buffering the events
+        headers.update({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    return headers
+
+async def relay(state, response):
+    """Send an upstream response on to the browser.
+
+    Streaming mode forwards chunks as they arrive (SSE included); the next
+    chunk is only read once the previous one was handed to the client, so
+    a slow browser slows the upstream read instead of filling memory.
+    Buffered mode reads the whole body first and sends it in one piece.
+    """
+    headers = forwarded_headers(response)
+    if not STREAMING:
+        try:
+            body = await response.aread()
+        finally:
+            await close_upstream(state, response)
+        return Response(content=body, status_code=response.status_code, headers=headers)
+
+    async def chunks():
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        except httpx.TimeoutException:
+            # Headers are already sent; aborting is the only signal left
+            upstream_stats["timeouts"] += 1
+            logger.error("Blaxel API timeout mid-stream")
+            raise
+        finally:
+            await close_upstream(state, response)
+
+    return StreamingResponse(chunks(), status_code=response.status_code, headers=headers)
+
+class Flight:
+    """One upstream call whose response is shared by identical requests.
+
+    The call runs in its own task, so it completes even if the request that
+    started it disconnects. Each joined request reads chunks from its own
+    bounded queue and the call reads the next chunk only once every reader
+    has room for it: memory per reader stays at ``buffer`` chunks and a
+    slow browser slows the upstream read, as in ``relay``. Requests arriving
+    after the first chunk was read start a fresh call.
+    """
+
+    def __init__(self, buffer=FLIGHT_BUFFER):
+        self.response = None
+        self.error = None
+        self.buffer = buffer
+        self.readers = set()
+        self.task = None
+        self.opened = asyncio.Event()
+
+    def join(self):
+        queue = asyncio.Queue(self.buffer)
+        self.readers.add(queue)
+        return queue
+
+    def leave(self, queue):
+        self.readers.discard(queue)
+        # Unblock a publish waiting for room in this queue
+        _drain(queue)
+
+    async def publish(self, item):
+        for queue in list(self.readers):
+            await queue.put(item)
+
+    def fail(self, error):
+        """Abort every reader: buffered chunks are dropped for the error"""
+        self.error = error
+        for queue in self.readers:
+            _drain(queue)
+            queue.put_nowait(error)
+
+    async def read(self, queue):
+        try:
+            while (item := await queue.get()) is not _END:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.leave(queue)
+
+def _drain(queue):
+    while not queue.empty():
+        queue.get_nowait()
+
+# Marks the end of a flight's chunks
+_END = object()
+
+# (workspace, agent, body hash) -> Flight, for identical requests in flight
+flights = {}
+
+async def join_flight(key, state, path, headers, body, hedge):
+    flight = flights.get(key)
+    if flight is None:
+        flight = flights[key] = Flight()
+        flight.task = asyncio.create_task(run_flight(key, flight, state, path, headers, body, hedge))
+    else:
+        upstream_stats["coalesced"] += 1
+
+    queue = flight.join()
+    try:
+        await flight.opened.wait()
+        if flight.response is None:
+            raise flight.error
+    except BaseException:
+        flight.leave(queue)
+        raise
+    headers = forwarded_headers(flight.response)
+    if not STREAMING:
+        return Response(
+            content=b"".join([chunk async for chunk in flight.read(queue)]),
+            status_code=flight.response.status_code,
+            headers=headers
+        )
+    return StreamingResponse(
+        flight.read(queue), status_code=flight.response.status_code, headers=headers
+    )
+
+async def run_flight(key, flight, state, path, headers, body, hedge):
+    try:
+        flight.response = await open_upstream(state, path, headers, body, hedge)
+        flight.opened.set()
+        async for chunk in flight.response.aiter_raw():
+            # Requests arriving from now on start a fresh call
+            if flights.get(key) is flight:
+                del flights[key]
+            if not flight.readers:
+                break  # everyone disconnected and no one can join
+            await flight.publish(chunk)
+        await flight.publish(_END)
+    except BaseException as e:
+        if isinstance(e, httpx.TimeoutException) and flight.response is not None:
+            upstream_stats["timeouts"] += 1
+            logger.error("Blaxel API timeout mid-stream")
+        # Cancelled (e.g. at shutdown): joiners still get an answer
+        flight.fail(e if isinstance(e, Exception) else RuntimeError("Upstream call cancelled"))
+        if not isinstance(e, Exception):
+            raise
+    finally:
+        if flights.get(key) is flight:
+            del flights[key]
+        flight.opened.set()
+        if flight.response is not None:
+            await close_upstream(state, flight.response)
+
+@app.get("/stats")
+async def stats(request: Request):
+    """Upstream request counters, failure handling and connection pool usage"""
+    state = request.app.state
+    return {
+        "upstream": upstream_stats,
+        "flights": len(flights),
+        "breakers": {path: b.stats() for path, b in state.breakers.items()},
+        "retry_budget": state.retry_budget.stats(),
+        "concurrency": state.limiter.stats(),
+        "latency_p95_ms": {
+            path: round(w.percentile(95) * 1000, 1) for path, w in state.latency.items()
+        },
+        "pool": pool_stats(state.client),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/test")
 async def test_page():
     """Serve a test page for browser testing"""
@@ -0,0 +1,219 @@
+"""
+Failure handling for production_proxy.py: a circuit breaker per upstream,
+a retry budget, latency percentiles for hedging and an adaptive
+concurrency limit. Plain bookkeeping with no I/O, driven by the proxy from
+the event loop (no locking needed).
+"""
+
+import asyncio
+import math
+import time
+from bisect import insort
+from collections import deque
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failures`` consecutive failures.
+
+    Closed: requests pass. Open: requests are refused until
+    ``reset_timeout`` seconds have passed, then one trial request is let
+    through (half open). Its success closes the breaker, its failure opens
+    it again. A trial that never reports back is followed by another after
+    ``reset_timeout``.
+    """
+
+    def __init__(self, failures: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.refused = 0
+        self._retry_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        now = self.clock()
+        if now < self._retry_at:
+            self.refused += 1
+            return False
+        self.state = "half_open"
+        self._retry_at = now + self.reset_timeout
+        return True
+
+    def retry_after(self) -> float:
+        return max(self._retry_at - self.clock(), 0.0)
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self._retry_at = self.clock() + self.reset_timeout
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "refused": self.refused,
+            "retry_after": round(self.retry_after(), 3) if self.state != "closed" else 0.0,
+        }
+
+
+class RetryBudget:
+    """Caps retries (and hedges) at ``ratio`` of requests plus a small reserve.
+
+    Each request deposits ``ratio`` tokens, each retry spends one; the
+    balance never exceeds ``reserve``. When an upstream fails everything,
+    retries stop once the reserve is spent instead of multiplying load.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = reserve
+        self.spent = 0
+        self.denied = 0
+
+    def deposit(self):
+        self.balance = min(self.balance + self.ratio, self.reserve)
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            self.denied += 1
+            return False
+        self.balance -= 1
+        self.spent += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"balance": round(self.balance, 2), "spent": self.spent, "denied": self.denied}
+
+
+class LatencyWindow:
+    """Percentiles over the last ``size`` latency samples (seconds)."""
+
+    def __init__(self, size: int = 512):
+        self._samples = deque(maxlen=size)
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        if len(self._samples) == self._samples.maxlen:
+            self._sorted.remove(self._samples[0])
+        self._samples.append(seconds)
+        insort(self._sorted, seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._sorted:
+            return None
+        return self._sorted[min(int(q / 100 * len(self._sorted)), len(self._sorted) - 1)]
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that follows upstream latency (gradient).
+
+    Latency is tracked as a short-term and a long-term moving average. The
+    limit scales by their ratio: it grows (by about its square root per
+    sample, while at least half of it is in use) as long as the short-term
+    average stays within ``tolerance`` times the long-term one, shrinks in
+    proportion when it does not, and shrinks by ``backoff`` on a failure.
+    Averages absorb normal variance, so only sustained slowdowns cut the
+    limit, never below ``minimum``. Requests over the limit wait up to the
+    ``acquire`` timeout for a slot before they are refused.
+    """
+
+    def __init__(self, initial: int = 100, minimum: int = 1, maximum: int = 100,
+                 tolerance: float = 2.0, backoff: float = 0.9, short_window: int = 10,
+                 long_window: int = 500, smoothing: float = 0.2):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self.short = None
+        self.long = None
+        self.in_flight = 0
+        self.refused = 0
+        self.waited = 0
+        self._waiters = deque()
+
+    async def acquire(self, timeout: float = 0.0) -> bool:
+        """Take a slot, waiting up to ``timeout`` seconds; False if refused."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if timeout <= 0:
+            self.refused += 1
+            return False
+        self.waited += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as the wait ended; pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            self.refused += 1
+            return False
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def update(self, seconds: float | None, failed: bool = False):
+        if failed:
+            self.limit = max(self.limit * self.backoff, self.minimum)
+        elif seconds is not None:
+            if self.short is None:
+                self.short = self.long = seconds
+            else:
+                self.short += (seconds - self.short) * self._short_alpha
+                self.long += (seconds - self.long) * self._long_alpha
+                if self.long > 2 * self.short:
+                    # Latency dropped well below the baseline: follow it down
+                    self.long *= 0.95
+            if self.in_flight >= self.limit / 2:
+                gradient = max(0.5, min(1.0, self.tolerance * self.long / self.short))
+                target = self.limit * gradient + math.sqrt(self.limit)
+                limit = self.limit + (target - self.limit) * self.smoothing
+                self.limit = min(max(limit, self.minimum), self.maximum)
+        self._wake()
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "waited": self.waited,
+            "refused": self.refused,
+            "latency_short_ms": None if self.short is None else round(self.short * 1000, 1),
+            "latency_long_ms": None if self.long is None else round(self.long * 1000, 1),
+        }
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+from collections import OrderedDict, deque
+from time import monotonic
+
+THREAD_HEADER = "x-blaxel-thread-id"
+# End-user identity set by the authenticating edge (never trusted from browsers)
+USER_HEADER = os.environ.get("ADMISSION_USER_HEADER", "x-forwarded-user").lower()
+
+
+class Rejected(Exception):
+    """Request refused by admission control; answered with 429."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket per key: ``rate`` (> 0) tokens a second, at most ``burst``.
+
+    Buckets are kept in LRU order and capped at ``max_keys``; an evicted
+    key simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10_000, clock=monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """Spend a token for ``key``; 0 if allowed, else seconds until one is."""
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    """Bounds agent runs in progress, queueing the overflow by priority.
+
+    Each request first spends a token from its client's and its thread's
+    bucket. It then runs if fewer than ``max_concurrency`` are running, or
+    waits in a queue of at most ``queue_size``. Waiters are served by
+    ``priority`` (lower first), then in arrival order; the caller decides
+    priority from what it trusts, never from request headers. A full queue
+    rejects at once, or displaces the newest lower-priority waiter; waiting
+    longer than ``queue_timeout`` also rejects. Rejections are cheap, so a
+    flood from one client cannot grow everyone else's latency.
+    """
+
+    def __init__(self, max_concurrency: int = 8, queue_size: int = 32, queue_timeout: float = 30.0,
+                 key_limiter: RateLimiter | None = None, thread_limiter: RateLimiter | None = None,
+                 clock=monotonic):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.key_limiter = key_limiter
+        self.thread_limiter = thread_limiter
+        self.clock = clock
+        self.running = 0
+        self.admitted = 0
+        self.rejected = {"client_rate": 0, "thread_rate": 0, "queue_full": 0, "displaced": 0, "timed_out": 0}
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._waits = deque(maxlen=1024)
+        self.peak_queued = 0
+
+    async def acquire(self, key: str | None = None, thread: str | None = None, priority: int = 1):
+        """Wait for a slot; raises Rejected. Pair with ``release``."""
+        for limiter, id_, kind in ((self.key_limiter, key, "client"), (self.thread_limiter, thread, "thread")):
+            if limiter and id_ and (retry_after := limiter.take(id_)):
+                self.rejected[f"{kind}_rate"] += 1
+                raise Rejected(f"Rate limit exceeded for this {kind}", retry_after)
+
+        if self.running < self.max_concurrency and not self._queue:
+            self.running += 1
+            self._admit(0.0)
+            return
+
+        if len(self._queue) >= self.queue_size:
+            worst = max(self._queue, default=None)
+            if worst is None or worst[0] <= priority:
+                self.rejected["queue_full"] += 1
+                raise Rejected("Server busy, admission queue full", self._retry_after())
+            self._remove(worst)
+            self.rejected["displaced"] += 1
+            worst[2].set_exception(Rejected("Server busy, displaced from admission queue", self._retry_after()))
+
+        entry = (priority, next(self._order), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, entry)
+        self.peak_queued = max(self.peak_queued, len(self._queue))
+        queued_at = self.clock()
+        try:
+            await asyncio.wait_for(entry[2], self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(entry)
+            self.rejected["timed_out"] += 1
+            raise Rejected("Server busy, timed out in admission queue", self._retry_after())
+        except BaseException:
+            self._abandon(entry)
+            raise
+        self._admit(self.clock() - queued_at)
+
+    def release(self):
+        self.running -= 1
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # The slot passes straight to the waiter
+                self.running += 1
+                future.set_result(None)
+                return
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(q):
+            return round(waits[min(int(q * len(waits)), len(waits) - 1)] * 1000, 1) if waits else None
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queued": len(self._queue),
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "queue_wait_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1)},
+        }
+
+    def _admit(self, waited):
+        self.admitted += 1
+        self._waits.append(waited)
+
+    def _abandon(self, entry):
+        if entry in self._queue:
+            self._remove(entry)
+        elif entry[2].done() and not entry[2].cancelled() and entry[2].exception() is None:
+            # Granted a slot just as the wait was cancelled; pass it on
+            self.release()
+
+    def _remove(self, entry):
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+
+    def _retry_after(self) -> float:
+        # Rough: time for the queue ahead to drain at the recent wait rate
+        return max(sum(self._waits) / len(self._waits), 1.0) if self._waits else 1.0
+
+
+def client_key(headers, client_host: str | None = None, user_header: str = USER_HEADER) -> str:
+    """Identify the end user by the identity header the edge forwards
+    (hashed, never kept raw), else by address.
+
+    API keys are not used: every shipped client sends the same one.
+    """
+    user = headers.get(user_header)
+    if user:
+        return "user:" + hashlib.sha256(user.encode()).hexdigest()[:16]
+    return f"ip:{client_host or 'unknown'}"
+
+
+def admission_from_env():
+    """Build the controller configured by ``ADMISSION*``/``RATE_LIMIT*``; None when disabled."""
+    if os.environ.get("ADMISSION", "false").lower() != "true":
+        return None
+    return AdmissionController(
+        max_concurrency=int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "8")),
+        queue_size=int(os.environ.get("ADMISSION_QUEUE_SIZE", "32")),
+        queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "30")),
+        key_limiter=RateLimiter(
+            float(os.environ.get("RATE_LIMIT_KEY_PER_MINUTE", "60")) / 60,
+            float(os.environ.get("RATE_LIMIT_KEY_BURST", "20")),
+        ),
+        thread_limiter=RateLimiter(
+            float(os.environ.get("RATE_LIMIT_THREAD_PER_MINUTE", "20")) / 60,
+            float(os.environ.get("RATE_LIMIT_THREAD_BURST", "5")),
+        ),
+    )
+
+
+admission = admission_from_env()
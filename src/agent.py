@@ -2,48 +2,69 @@ from datetime import datetime
 from logging import getLogger
 from typing import Annotated, TypedDict
 
-from blaxel.langgraph import bl_model
-from langchain_core.messages import AIMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph_supervisor import create_supervisor
 
-from .vehicle import agent as vehicle_agent
-from .dealer import agent as dealer_agent
+from . import tracing
+from .checkpoint import checkpointer_from_env
+from .crew import CrewPool
+from .dealer import crews as dealer_crews
+from .llm_cache import bypass
+from .models import chat_model
+from .semantic_cache import cache_for
+from .streaming import replay, stream_crew
+from .vehicle import crews as vehicle_crews
 
 logger = getLogger(__name__)
 
+checkpointer = checkpointer_from_env()
+
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
 
 
-def vehicle_agent_graph():
-    async def handle_vehicle(state: State) -> State:
-        crew = await vehicle_agent()
-        inputs = {
-            "request": state["messages"][-1].content,
-            "current_year": datetime.now().year,
-        }
-        result = crew.kickoff(
-            inputs=inputs,
-        )
-        state["messages"].append(AIMessage(content=result.raw))
-        return state
+def crew_agent_graph(name: str, crews: CrewPool):
+    # Crews only see the latest request, so a near-duplicate request can
+    # reuse an earlier answer when this agent opts in
+    cache = cache_for(name)
+
+    async def handle_crew(state: State, config: RunnableConfig) -> State:
+        request = state["messages"][-1].content
+        if cache and not bypass.get() and (answer := cache.get(request)):
+            tracing.cache_hit("semantic", name, config)
+            return {"messages": await replay(answer, config, name)}
+
+        inputs = {"request": request, "current_year": datetime.now().year}
+        # Borrows a warm crew, runs it off the event loop and streams each
+        # task's tokens as they arrive; the last message is the crew's answer
+        messages = await stream_crew(crews, inputs, config, name)
+        if cache:
+            cache.put(request, [m.content for m in messages])
+        return {"messages": messages}
 
     graph = StateGraph(State)
-    graph.add_node("vehicle_agent", handle_vehicle)
-    graph.set_entry_point("vehicle_agent")
-    graph.add_edge("vehicle_agent", END)
-    return graph.compile(name="vehicle_agent")
+    graph.add_node(name, handle_crew)
+    graph.set_entry_point(name)
+    graph.add_edge(name, END)
+    return graph.compile(name=name)
+
+
+def vehicle_agent_graph():
+    return crew_agent_graph("vehicle_agent", vehicle_crews)
+
+
+def dealer_agent_graph():
+    return crew_agent_graph("dealer_agent", dealer_crews)
 
 
 async def agent():
     # Use the correct model that exists in workspace
-    model = await bl_model("sandbox-openai")
+    model = await chat_model("sandbox-openai")
     supervisor_graph = create_supervisor(
-        [vehicle_agent_graph(), await dealer_agent()],
+        [vehicle_agent_graph(), dealer_agent_graph()],
         model=model,
         supervisor_name="automotive-supervisor",
         prompt="""
@@ -65,4 +86,4 @@ async def agent():
         Focus on understanding their needs (budget, lifestyle, preferences) to make personalized recommendations.
         """,
     )
-    return supervisor_graph.compile(checkpointer=MemorySaver())
+    return supervisor_graph.compile(checkpointer=checkpointer)
@@ -0,0 +1,514 @@
+import asyncio
+import atexit
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from logging import getLogger
+from time import monotonic
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+logger = getLogger(__name__)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer that evicts whole threads to stay within bounds.
+
+    Threads are kept in least-recently-used order and evicted when there are
+    more than ``max_threads``, when the serialized size of all threads exceeds
+    ``max_bytes``, or when a thread has been idle for ``ttl_seconds``. The
+    thread being written is never evicted by its own write.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # thread id -> [bytes held, last access]
+        self._threads: OrderedDict[str, list] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = {"lru": 0, "bytes": 0, "ttl": 0}
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            self._evict(keep=thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config:
+                thread_id = config["configurable"]["thread_id"]
+                self._touch(thread_id)
+                self._evict(keep=thread_id)
+            # Materialize under the lock so eviction cannot race the iteration
+            items = [
+                *super().list(config, filter=filter, before=before, limit=limit)
+            ]
+        yield from items
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            saved, meta, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            size = len(saved[1]) + len(meta[1])
+            for channel, version in new_versions.items():
+                size += len(self.blobs[(thread_id, checkpoint_ns, channel, version)][1])
+            self._account(thread_id, size)
+            return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            before = _writes_size(self.writes.get(outer_key))
+            super().put_writes(config, writes, task_id, task_path)
+            self._account(thread_id, _writes_size(self.writes.get(outer_key)) - before)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            super().delete_thread(thread_id)
+            held = self._threads.pop(thread_id, None)
+            if held:
+                self._bytes -= held[0]
+
+    def sweep(self):
+        """Evict idle threads even when no requests arrive."""
+        with self._lock:
+            self._evict(keep=None)
+
+    async def sweep_forever(self, interval: float | None = None):
+        interval = interval or max(min(self.ttl_seconds / 4, 60.0), 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "bytes": self._bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": dict(self.evictions),
+            }
+
+    def _touch(self, thread_id):
+        if thread_id in self._threads:
+            self._threads[thread_id][1] = monotonic()
+            self._threads.move_to_end(thread_id)
+
+    def _account(self, thread_id, size):
+        held = self._threads.setdefault(thread_id, [0, 0.0])
+        held[0] += size
+        held[1] = monotonic()
+        self._threads.move_to_end(thread_id)
+        self._bytes += size
+        self._evict(keep=thread_id)
+
+    def _evict(self, keep):
+        now = monotonic()
+        for thread_id, (_, last_access) in [*self._threads.items()]:
+            if thread_id == keep:
+                continue
+            if now - last_access > self.ttl_seconds:
+                reason = "ttl"
+            elif len(self._threads) > self.max_threads:
+                reason = "lru"
+            elif self._bytes > self.max_bytes:
+                reason = "bytes"
+            else:
+                # Oldest remaining thread is fresh and we are within bounds
+                break
+            self.delete_thread(thread_id)
+            self.evictions[reason] += 1
+            logger.debug(f"Evicted checkpoint thread {thread_id} ({reason})")
+
+
+def _writes_size(writes) -> int:
+    if not writes:
+        return 0
+    return sum(len(w[2][1]) for w in writes.values())
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteSaver(BaseCheckpointSaver[str]):
+    """Checkpointer backed by a local SQLite file in WAL mode.
+
+    Checkpoints survive restarts and can be read by every worker that mounts
+    the same file. Writes are buffered and committed in one transaction per
+    ``flush_every`` checkpoints, and never later than ``flush_interval``
+    seconds after they were buffered. Until then they are invisible to other
+    workers and lost if the process is killed. Reads flush first so a worker
+    always sees its own writes. Payloads use the serializer's msgpack
+    encoding, zlib-compressed above ``compress_min`` bytes.
+
+    ``_lock`` only guards the buffers, so buffering a write never waits on
+    SQLite; ``_db_lock`` serializes use of the connection.
+    """
+
+    get_next_version = MemorySaver.get_next_version
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_every: int = 10,
+        flush_interval: float = 0.5,
+        compress_min: int = 1024,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.compress_min = compress_min
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        self._checkpoints = []
+        self._writes = []
+        self._timer = None
+        self.flushes = 0
+        self.checkpoints_written = 0
+        atexit.register(self.close)
+
+    def get_tuple(self, config):
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        with self._db_lock:
+            self.flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                    " metadata_type, metadata FROM checkpoints"
+                    " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                    " metadata_type, metadata FROM checkpoints"
+                    " WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._load_tuple(thread_id, checkpoint_ns, row)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._db_lock:
+            self.flush()
+            rows = self.conn.execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self._loads(row[4], row[5])
+                if filter and not all(
+                    metadata.get(key) == value for key, value in filter.items()
+                ):
+                    continue
+                results.append(self._load_tuple(thread_id, checkpoint_ns, row))
+        yield from results
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            *self._dumps(c),
+            *self._dumps(get_checkpoint_metadata(config, metadata)),
+        )
+        with self._lock:
+            self._checkpoints.append(row)
+            full = len(self._checkpoints) >= self.flush_every
+            if not full:
+                self._schedule_flush()
+        if full:
+            self.flush()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        configurable = config["configurable"]
+        key = (
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+        )
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            # Regular writes are idempotent per index; special ones overwrite
+            rows.append(
+                (idx >= 0, (*key, task_id, idx, channel, *self._dumps(value), task_path))
+            )
+        with self._lock:
+            self._writes.extend(rows)
+            self._schedule_flush()
+
+    def delete_thread(self, thread_id):
+        with self._db_lock:
+            self.flush()
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("COMMIT")
+
+    def flush(self):
+        with self._db_lock:
+            # Take the buffers and commit them without blocking new writes
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                checkpoints, self._checkpoints = self._checkpoints, []
+                writes, self._writes = self._writes, []
+            if not checkpoints and not writes:
+                return
+            self.conn.execute("BEGIN")
+            try:
+                for keep_existing, row in writes:
+                    self.conn.execute(
+                        f"INSERT OR {'IGNORE' if keep_existing else 'REPLACE'} INTO writes"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    checkpoints,
+                )
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                # Keep the rows, ahead of anything buffered since
+                with self._lock:
+                    self._checkpoints[:0] = checkpoints
+                    self._writes[:0] = writes
+                raise
+            self.conn.execute("COMMIT")
+            with self._lock:
+                self.checkpoints_written += len(checkpoints)
+                self.flushes += 1
+
+    def _schedule_flush(self):
+        # Bound how long buffered rows can sit unseen by other workers
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_quietly)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.error(f"Checkpoint flush failed: {e}", exc_info=e)
+
+    def close(self):
+        with self._db_lock:
+            try:
+                self.flush()
+                self.conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # already closed
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        # Only buffers, under a lock never held across SQLite calls; the
+        # commit happens with the next checkpoint
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def stats(self) -> dict:
+        # Counters only; no table scans on the monitoring path
+        with self._lock:
+            return {
+                "path": self.path,
+                "checkpoints_written": self.checkpoints_written,
+                "pending_checkpoints": len(self._checkpoints),
+                "pending_writes": len(self._writes),
+                "flushes": self.flushes,
+                "bytes": sum(
+                    os.path.getsize(f)
+                    for f in (self.path, f"{self.path}-wal")
+                    if os.path.exists(f)
+                ),
+            }
+
+    def _load_tuple(self, thread_id, checkpoint_ns, row):
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+            " ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        if parent_checkpoint_id:
+            sends = self.conn.execute(
+                "SELECT type, value FROM writes"
+                " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+                " AND channel = ? ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+        else:
+            sends = []
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self._loads(type_, checkpoint),
+                "pending_sends": [self._loads(*send) for send in sends],
+            },
+            metadata=self._loads(metadata_type, metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._loads(type_, value))
+                for task_id, channel, type_, value in writes
+            ],
+        )
+
+    def _dumps(self, value):
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= self.compress_min:
+            return f"{type_}+zlib", zlib.compress(data, 1)
+        return type_, data
+
+    def _loads(self, type_, data):
+        if type_.endswith("+zlib"):
+            type_, data = type_[:-5], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+
+def checkpointer_from_env():
+    """Build the checkpointer selected by ``CHECKPOINTER`` (memory or sqlite)."""
+    if os.environ.get("CHECKPOINTER", "memory") == "sqlite":
+        return SqliteSaver(
+            os.environ.get("CHECKPOINT_PATH", "checkpoints.db"),
+            flush_every=int(os.environ.get("CHECKPOINT_FLUSH_EVERY", "10")),
+            flush_interval=float(os.environ.get("CHECKPOINT_FLUSH_INTERVAL", "0.5")),
+        )
+    return BoundedMemorySaver(
+        max_threads=int(os.environ.get("CHECKPOINT_MAX_THREADS", "1000")),
+        max_bytes=int(os.environ.get("CHECKPOINT_MAX_MB", "256")) * 1024 * 1024,
+        ttl_seconds=float(os.environ.get("CHECKPOINT_TTL_SECONDS", "3600")),
+    )
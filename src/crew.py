@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging import getLogger
+from time import perf_counter
+
+from .models import BACKEND
+
+logger = getLogger(__name__)
+
+
+class CrewExecutor:
+    """Runs blocking ``Crew.kickoff`` calls on a bounded thread pool.
+
+    Callers beyond ``max_concurrency`` wait on a semaphore rather than in the
+    pool's internal queue, so waiting requests can be cancelled cleanly and the
+    queue depth is observable.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="crew"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.running = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    async def kickoff(self, crew, inputs: dict, on_done=None):
+        """Run ``crew.kickoff`` on the pool and await its result.
+
+        The concurrency slot is held until the worker thread finishes, even if
+        the awaiting coroutine is cancelled first. ``on_done`` is called exactly
+        once, after the thread finishes or when cancelled before it started.
+        """
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        queued_at = perf_counter()
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            if on_done:
+                on_done()
+            raise
+        finally:
+            self.queued -= 1
+        self.wait_seconds += perf_counter() - queued_at
+
+        self.running += 1
+        started_at = perf_counter()
+        loop = asyncio.get_running_loop()
+        # Copy the context so tracing/correlation ids follow the crew thread
+        ctx = contextvars.copy_context()
+        future = self._pool.submit(ctx.run, crew.kickoff, inputs=inputs)
+        future.add_done_callback(
+            lambda f: _call_soon(loop, self._finish, f, started_at, on_done)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, future, started_at, on_done):
+        self.running -= 1
+        self.run_seconds += perf_counter() - started_at
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._semaphore.release()
+        if on_done:
+            on_done()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "run_seconds": round(self.run_seconds, 3),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_soon(loop, callback, *args):
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # loop closed during shutdown; nothing left to account for
+
+
+executor = CrewExecutor(int(os.environ.get("CREW_MAX_CONCURRENCY", "4")))
+STREAMING = os.environ.get("CREW_STREAMING", "true").lower() == "true"
+POOL_SIZE = int(os.environ.get("CREW_POOL_SIZE", str(executor.max_concurrency)))
+# Crews ("vehicle", "dealer" or "all") that print every step to stdout
+VERBOSE = {
+    name.strip() for name in os.environ.get("CREW_VERBOSE", "").lower().split(",") if name.strip()
+}
+
+
+def verbose(name: str) -> bool:
+    """Whether the ``name`` crew and its agents run with ``verbose=True``.
+
+    CrewAI prints verbose output synchronously from the crew's thread, so
+    it is off unless asked for while debugging one agent.
+    """
+    return name in VERBOSE or "all" in VERBOSE
+
+
+async def kickoff(crew, inputs: dict, on_done=None):
+    """Run ``crew.kickoff(inputs=...)`` without blocking the event loop."""
+    return await executor.kickoff(crew, inputs, on_done)
+
+
+# name -> CrewPool, for monitoring
+pools = {}
+
+
+@lru_cache(maxsize=None)
+def llm(model: str = "gpt-4", temperature: float = 0.7):
+    """One LLM per model config, shared by every pooled crew.
+
+    Built as a CrewAI ``LLM`` directly: CrewAI only copies settings out of
+    LangChain chat models, which would drop ``stream``. Completions are
+    served from the shared LLM cache when one is configured. With
+    ``LLM_BACKEND=fake`` it is the scripted local model instead.
+    """
+    if BACKEND == "fake":
+        from .fake_llm import crew_llm_from_env
+
+        return crew_llm_from_env(stream=STREAMING)
+    from .llm import CachedLLM
+    from .llm_cache import cache
+
+    return CachedLLM(model=model, temperature=temperature, stream=STREAMING, cache=cache)
+
+
+class CrewPool:
+    """Keeps warm crews built by ``factory`` for reuse across turns.
+
+    CrewAI re-interpolates task descriptions from their originals on every
+    kickoff, so a crew can serve many requests as long as only one request
+    holds it at a time. Idle crews beyond ``size`` are dropped on release.
+    """
+
+    def __init__(self, name: str, factory, size: int = POOL_SIZE):
+        self.name = name
+        self.factory = factory
+        self.size = size
+        self._idle = []
+        self._template = None
+        self.created = 0
+        self.reused = 0
+        pools[name] = self
+
+    async def template(self):
+        """A crew for registration and metadata; never handed to kickoff."""
+        if self._template is None:
+            self._template = await asyncio.to_thread(self.factory)
+        return self._template
+
+    async def warm(self, count: int | None = None):
+        count = self.size if count is None else min(count, self.size)
+        while len(self._idle) < count:
+            self._idle.append(await self._build())
+
+    async def acquire(self):
+        if self._idle:
+            self.reused += 1
+            return self._idle.pop()
+        return await self._build()
+
+    def release(self, crew):
+        # Drop outputs from the previous turn before the crew goes idle
+        for task in crew.tasks:
+            task.output = None
+        if len(self._idle) < self.size:
+            self._idle.append(crew)
+
+    async def run(self, inputs: dict):
+        crew = await self.acquire()
+        # Released by the executor once the kickoff thread is done with it,
+        # not when this coroutine is cancelled
+        return await kickoff(crew, inputs, on_done=lambda: self.release(crew))
+
+    async def _build(self):
+        self.created += 1
+        return await asyncio.to_thread(self.factory)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "created": self.created,
+            "reused": self.reused,
+        }
@@ -1,9 +1,11 @@
 from crewai import Agent, Crew, Task
 # from crewai_tools import SerperDevTool  # Temporarily disabled
-from langchain_openai import ChatOpenAI
 
+from .crew import CrewPool, llm, verbose
+from .tools import find_dealers
 
-async def agent():
+
+def build_crew():
     # Dealer search and connection agent
     # search_tool = SerperDevTool()  # Temporarily disabled
     search_tool = []  # No tools for now
@@ -20,10 +22,11 @@ async def agent():
         - Test drive availability
         
         You maintain relationships with dealers across the country and know their
-        strengths, specialties, and customer satisfaction records.""",
-        tools=search_tool,  # Empty list for now
-        llm=ChatOpenAI(model="gpt-4", temperature=0.7),
-        verbose=True,
+        strengths, specialties, and customer satisfaction records. You look up
+        dealers and their distance from the customer in the dealer directory.""",
+        tools=[find_dealers],
+        llm=llm(),
+        verbose=verbose("dealer"),
     )
     
     appointment_coordinator = Agent(
@@ -39,8 +42,8 @@ async def agent():
         You understand dealer hours, availability, and can help customers
         prepare for their dealership visit.""",
         tools=search_tool,  # Empty list for now
-        llm=ChatOpenAI(model="gpt-4", temperature=0.7),
-        verbose=True,
+        llm=llm(),
+        verbose=verbose("dealer"),
     )
     
     # Define tasks
@@ -89,7 +92,14 @@ async def agent():
     crew = Crew(
         agents=[dealer_finder, appointment_coordinator],
         tasks=[dealer_search_task, appointment_task],
-        verbose=True,
+        verbose=verbose("dealer"),
     )
     
     return crew
+
+
+crews = CrewPool("dealer", build_crew)
+
+
+async def agent():
+    return await crews.template()
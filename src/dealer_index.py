@@ -0,0 +1,222 @@
+import json
+import math
+import os
+from functools import lru_cache
+from logging import getLogger
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+KM_PER_MILE = 1.609344
+# Visiting a grid cell in Python costs about as much as this many vectorized
+# distance computations
+CELL_COST = 4
+
+# Columns of the ``dealers`` table (supabase_schema.sql) returned with results
+FIELDS = [
+    "id", "name", "phone", "website", "address_street", "address_city",
+    "address_state", "address_zip", "rating", "total_reviews",
+]
+
+
+class DealerIndex:
+    """Grid index over dealer locations for nearest and radius queries.
+
+    Dealers are bucketed into ``cell_degrees`` latitude/longitude cells and
+    stored sorted by cell, so a radius query gathers the few cells
+    overlapping its bounding box and computes exact haversine distances for
+    those dealers only. Nearest-k queries run radius queries with a growing
+    radius until ``k`` dealers pass the filters. Once visiting a box's cells
+    would cost more than a vectorized distance to every matching dealer (a
+    sparse filter, or a point far from any dealer), that is computed
+    instead. Brand and service filters are
+    precomputed boolean masks, matched case-insensitively.
+    """
+
+    def __init__(self, rows: list[dict], cell_degrees: float = 0.25):
+        rows = [r for r in rows if _located(r) and r.get("is_active", True) is not False]
+        self.rows = rows
+        self.size = len(rows)
+        self.cell_degrees = cell_degrees
+        self.lat = np.array([float(r["latitude"]) for r in rows], dtype=np.float64)
+        self.lon = np.array([float(r["longitude"]) for r in rows], dtype=np.float64)
+        self._lat_rad = np.radians(self.lat)
+        self._lon_rad = np.radians(self.lon)
+        self._cos_lat = np.cos(self._lat_rad)
+
+        self.columns = int(round(360 / cell_degrees))
+        keys = self._cell(self.lat, self.lon)
+        self._order = np.argsort(keys, kind="stable").astype(np.int32)
+        sorted_keys = keys[self._order]
+        cells, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+        self._cells = dict(zip(cells.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+
+        self.brands = self._masks(rows, "brands")
+        self.services = self._masks(rows, "services")
+
+    def nearest(self, lat: float, lon: float, k: int = 5, *, brand=None, service=None) -> list[dict]:
+        """The ``k`` closest dealers matching the filters, nearest first."""
+        mask = self._filter(brand, service)
+        available = self.size if mask is None else int(mask.sum())
+        k = min(k, available)
+        if k == 0:
+            return []
+        radius = 2 * self.cell_degrees * KM_PER_DEGREE
+        while self._cell_count(lat, lon, radius) * CELL_COST < available:
+            rows, distances = self._within(lat, lon, radius, mask, available)
+            # Exact within the radius, so k hits there are the global k nearest
+            if len(rows) >= k:
+                top = np.argsort(distances, kind="stable")[:k]
+                return [self._result(rows[i], distances[i]) for i in top]
+            radius *= 2
+        rows, distances = self._scan(lat, lon, mask)
+        top = np.argpartition(distances, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return [self._result(rows[i], distances[i]) for i in top]
+
+    def within(self, lat: float, lon: float, radius_km: float, *, brand=None, service=None,
+               limit: int | None = None) -> list[dict]:
+        """Dealers within ``radius_km`` matching the filters, nearest first."""
+        mask = self._filter(brand, service)
+        available = self.size if mask is None else int(mask.sum())
+        rows, distances = self._within(lat, lon, radius_km, mask, available)
+        order = np.argsort(distances, kind="stable")[:limit]
+        return [self._result(rows[i], distances[i]) for i in order]
+
+    def _within(self, lat, lon, radius_km, mask, available):
+        if self._cell_count(lat, lon, radius_km) * CELL_COST >= available:
+            rows, distances = self._scan(lat, lon, mask)
+        else:
+            rows = self._candidates(lat, lon, radius_km)
+            if mask is not None:
+                rows = rows[mask[rows]]
+            distances = self._distance(lat, lon, rows)
+        keep = distances <= radius_km
+        return rows[keep], distances[keep]
+
+    def _scan(self, lat, lon, mask):
+        """Every matching dealer and its distance"""
+        if mask is None:
+            # Whole columns: no gather needed
+            return np.arange(self.size, dtype=np.int32), self._distance(lat, lon, slice(None))
+        rows = np.flatnonzero(mask)
+        return rows, self._distance(lat, lon, rows)
+
+    def _cell_count(self, lat, lon, radius_km):
+        rows, columns = self._box(lat, lon, radius_km)
+        return len(rows) * len(columns)
+
+    def _candidates(self, lat, lon, radius_km):
+        rows, columns = self._box(lat, lon, radius_km)
+        spans = []
+        for row in rows:
+            for column in columns:
+                span = self._cells.get(row * self.columns + column % self.columns)
+                if span:
+                    spans.append(self._order[span[0] : span[1]])
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int32)
+
+    def _box(self, lat, lon, radius_km):
+        """Grid rows and columns overlapping the query's bounding box"""
+        lat_span = radius_km / KM_PER_DEGREE
+        low, high = max(lat - lat_span, -90.0), min(lat + lat_span, 90.0)
+        # Longitude degrees shrink towards the poles; widen the box to match
+        widest = max(abs(low), abs(high))
+        cos = math.cos(math.radians(widest))
+        lon_span = 180.0 if cos < 1e-6 else min(lat_span / cos, 180.0)
+        rows_low = math.floor((low + 90) / self.cell_degrees)
+        rows_high = math.floor((high + 90) / self.cell_degrees)
+        cols_low = math.floor((lon - lon_span + 180) / self.cell_degrees)
+        cols_high = math.floor((lon + lon_span + 180) / self.cell_degrees)
+        columns = range(cols_low, cols_high + 1)
+        if len(columns) >= self.columns:
+            columns = range(self.columns)
+        return range(rows_low, rows_high + 1), columns
+
+    def _distance(self, lat, lon, rows):
+        lat1, lon1 = math.radians(lat), math.radians(lon)
+        dlat = self._lat_rad[rows] - lat1
+        dlon = self._lon_rad[rows] - lon1
+        a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * self._cos_lat[rows] * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _cell(self, lat, lon):
+        rows = self._index(lat)
+        columns = np.floor((lon + 180) / self.cell_degrees).astype(np.int64) % self.columns
+        return rows * self.columns + columns
+
+    def _index(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell_degrees).astype(np.int64)
+
+    def _filter(self, brand, service):
+        mask = None
+        for masks, value in ((self.brands, brand), (self.services, service)):
+            if value:
+                match = masks.get(value.strip().lower())
+                if match is None:
+                    return np.zeros(self.size, dtype=bool)
+                mask = match if mask is None else mask & match
+        return mask
+
+    def _masks(self, rows, field):
+        masks = {}
+        for i, row in enumerate(rows):
+            for value in _array(row.get(field)):
+                masks.setdefault(value.lower(), np.zeros(self.size, dtype=bool))[i] = True
+        return masks
+
+    def _result(self, i, distance_km):
+        row = self.rows[i]
+        return {
+            **{field: row.get(field) for field in FIELDS},
+            "brands": _array(row.get("brands")),
+            "services": _array(row.get("services")),
+            "latitude": float(self.lat[i]),
+            "longitude": float(self.lon[i]),
+            "distance_km": round(float(distance_km), 2),
+            "distance_miles": round(float(distance_km) / KM_PER_MILE, 2),
+        }
+
+
+def _located(row) -> bool:
+    try:
+        return -90 <= float(row["latitude"]) <= 90 and -180 <= float(row["longitude"]) <= 180
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def _array(value) -> list[str]:
+    """A ``TEXT[]`` column as exported to JSON (a list) or as a Postgres literal."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.strip("{}").split(",")
+    return [v.strip().strip('"') for v in value if v and v.strip()]
+
+
+def load(path: str) -> DealerIndex:
+    """Read a JSON array or JSON-lines export of the ``dealers`` table."""
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = json.load(f)
+    return DealerIndex(rows)
+
+
+@lru_cache(maxsize=None)
+def dealer_index() -> DealerIndex | None:
+    """The dealers exported to ``DEALERS_PATH``, loaded on first use."""
+    path = os.environ.get("DEALERS_PATH")
+    if not path:
+        return None
+    try:
+        loaded = load(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load dealers from {path}: {e}", exc_info=e)
+        return None
+    logger.info(f"Loaded {loaded.size} dealers from {path}")
+    return loaded
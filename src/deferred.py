@@ -0,0 +1,63 @@
+"""
+CopilotKit agents built on first use (``LAZY_AGENTS``). They are listed
+from the first request on as placeholders; a request that runs one waits
+for the shared build instead of finding the agent missing.
+
+Imports copilotkit, so ``main`` loads this module only when building the SDK.
+"""
+
+import asyncio
+
+from copilotkit import Agent
+
+
+class DeferredBuild:
+    """Runs ``build`` once, when first needed. Everyone needing it meanwhile
+    waits for the same run; after a failure the next caller starts another."""
+
+    def __init__(self, build):
+        self._build = build
+        self._task = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> asyncio.Future:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._build())
+            self._task.add_done_callback(self._finished)
+        return self._task
+
+    def _finished(self, task):
+        # Retrieving the exception also keeps asyncio from warning about it
+        if task.cancelled() or task.exception() is not None:
+            if self._task is task:
+                self._task = None
+
+    async def wait(self):
+        # Shielded: one caller going away does not cancel everyone's build
+        await asyncio.shield(self.start())
+
+
+class DeferredAgent(Agent):
+    """Stands in for a LangGraph agent until ``resolve(name)`` returns it."""
+
+    def __init__(self, *, name: str, description: str | None = None, resolve):
+        super().__init__(name=name, description=description)
+        self._resolve = resolve
+
+    def execute(self, **kwargs):
+        async def events():
+            agent = await self._resolve(self.name)
+            async for event in agent.execute(**kwargs):
+                yield event
+
+        return events()
+
+    async def get_state(self, *, thread_id: str):
+        agent = await self._resolve(self.name)
+        return await agent.get_state(thread_id=thread_id)
+
+    def dict_repr(self):
+        return {**super().dict_repr(), "type": "langgraph"}
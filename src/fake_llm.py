@@ -0,0 +1,237 @@
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+from typing import Any
+
+from crewai import BaseLLM
+from crewai.utilities.events import (
+    LLMCallCompletedEvent,
+    LLMCallStartedEvent,
+    LLMCallType,
+    LLMStreamChunkEvent,
+    crewai_event_bus,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Routes like the supervisor prompt asks and answers like a crew would
+DEFAULT_SCRIPT = {
+    "rules": [
+        {"match": r"dealer|test drive|appointment|servic|near|contact", "tool": "transfer_to_dealer_agent"},
+        {"match": r".", "tool": "transfer_to_vehicle_agent"},
+    ],
+    "replies": [
+        "Here are three options that fit: a 2021 Toyota RAV4 XLE at $27,900 with 31,000 miles, "
+        "a 2020 Honda CR-V EX at $25,400 with 38,000 miles, and a 2022 Mazda CX-5 Touring at "
+        "$28,750 with 19,000 miles. The RAV4 has the best resale value, the CR-V the most cargo "
+        "space, and the CX-5 the nicest interior for the price.",
+        "Two dealers near you carry that model: Mile High Toyota (4.6 stars, open until 8 pm) "
+        "and Front Range Auto Group (4.4 stars, offers Saturday test drives). Both can hold a "
+        "vehicle for 24 hours; I can book a test drive at either if you tell me a time.",
+        "At $28,000 with $3,000 down over 60 months at 6.9% APR, the payment is about $494 a "
+        "month and total interest is roughly $4,630. Stretching to 72 months lowers the "
+        "payment to about $425 but adds around $1,000 in interest.",
+    ],
+}
+_TOKEN = re.compile(r"\S+\s*")
+
+
+class Script:
+    """Scripted answers, chosen deterministically from the prompt.
+
+    ``rules`` are tried in order: a rule with a ``tool`` calls that tool (when
+    it is bound and the latest message is the user's), a rule with a
+    ``reply`` answers with it. Prompts no rule answers get one of ``replies``
+    picked by a hash of the prompt, so the same prompt always gets the same
+    answer.
+    """
+
+    def __init__(self, rules: list[dict] = (), replies: list[str] = ("OK.",)):
+        self.rules = [{**rule, "pattern": re.compile(rule["match"], re.I)} for rule in rules]
+        self.replies = list(replies)
+
+    @classmethod
+    def load(cls, path: str) -> "Script":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def respond(self, prompt: str, tools=(), from_user: bool = False) -> tuple[str, dict | None]:
+        """The reply text, or a tool call ``{"name", "args"}``."""
+        for rule in self.rules:
+            if not rule["pattern"].search(prompt):
+                continue
+            if "tool" in rule:
+                if from_user and rule["tool"] in tools:
+                    return "", {"name": rule["tool"], "args": rule.get("args", {})}
+            elif "reply" in rule:
+                return rule["reply"], None
+        return self.replies[zlib.crc32(prompt.encode()) % len(self.replies)], None
+
+
+def tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """LangChain chat model answering from a ``Script`` with simulated latency.
+
+    Waits ``first_token_latency`` seconds, then ``token_latency`` per
+    whitespace-delimited token; streams token by token. Supports
+    ``bind_tools`` so supervisor handoffs and ReAct agents can route.
+    """
+
+    script: Any
+    token_latency: float = 0.0
+    first_token_latency: float = 0.0
+    tool_names: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _respond(self, messages):
+        last = messages[-1]
+        prompt = last.content if isinstance(last.content, str) else str(last.content)
+        text, call = self.script.respond(prompt, self.tool_names, isinstance(last, HumanMessage))
+        tool_calls = []
+        if call:
+            call_id = f"call_{zlib.crc32(f'{len(messages)}:{prompt}'.encode()):08x}"
+            tool_calls = [{"name": call["name"], "args": call["args"], "id": call_id, "type": "tool_call"}]
+        return text, tool_calls
+
+    @staticmethod
+    def _usage(messages, text):
+        # Whitespace tokens stand in for a tokenizer, so traces show counts
+        prompt = sum(len(tokens(m.content)) for m in messages if isinstance(m.content, str))
+        output = len(tokens(text))
+        return {"input_tokens": prompt, "output_tokens": output, "total_tokens": prompt + output}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, tool_calls = self._respond(messages)
+        time.sleep(self.first_token_latency + self.token_latency * len(tokens(text)))
+        message = AIMessage(content=text, tool_calls=tool_calls, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, tool_calls = self._respond(messages)
+        await asyncio.sleep(self.first_token_latency + self.token_latency * len(tokens(text)))
+        message = AIMessage(content=text, tool_calls=tool_calls, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, tool_calls = self._respond(messages)
+        time.sleep(self.first_token_latency)
+        for chunk in self._chunks(text, tool_calls, self._usage(messages, text)):
+            time.sleep(self.token_latency)
+            if run_manager and chunk.message.content:
+                run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, tool_calls = self._respond(messages)
+        await asyncio.sleep(self.first_token_latency)
+        for chunk in self._chunks(text, tool_calls, self._usage(messages, text)):
+            await asyncio.sleep(self.token_latency)
+            if run_manager and chunk.message.content:
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    @staticmethod
+    def _chunks(text, tool_calls, usage):
+        parts = tokens(text)
+        if tool_calls or not parts:
+            parts.append("")
+        # Usage (and any tool calls) ride on the last chunk
+        for i, token in enumerate(parts, 1):
+            if i < len(parts):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+                continue
+            chunks = [
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": n}
+                for n, c in enumerate(tool_calls)
+            ]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=token, tool_call_chunks=chunks, usage_metadata=usage)
+            )
+
+
+class FakeLLM(BaseLLM):
+    """CrewAI LLM answering from a ``Script``, in CrewAI's ReAct format.
+
+    Always gives a final answer (no tool use), sleeping like
+    ``FakeChatModel`` and emitting the same events as ``crewai.LLM``,
+    including one stream chunk per token when ``stream`` is set.
+    """
+
+    def __init__(self, script: Script, token_latency: float = 0.0, first_token_latency: float = 0.0,
+                 stream: bool = False, model: str = "fake"):
+        super().__init__(model=model, temperature=0)
+        self.script = script
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.stream = stream
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        crewai_event_bus.emit(
+            self,
+            event=LLMCallStartedEvent(
+                messages=messages, tools=tools, callbacks=callbacks,
+                available_functions=available_functions,
+            ),
+        )
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        text, _ = self.script.respond(prompt)
+        if "Final Answer:" not in text:
+            text = f"Thought: I now know the final answer\nFinal Answer: {text}"
+
+        time.sleep(self.first_token_latency)
+        if self.stream:
+            for token in tokens(text):
+                time.sleep(self.token_latency)
+                crewai_event_bus.emit(self, LLMStreamChunkEvent(chunk=token))
+        else:
+            time.sleep(self.token_latency * len(tokens(text)))
+        crewai_event_bus.emit(
+            self, event=LLMCallCompletedEvent(response=text, call_type=LLMCallType.LLM_CALL)
+        )
+        return text
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+def script_from_env() -> Script:
+    """``FAKE_LLM_SCRIPT`` (a JSON file of rules and replies), else the default."""
+    if path := os.environ.get("FAKE_LLM_SCRIPT"):
+        return Script.load(path)
+    return Script(**DEFAULT_SCRIPT)
+
+
+def _latencies():
+    return {
+        "token_latency": float(os.environ.get("FAKE_LLM_TOKEN_MS", "0")) / 1e3,
+        "first_token_latency": float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS", "0")) / 1e3,
+    }
+
+
+def chat_model_from_env() -> FakeChatModel:
+    return FakeChatModel(script=script_from_env(), **_latencies())
+
+
+def crew_llm_from_env(stream: bool = False) -> FakeLLM:
+    return FakeLLM(script_from_env(), stream=stream, **_latencies())
@@ -0,0 +1,99 @@
+import numpy as np
+
+# Columns of the ``financing_quotes`` table (supabase_schema.sql) filled in here
+COLUMNS = [
+    "vehicle_id", "vehicle_price", "down_payment", "loan_amount", "term_months",
+    "interest_rate", "monthly_payment",
+]
+
+
+def quote(prices, terms_months, rates_percent, down_payments=(0,), vehicle_ids=None) -> dict:
+    """Amortized loan quotes for every vehicle x term x rate x down payment.
+
+    ``rates_percent`` are annual rates (APR, e.g. 6.9). Down payments of at
+    most 1 are read as a fraction of the price, larger ones as dollars, and
+    never exceed the price. Returns flat columns named like
+    ``financing_quotes`` plus ``total_interest`` and ``total_cost``
+    (down payment plus all monthly payments), in vehicle, term, rate, down
+    payment order. All combinations are computed in one broadcast, so
+    thousands of quotes cost about as much as one.
+    """
+    prices = np.asarray(prices, dtype=np.float64)[:, None, None, None]
+    terms = np.asarray(terms_months, dtype=np.int64)[None, :, None, None]
+    rates = np.asarray(rates_percent, dtype=np.float64)[None, None, :, None]
+    downs = np.asarray(down_payments, dtype=np.float64)[None, None, None, :]
+    if (terms <= 0).any() or (rates < 0).any() or (downs < 0).any():
+        raise ValueError("terms must be positive; rates and down payments non-negative")
+
+    down = np.minimum(np.where(downs <= 1, downs * prices, downs), prices)
+    loan = prices - down
+    monthly_rate = rates / 1200
+    # Zero-rate loans divide evenly; elsewhere the standard annuity formula
+    growth = np.power(1 + monthly_rate, -terms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(
+            monthly_rate > 0, loan * monthly_rate / (1 - growth), loan / terms
+        )
+
+    shape = np.broadcast_shapes(prices.shape, terms.shape, rates.shape, downs.shape)
+    if vehicle_ids is None:
+        vehicle_ids = np.arange(shape[0])
+    vehicle_ids = np.asarray(vehicle_ids, dtype=object)[:, None, None, None]
+
+    def flat(values, decimals=None):
+        values = np.broadcast_to(values, shape).ravel()
+        return values.round(decimals) if decimals is not None else values
+
+    monthly_payment = flat(payment, 2)
+    term_months = flat(terms)
+    loan_amount = flat(loan, 2)
+    down_payment = flat(down, 2)
+    total_interest = (monthly_payment * term_months - loan_amount).round(2)
+    return {
+        "vehicle_id": flat(vehicle_ids),
+        "vehicle_price": flat(prices, 2),
+        "down_payment": down_payment,
+        "loan_amount": loan_amount,
+        "term_months": term_months,
+        "interest_rate": flat(rates, 3),
+        "monthly_payment": monthly_payment,
+        "total_interest": np.maximum(total_interest, 0),
+        "total_cost": (down_payment + monthly_payment * term_months).round(2),
+    }
+
+
+def as_rows(quotes: dict, columns=COLUMNS) -> list[dict]:
+    """Quotes as ``financing_quotes`` rows, ready to insert or serialize."""
+    return [
+        {name: value.item() if hasattr(value, "item") else value for name, value in zip(columns, row)}
+        for row in zip(*(quotes[name] for name in columns))
+    ]
+
+
+def compare(quotes: dict) -> list[dict]:
+    """Per vehicle, the quote with the lowest total cost and the one with
+    the lowest monthly payment, and the interest saved by the former over
+    the most expensive quote."""
+    ids = quotes["vehicle_id"]
+    summary = []
+    for vehicle_id in dict.fromkeys(ids):
+        rows = np.flatnonzero(ids == vehicle_id)
+        cheapest = rows[np.argmin(quotes["total_cost"][rows])]
+        lowest = rows[np.argmin(quotes["monthly_payment"][rows])]
+        summary.append({
+            "vehicle_id": vehicle_id,
+            "lowest_total_cost": _pick(quotes, cheapest),
+            "lowest_monthly_payment": _pick(quotes, lowest),
+            "interest_saved_vs_worst": round(
+                float(quotes["total_interest"][rows].max() - quotes["total_interest"][cheapest]), 2
+            ),
+        })
+    return summary
+
+
+def _pick(quotes, i) -> dict:
+    return {
+        name: column[i].item() if hasattr(column[i], "item") else column[i]
+        for name, column in quotes.items()
+        if name != "vehicle_id"
+    }
@@ -4,9 +4,11 @@ Flight Search Agent Module
 This module implements a flight search agent using Blaxel LangGraph integration.
 """
 
-from blaxel.langgraph import bl_model, bl_tools
+from blaxel.langgraph import bl_tools
 from langgraph.prebuilt import create_react_agent
 
+from .models import chat_model
+
 
 async def flight_agent_graph():
     """
@@ -28,7 +30,7 @@ async def flight_agent_graph():
         tools = []  # Graceful fallback
     
     # Use Blaxel model wrapper for optimized performance
-    model = await bl_model("sandbox-openai")
+    model = await chat_model("sandbox-openai")
     
     # Fix: Extract the underlying LangChain model for compatibility
     if hasattr(model, 'wrapped_model'):
@@ -1,6 +1,8 @@
-from blaxel.langgraph import bl_model, bl_tools
+from blaxel.langgraph import bl_tools
 from langgraph.prebuilt import create_react_agent
 
+from .models import chat_model
+
 
 async def agent():
     prompt = (
@@ -15,7 +17,7 @@ async def agent():
         tools = []  # Graceful fallback
     
     # Use Blaxel model wrapper - it handles optimization and caching
-    model = await bl_model("sandbox-openai")
+    model = await chat_model("sandbox-openai")
     
     # Fix: Extract the underlying LangChain model for compatibility
     if hasattr(model, 'wrapped_model'):
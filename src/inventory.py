@@ -0,0 +1,227 @@
+import json
+import os
+from functools import lru_cache
+from logging import getLogger
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+# Columns of the ``vehicles`` table (supabase_schema.sql) held by the engine
+NUMERIC = ["year", "price", "msrp", "sale_price", "mileage", "mpg_city", "mpg_highway"]
+CATEGORICAL = [
+    "make", "model", "body_type", "fuel_type", "drivetrain", "transmission",
+    "condition", "status", "exterior_color",
+]
+TEXT = ["id", "dealer_id", "vin", "trim"]
+FLAGS = ["is_on_sale", "certified_preowned", "one_owner", "accident_free"]
+INTEGER = {"year", "mileage", "mpg_city", "mpg_highway"}
+
+
+class Inventory:
+    """Columnar, read-only index over vehicle listings.
+
+    Numeric columns are float64 arrays with NaN for missing values, each
+    with a sorted permutation so a range filter is two binary searches.
+    Categorical columns are dictionary-encoded (case-insensitive) and
+    grouped by code, so equality is a slice as well. A query starts from
+    the smallest slice among its predicates and checks the rest on those
+    rows only. ``price`` filters and sorts on the effective price, the
+    sale price for listings on sale.
+    """
+
+    def __init__(self, columns: dict):
+        self.size = len(columns["year"])
+        self.numeric = {}
+        self._sorted = {}
+        for name in NUMERIC:
+            values = np.asarray(columns.get(name, np.full(self.size, np.nan)), dtype=np.float64)
+            self.numeric[name] = values
+        on_sale = np.asarray(columns.get("is_on_sale", np.zeros(self.size)), dtype=bool)
+        sale = self.numeric["sale_price"]
+        self.numeric["effective_price"] = np.where(
+            on_sale & ~np.isnan(sale), sale, self.numeric["price"]
+        )
+        for name, values in self.numeric.items():
+            order = np.argsort(values, kind="stable").astype(np.int32)
+            self._sorted[name] = (order, values[order])
+
+        self.codes = {}
+        self.categories = {}
+        self._groups = {}
+        for name in CATEGORICAL:
+            values = columns.get(name)
+            if values is None:
+                values = np.full(self.size, None, dtype=object)
+            # Dictionary-encode in one pass; np.unique sorts Python strings
+            index = {}
+            codes = np.fromiter(
+                (index.setdefault("" if v is None else str(v), len(index)) for v in values),
+                dtype=np.int32,
+                count=self.size,
+            )
+            categories = np.array(list(index), dtype=object)
+            self.categories[name] = categories
+            self.codes[name] = codes
+            lookup = {}
+            for code, label in enumerate(categories):
+                lookup.setdefault(label.lower(), []).append(code)
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            self._groups[name] = (lookup, order, bounds)
+
+        self.text = {
+            name: np.asarray(columns.get(name, np.full(self.size, None)), dtype=object)
+            for name in TEXT
+        }
+        self.flags = {
+            name: np.asarray(columns.get(name, np.zeros(self.size)), dtype=bool)
+            for name in FLAGS
+        }
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "Inventory":
+        """Build from rows shaped like the ``vehicles`` table."""
+        columns = {}
+        for name in NUMERIC:
+            columns[name] = [_number(row.get(name)) for row in rows]
+        for name in CATEGORICAL + TEXT:
+            columns[name] = [row.get(name) for row in rows]
+        for name in FLAGS:
+            columns[name] = [bool(row.get(name)) for row in rows]
+        columns["status"] = [row.get("status") or "available" for row in rows]
+        return cls(columns)
+
+    def search(
+        self,
+        *,
+        make: str | None = None,
+        model: str | None = None,
+        body_type: str | None = None,
+        fuel_type: str | None = None,
+        condition: str | None = None,
+        status: str | None = "available",
+        year_min: int | None = None,
+        year_max: int | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+        mileage_max: int | None = None,
+        sort: str = "price",
+        descending: bool = False,
+        limit: int = 10,
+    ) -> dict:
+        """Listings matching every given filter, ``limit`` at a time.
+
+        Returns the number of matches and the first ``limit`` listings
+        ordered by ``sort`` (price, year or mileage).
+        """
+        equal = {
+            "make": make,
+            "model": model,
+            "body_type": body_type,
+            "fuel_type": fuel_type,
+            "condition": condition,
+            "status": status,
+        }
+        ranges = {
+            "year": (year_min, year_max),
+            "effective_price": (price_min, price_max),
+            "mileage": (None, mileage_max),
+        }
+        slices = [self._equal(name, value) for name, value in equal.items() if value]
+        slices += [
+            self._range(name, low, high)
+            for name, (low, high) in ranges.items()
+            if low is not None or high is not None
+        ]
+        if slices:
+            # Re-checking the predicate the seed slice came from is cheap
+            # and keeps this loop simple
+            rows = min(slices, key=len)
+            for name, value in equal.items():
+                if value:
+                    codes = self._groups[name][0].get(value.lower(), [])
+                    column = self.codes[name][rows]
+                    keep = column == codes[0] if len(codes) == 1 else np.isin(column, codes)
+                    rows = rows[keep]
+            for name, (low, high) in ranges.items():
+                values = self.numeric[name][rows]
+                if low is not None and high is not None:
+                    rows = rows[(values >= low) & (values <= high)]
+                elif low is not None:
+                    rows = rows[values >= low]
+                elif high is not None:
+                    rows = rows[values <= high]
+        else:
+            rows = np.arange(self.size, dtype=np.int32)
+
+        total = len(rows)
+        key = self.numeric["effective_price" if sort == "price" else sort][rows]
+        if descending:
+            key = -key
+        if total > limit:
+            top = np.argpartition(key, limit)[:limit]
+            rows, key = rows[top], key[top]
+        rows = rows[np.argsort(key, kind="stable")]
+        return {"total": total, "vehicles": [self.row(i) for i in rows]}
+
+    def row(self, i: int) -> dict:
+        row = {name: self.text[name][i] for name in TEXT}
+        for name in CATEGORICAL:
+            row[name] = self.categories[name][self.codes[name][i]] or None
+        for name in NUMERIC:
+            value = self.numeric[name][i]
+            if np.isnan(value):
+                row[name] = None
+            else:
+                row[name] = int(value) if name in INTEGER else value.item()
+        for name in FLAGS:
+            row[name] = bool(self.flags[name][i])
+        return row
+
+    def _equal(self, name, value):
+        lookup, order, bounds = self._groups[name]
+        return np.concatenate(
+            [order[bounds[c] : bounds[c + 1]] for c in lookup.get(value.lower(), [])]
+            or [np.empty(0, dtype=np.int32)]
+        )
+
+    def _range(self, name, low, high):
+        order, values = self._sorted[name]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return order[start:stop]
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def read_rows(path: str) -> list[dict]:
+    """Read a JSON array or JSON-lines export of the ``vehicles`` table."""
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def load(path: str) -> Inventory:
+    return Inventory.from_rows(read_rows(path))
+
+
+@lru_cache(maxsize=None)
+def inventory() -> Inventory | None:
+    """The listings exported to ``INVENTORY_PATH``, loaded on first use."""
+    path = os.environ.get("INVENTORY_PATH")
+    if not path:
+        return None
+    try:
+        loaded = load(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load inventory from {path}: {e}", exc_info=e)
+        return None
+    logger.info(f"Loaded {loaded.size} vehicles from {path}")
+    return loaded
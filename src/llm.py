@@ -0,0 +1,34 @@
+from crewai import LLM
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+
+from . import tracing
+from .llm_cache import cache_key
+
+
+class CachedLLM(LLM):
+    """CrewAI ``LLM`` that answers repeated prompts from an ``LLMCache``.
+
+    Only plain completions are cached: calls that may run native function
+    tools always go to the model. A hit while streaming is emitted as one
+    chunk so streaming listeners still see the text.
+    """
+
+    def __init__(self, *args, cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        if self.cache is None or tools or available_functions:
+            return super().call(messages, tools, callbacks, available_functions)
+
+        key = cache_key(self._prepare_completion_params(messages))
+        if (cached := self.cache.get(key)) is not None:
+            tracing.cache_hit("llm", self.model)
+            if self.stream:
+                crewai_event_bus.emit(self, LLMStreamChunkEvent(chunk=cached))
+            return cached
+
+        result = super().call(messages, tools, callbacks, available_functions)
+        if isinstance(result, str) and result:
+            self.cache.set(key, result)
+        return result
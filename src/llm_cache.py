@@ -0,0 +1,173 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from logging import getLogger
+from time import time
+
+logger = getLogger(__name__)
+
+# Requests sending this header skip cached completions; fresh ones are stored
+BYPASS_HEADER = "X-LLM-Cache"
+bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+# Completion params that don't change what the model returns
+_UNKEYED = {"api_key", "stream", "stream_options", "callbacks", "timeout"}
+
+
+def cache_key(params: dict) -> str:
+    """Hash of the model, sampling parameters and full message list."""
+    keyed = {k: v for k, v in params.items() if k not in _UNKEYED and v is not None}
+    payload = json.dumps(keyed, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class MemoryStore:
+    """LRU map of key -> (completion, expires at), capped at ``max_entries``."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteStore:
+    """On-disk store shared by workers and kept across restarts."""
+
+    # Expired rows are deleted once every this many writes
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+        atexit.register(self.close)
+
+    def get(self, key: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM completions WHERE key = ? AND expires > ?",
+                (key, time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?)",
+                (key, value, time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self.conn.execute("DELETE FROM completions WHERE expires <= ?", (time(),))
+
+    def close(self):
+        with self._lock:
+            try:
+                self.conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # already closed
+
+
+class LLMCache:
+    """Exact-match prompt -> completion cache over one or more stores.
+
+    Stores are checked in order and a hit is copied into the stores before
+    it, so a disk hit warms the in-memory LRU. Any object with
+    ``get(key)`` and ``set(key, value, ttl)`` can serve as a store.
+    """
+
+    def __init__(self, stores: list, ttl_seconds: float = 3600):
+        self.stores = stores
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+
+    def get(self, key: str):
+        if bypass.get():
+            self.bypassed += 1
+            return None
+        for i, store in enumerate(self.stores):
+            try:
+                value = store.get(key)
+            except sqlite3.Error as e:
+                self._store_failed(e)
+                continue
+            if value is not None:
+                self.hits += 1
+                for earlier in self.stores[:i]:
+                    earlier.set(key, value, self.ttl_seconds)
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        for store in self.stores:
+            try:
+                store.set(key, value, self.ttl_seconds)
+            except sqlite3.Error as e:
+                self._store_failed(e)
+
+    def _store_failed(self, e):
+        # A cache is never worth failing a request over
+        self.errors += 1
+        logger.error(f"LLM cache store failed: {e}", exc_info=e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": len(self.stores[0]) if isinstance(self.stores[0], MemoryStore) else None,
+        }
+
+
+def cache_from_env():
+    """Build the cache configured by ``LLM_CACHE*``; None when disabled."""
+    if os.environ.get("LLM_CACHE", "true").lower() != "true":
+        return None
+    stores = [MemoryStore(int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024")))]
+    if path := os.environ.get("LLM_CACHE_PATH"):
+        stores.append(SqliteStore(path))
+    return LLMCache(stores, float(os.environ.get("LLM_CACHE_TTL_SECONDS", "3600")))
+
+
+cache = cache_from_env()
@@ -1,29 +1,89 @@
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from logging import getLogger
+from time import perf_counter
+
+from importlib import import_module
 
-from copilotkit import CopilotKitRemoteEndpoint, LangGraphAgent
-from copilotkit.crewai import CrewAIAgent
-from copilotkit.integrations.fastapi import add_fastapi_endpoint
 from fastapi import FastAPI
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from fastapi.responses import PlainTextResponse
 
-from .agent import agent
-from .vehicle import agent as vehicle_agent
-from .dealer import agent as dealer_agent
-from .server.error import init_error_handlers
+# Keep this import list light: crewai, langgraph, copilotkit and OpenTelemetry
+# load on first use so scale-to-zero cold starts answer /healthz quickly
+from .admission import admission
+from .crew import executor as crew_executor, pools as crew_pools
+from .llm_cache import cache as llm_cache
+from .server.error import error_log, init_error_handlers
+from .server.logs import setup_logging, state as log_state, stop_logging
+from .server.metrics import metrics as request_metrics, watch_event_loop
 from .server.middleware import init_middleware
+from .server.telemetry import instrument_app, load_telemetry
 
 logger = getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Records are queued here and written out by a background thread
+    setup_logging()
     # Use system PORT variable
     port = os.environ.get("PORT", "8080")
     logger.info(f"Server running on port {port}")
     try:
+        lag_watcher = asyncio.create_task(watch_event_loop(request_metrics, LAG_INTERVAL))
+        if BACKGROUND_STARTUP:
+            # Serve /healthz while the agent frameworks import and build
+            starting = asyncio.create_task(start_agents(app))
+        else:
+            await start_agents(app)
+
+        yield
+        logger.info("Server shutting down")
+        if BACKGROUND_STARTUP:
+            starting.cancel()
+        lag_watcher.cancel()
+        if sweeper := getattr(app.state, "checkpoint_sweeper", None):
+            sweeper.cancel()
+        crew_executor.shutdown()
+    except Exception as e:
+        logger.error(f"Error during startup: {str(e)}", exc_info=True)
+        raise
+    finally:
+        stop_logging()
+
+
+BACKGROUND_STARTUP = os.environ.get("BACKGROUND_STARTUP", "true").lower() == "true"
+# Seconds between event loop lag checks
+LAG_INTERVAL = float(os.environ.get("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+
+async def start_agents(app: FastAPI):
+    try:
+        # Import the heavy frameworks on a worker thread so the loop stays live
+        start = perf_counter()
+        await asyncio.to_thread(load_telemetry)
+        instrument_app(app)
+        await asyncio.to_thread(import_module, ".agent", __package__)
+        logger.info(f"Agent frameworks imported in {(perf_counter() - start) * 1000:.0f}ms")
+        from copilotkit.integrations.fastapi import add_fastapi_endpoint
+
+        from . import tracing
+        from .agent import checkpointer
+        from .checkpoint import BoundedMemorySaver
+        from .semantic_cache import caches as semantic_caches
+
+        tracing.install()
+        app.state.trace_buffer = tracing.buffer()
+        app.state.checkpointer = checkpointer
+        app.state.semantic_caches = semantic_caches
+        # Free idle checkpoint threads even when no requests arrive
+        if isinstance(checkpointer, BoundedMemorySaver):
+            app.state.checkpoint_sweeper = asyncio.create_task(
+                checkpointer.sweep_forever()
+            )
+
         # Initialize the SDK
         sdk = await get_sdk()
 
@@ -37,39 +97,104 @@ async def lifespan(app: FastAPI):
         except Exception as copilot_error:
             logger.error(f"Failed to add CopilotKit endpoint: {str(copilot_error)}")
             # Continue without CopilotKit endpoint - base agent still works
-
-        yield
-        logger.info("Server shutting down")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}", exc_info=True)
-        raise
+        if not BACKGROUND_STARTUP:
+            raise
+
+
+# (name, description, module whose agent() builds it) served over CopilotKit
+AGENTS = [
+    ("automotive-supervisor", "Find your perfect vehicle", "agent"),
+    ("vehicle-agent", "Search and analyze vehicles", "vehicle"),
+    ("dealer-agent", "Find dealers and schedule test drives", "dealer"),
+]
+
+# Agents named here are built on the first CopilotKit request instead of at boot
+LAZY_AGENTS = {
+    name.strip() for name in os.environ.get("LAZY_AGENTS", "").split(",") if name.strip()
+}
+
+
+async def timed(timings: dict, name: str, coro):
+    start = perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[name] = perf_counter() - start
+
+
+def log_timings(label: str, timings: dict, total: float):
+    report = " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items())
+    logger.info(f"{label}: {report} total={total * 1000:.0f}ms")
 
 
 # Create the SDK after the graph is initialized
 async def get_sdk():
-    supervisor = await agent()
-    vehicle = await vehicle_agent()
-    dealer = await dealer_agent()
-    sdk = CopilotKitRemoteEndpoint(
-        agents=[
-            LangGraphAgent(
-                name="automotive-supervisor", 
-                description="Find your perfect vehicle", 
-                graph=supervisor
-            ),
-            LangGraphAgent(
-                name="vehicle-agent", 
-                description="Search and analyze vehicles", 
-                graph=vehicle
-            ),
-            LangGraphAgent(
-                name="dealer-agent", 
-                description="Find dealers and schedule test drives", 
-                graph=dealer
-            ),
-        ],
-    )
-    return sdk
+    from copilotkit import CopilotKitRemoteEndpoint, LangGraphAgent
+
+    from .dealer import crews as dealer_crews
+    from .dealer_index import dealer_index
+    from .deferred import DeferredAgent, DeferredBuild
+    from .inventory import inventory
+    from .text_index import text_index
+    from .vehicle import crews as vehicle_crews
+
+    built = {}
+
+    async def build(specs, label):
+        timings = {}
+        start = perf_counter()
+
+        async def build_one(name, description, module):
+            factory = import_module(f".{module}", __package__).agent
+            graph = await timed(timings, name, factory())
+            built[name] = LangGraphAgent(name=name, description=description, graph=graph)
+
+        # Independent agents build concurrently; warm crews ride along so the
+        # first turn skips crew construction
+        await asyncio.gather(
+            *(build_one(*spec) for spec in specs),
+            timed(timings, "vehicle-crew-pool", vehicle_crews.warm(1)),
+            timed(timings, "dealer-crew-pool", dealer_crews.warm(1)),
+            timed(timings, "inventory", asyncio.to_thread(inventory)),
+            timed(timings, "dealer-index", asyncio.to_thread(dealer_index)),
+            timed(timings, "text-index", asyncio.to_thread(text_index)),
+        )
+        log_timings(label, timings, perf_counter() - start)
+
+    await build([a for a in AGENTS if a[0] not in LAZY_AGENTS], "Startup timings")
+
+    deferred = [a for a in AGENTS if a[0] in LAZY_AGENTS]
+
+    async def build_deferred():
+        try:
+            await build(deferred, "Deferred agent timings")
+        except Exception as e:
+            logger.error(f"Failed to build deferred agents: {str(e)}", exc_info=e)
+            raise
+
+    deferred_build = DeferredBuild(build_deferred)
+
+    async def resolve(name):
+        await deferred_build.wait()
+        return built[name]
+
+    placeholders = {
+        name: DeferredAgent(name=name, description=description, resolve=resolve)
+        for name, description, _ in deferred
+    }
+
+    def agents(context):
+        if deferred and not deferred_build.started:
+            # Called from the request handler on the event loop; requests for
+            # a deferred agent wait on this build through its placeholder
+            logger.info(f"Building deferred agents: {', '.join(a[0] for a in deferred)}")
+            deferred_build.start()
+        return [built.get(name) or placeholders[name] for name, _, _ in AGENTS
+                if name in built or name in placeholders]
+
+    return CopilotKitRemoteEndpoint(agents=agents)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -95,6 +220,44 @@ async def agent_endpoint(request: dict):
 async def health():
     return {"status": "ok", "service": "copilotkit-agent", "timestamp": os.environ.get("DEPLOYMENT_ID", "local")}
 
+# Runtime counters for monitoring
+@app.get("/stats")
+async def stats():
+    checkpointer = getattr(app.state, "checkpointer", None)
+    return {
+        "admission": admission.stats() if admission else None,
+        "crews": crew_executor.stats(),
+        "crew_pools": {name: pool.stats() for name, pool in crew_pools.items()},
+        "errors": error_log.stats(),
+        "logging": log_state.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "semantic_caches": {
+            name: cache.stats()
+            for name, cache in getattr(app.state, "semantic_caches", {}).items()
+        },
+        # Off the event loop: the SQLite saver may be mid-flush under its lock
+        "checkpoints": await asyncio.to_thread(checkpointer.stats) if checkpointer else None,
+    }
+
+# Prometheus scrape target: per-route latency, statuses, in-flight, loop lag
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Recent agent spans (TRACE_EXPORTER=memory) and their latency/token summary
+@app.get("/traces")
+async def traces(limit: int = 200):
+    buffer = getattr(app.state, "trace_buffer", None)
+    if buffer is None:
+        return {"spans": [], "summary": {}}
+    from .tracing import span_dict, summarize
+
+    spans = buffer.spans()
+    return {
+        "spans": [span_dict(span) for span in spans[-limit:]],
+        "summary": summarize(spans),
+    }
+
 # Add manual CopilotKit endpoint as fallback
 @app.post("/copilotkit")
 async def copilotkit_fallback():
@@ -123,8 +286,6 @@ async def copilotkit_fallback():
         logger.error(f"CopilotKit fallback error: {str(e)}")
         return {"error": "CopilotKit endpoint unavailable", "details": str(e)}
 
-FastAPIInstrumentor.instrument_app(app, exclude_spans=["receive", "send"])
-
 
 # Add main entry point for proper port binding
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+import os
+
+# blaxel: the workspace's models through bl_model; fake: scripted local
+# answers (src/fake_llm.py) for offline benchmarks
+BACKEND = os.environ.get("LLM_BACKEND", "blaxel").lower()
+
+
+async def chat_model(name: str = "sandbox-openai"):
+    """Chat model for the LangGraph agents, per ``LLM_BACKEND``."""
+    if BACKEND == "fake":
+        from .fake_llm import chat_model_from_env
+
+        return chat_model_from_env()
+    from blaxel.langgraph import bl_model
+
+    return await bl_model(name)
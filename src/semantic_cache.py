@@ -0,0 +1,228 @@
+import os
+import re
+import unicodedata
+import zlib
+from logging import getLogger
+from time import time
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+# Domain words folded together before hashing, so rewordings of the same
+# question land on the same features
+SYNONYMS = {
+    "affordable": "cheap",
+    "budget": "cheap",
+    "inexpensive": "cheap",
+    "low-cost": "cheap",
+    "dependable": "reliable",
+    "automobile": "car",
+    "vehicle": "car",
+    "auto": "car",
+    "cars": "car",
+    "vehicles": "car",
+    "suvs": "suv",
+    "sedans": "sedan",
+    "trucks": "truck",
+    "pickup": "truck",
+    "dealership": "dealer",
+    "dealerships": "dealer",
+    "dealers": "dealer",
+    "near": "nearby",
+    "close": "nearby",
+}
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "you", "is", "are", "am", "be",
+    "for", "to", "of", "in", "on", "and", "or", "with", "some", "any",
+    "please", "can", "could", "would", "want", "need", "looking", "find",
+    "show", "get", "what", "which", "do", "does", "good", "best",
+}
+# Words naming what is asked about: requests differing in any of them want
+# different answers, however similar the rest
+ENTITY_WORDS = {
+    # makes
+    "acura", "audi", "bmw", "buick", "cadillac", "chevrolet", "chevy", "chrysler",
+    "dodge", "fiat", "ford", "genesis", "gmc", "honda", "hyundai", "infiniti",
+    "jaguar", "jeep", "kia", "lexus", "lincoln", "lucid", "mazda", "mercedes",
+    "mini", "mitsubishi", "nissan", "polestar", "porsche", "ram", "rivian",
+    "subaru", "tesla", "toyota", "volkswagen", "volvo", "vw",
+    # body, fuel, drivetrain and condition
+    "suv", "sedan", "truck", "coupe", "convertible", "hatchback", "minivan",
+    "van", "wagon", "crossover", "electric", "ev", "hybrid", "plug-in",
+    "diesel", "gas", "gasoline", "awd", "4wd", "fwd", "rwd", "new", "used",
+    "certified", "manual", "automatic",
+    # colours
+    "black", "white", "silver", "gray", "grey", "red", "blue", "green",
+}
+# Words after these name a place
+PLACE_WORDS = {"in", "nearby", "around", "at", "from"}
+_TOKEN = re.compile(r"[a-z0-9$][a-z0-9$.\-]*")
+_CASED_TOKEN = re.compile(r"[A-Za-z0-9$][A-Za-z0-9$.\-]*")
+_NUMBER = re.compile(r"\d")
+_SENTENCE_END = re.compile(r"[.!?]\s+")
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercased, synonym-folded content words of ``text``, sorted."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    words = (SYNONYMS.get(w, w) for w in _TOKEN.findall(text))
+    return sorted({w.rstrip(".") for w in words if w not in STOPWORDS})
+
+
+def entities(text: str) -> tuple:
+    """Words a matching request must share exactly, sorted: numbers, vehicle
+    attributes (``ENTITY_WORDS``) and places (words after "in", "near"...,
+    and capitalized words within a sentence)."""
+    found = set()
+    for sentence in _SENTENCE_END.split(unicodedata.normalize("NFKC", text)):
+        after_place = False
+        for i, token in enumerate(_CASED_TOKEN.findall(sentence)):
+            word = token.lower().rstrip(".")
+            word = SYNONYMS.get(word, word)
+            if word.endswith("s") and word[:-1] in ENTITY_WORDS:
+                word = word[:-1]
+            if word in PLACE_WORDS:
+                after_place = True
+                continue
+            if word not in STOPWORDS and (
+                _NUMBER.search(word) or word in ENTITY_WORDS or after_place
+                or (i and token[0].isupper())
+            ):
+                found.add(word)
+            after_place = after_place and word in STOPWORDS
+    return tuple(sorted(found))
+
+
+def vectorize(words: list[str], dim: int) -> np.ndarray:
+    """Unit-length signed hashing of words and their character trigrams."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in words:
+        grams = [f"<{word}>"[i : i + 3] for i in range(len(word))]
+        features = [(word, 1.0)] + [(g, 0.5 / len(grams)) for g in grams]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode())
+            vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Answers near-duplicate requests from earlier crew runs.
+
+    Requests are vectorized locally and matched by cosine similarity against
+    up to ``max_entries`` cached requests held in one matrix, grown as
+    entries are added. Requests only match when they mention exactly the
+    same ``entities`` (numbers, makes, body types, places...), since "under
+    $30k" and "under $40k", or Denver and Boulder, differ in one token but
+    want different answers. The least recently used entry is replaced when
+    full, and entries expire after ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        threshold: float = 0.97,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        dim: int = 4096,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.dim = dim
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._expires = np.zeros(0)  # 0 marks a free slot
+        self._last_used = np.zeros(0)
+        self._entities: list = []
+        self._answers: list = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, request: str):
+        """The cached answer for a near-duplicate of ``request``, if any."""
+        words = normalize(request)
+        found = entities(request)
+        now = time()
+        live = self._expires > now
+        candidates = np.flatnonzero(live)
+        candidates = [i for i in candidates if self._entities[i] == found]
+        if candidates:
+            scores = self._vectors[candidates] @ vectorize(words, self.dim)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                slot = candidates[best]
+                self._last_used[slot] = now
+                self.hits += 1
+                return self._answers[slot]
+        self.misses += 1
+        return None
+
+    def put(self, request: str, answer):
+        words = normalize(request)
+        if not words:
+            return
+        now = time()
+        free = np.flatnonzero(self._expires <= now)
+        if len(free):
+            slot = int(free[0])
+        elif len(self._expires) < self.max_entries:
+            slot = len(self._expires)
+            self._grow()
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+        self._vectors[slot] = vectorize(words, self.dim)
+        self._expires[slot] = now + self.ttl_seconds
+        self._last_used[slot] = now
+        self._entities[slot] = entities(request)
+        self._answers[slot] = answer
+
+    def _grow(self):
+        # Doubling keeps copies rare without preallocating max_entries rows
+        size = min(max(2 * len(self._expires), 16), self.max_entries)
+        added = size - len(self._expires)
+        self._vectors = np.concatenate([self._vectors, np.zeros((added, self.dim), dtype=np.float32)])
+        self._expires = np.concatenate([self._expires, np.zeros(added)])
+        self._last_used = np.concatenate([self._last_used, np.zeros(added)])
+        self._entities += [None] * added
+        self._answers += [None] * added
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": int((self._expires > time()).sum()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+# agent name -> SemanticCache, for monitoring
+caches = {}
+
+# Agents whose answers may be reused; crews with side effects (e.g. booking
+# test drives) should stay out
+AGENTS = {
+    name.strip()
+    for name in os.environ.get("SEMANTIC_CACHE_AGENTS", "").split(",")
+    if name.strip()
+}
+
+
+def cache_for(name: str):
+    """The semantic cache for agent ``name``, or None if it hasn't opted in."""
+    if name not in AGENTS:
+        return None
+    if name not in caches:
+        caches[name] = SemanticCache(
+            name,
+            threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.97")),
+            max_entries=int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+        )
+    return caches[name]
@@ -1,16 +1,78 @@
 import logging
+import os
+from collections import OrderedDict
+from time import monotonic
 
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
+from ..admission import RateLimiter
+from .metrics import route_for
+
 logger = logging.getLogger(__name__)
 
 
+class ErrorLog:
+    """Logs each distinct error once per ``window`` seconds.
+
+    Errors are told apart by exception type, message and route. Repeats
+    within the window are counted and reported with the next occurrence
+    after it; at most ``per_minute`` lines are written in all, so an error
+    storm cannot flood the log.
+    """
+
+    def __init__(self, window: float = 60.0, per_minute: float = 60, max_keys: int = 1024, clock=monotonic):
+        self.window = window
+        self.limiter = RateLimiter(per_minute / 60, per_minute, clock=clock)
+        self.max_keys = max_keys
+        self.clock = clock
+        self._seen: OrderedDict[tuple, list] = OrderedDict()  # key -> [logged at, repeats]
+        self.logged = 0
+        self.suppressed = 0
+
+    def log(self, level: int, request: Request, e: Exception, exc_info: bool = False):
+        key = (type(e).__name__, str(e)[:200], route_for(request.scope))
+        now = self.clock()
+        seen = self._seen.get(key)
+        if seen is not None and now - seen[0] < self.window:
+            seen[1] += 1
+            self.suppressed += 1
+            return
+        repeats = seen[1] if seen else 0
+        if self.limiter.take("all"):
+            # Still unlogged: the next occurrence reports this one as a repeat
+            self._remember(key, seen[0] if seen else now - self.window, repeats + 1)
+            self.suppressed += 1
+            return
+        self._remember(key, now, 0)
+        self.logged += 1
+        suffix = f" (repeated {repeats} times since last logged)" if repeats else ""
+        logger.log(
+            level, f"Error during request {request.method} {request.url.path}: {e}{suffix}",
+            exc_info=e if exc_info else None,
+        )
+
+    def _remember(self, key, logged_at, repeats):
+        self._seen[key] = [logged_at, repeats]
+        self._seen.move_to_end(key)
+        if len(self._seen) > self.max_keys:
+            self._seen.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"logged": self.logged, "suppressed": self.suppressed}
+
+
+error_log = ErrorLog(
+    float(os.environ.get("ERROR_LOG_WINDOW_SECONDS", "60")),
+    float(os.environ.get("ERROR_LOG_PER_MINUTE", "60")),
+)
+
+
 def init_error_handlers(app: FastAPI):
     @app.exception_handler(Exception)
     async def exception_handler(request: Request, e: Exception):
-        logger.error(f"Error during request: {e}", exc_info=e)
+        error_log.log(logging.ERROR, request, e, exc_info=True)
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=jsonable_encoder({"error": str(e)}),
@@ -18,7 +80,9 @@ def init_error_handlers(app: FastAPI):
 
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, e: HTTPException):
-        logger.error(f"Error during request: {e}", exc_info=e)
+        # Raised on purpose; a traceback only helps for server errors
+        server_error = e.status_code >= 500
+        error_log.log(logging.ERROR if server_error else logging.WARNING, request, e, exc_info=server_error)
         return JSONResponse(
             status_code=e.status_code,
             content=jsonable_encoder({"error": str(e)}),
@@ -0,0 +1,131 @@
+"""
+Logging off the request path: handlers only queue records, and a
+background thread formats them (as JSON lines by default) and writes them
+out. A slow stdout consumer then stalls the writer thread, not requests.
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgi_correlation_id import correlation_id
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "true").lower() == "true"
+QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+# Servers' own loggers, which don't propagate to the root logger
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+# Record attributes that aren't ``extra`` fields (uvicorn adds color_message)
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "request_id", "color_message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id,
+    traceback and any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Queues records for a ``QueueListener``; drops them when the queue is
+    full rather than blocking the caller.
+
+    Only the message is merged here, so arguments are captured as they were;
+    tracebacks are formatted on the writer thread.
+    """
+
+    def __init__(self, queue_):
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = correlation_id.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Logging:
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+
+    def stats(self) -> dict | None:
+        if self.handler is None:
+            return None
+        return {"queued": self.handler.queue.qsize(), "dropped": self.handler.dropped}
+
+
+state = _Logging()
+
+
+def writer(stream=None, log_format: str = LOG_FORMAT) -> logging.Handler:
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    return handler
+
+
+def setup_logging(stream=None, log_format: str = LOG_FORMAT, level: str = LOG_LEVEL,
+                  use_queue: bool = LOG_ASYNC, queue_size: int = QUEUE_SIZE):
+    """Route the root and server loggers to one writer, through a queue and
+    background thread unless ``use_queue`` is off. Pair with ``stop_logging``.
+    """
+    stop_logging()
+    handler = output = writer(stream, log_format)
+    if use_queue:
+        handler = AsyncQueueHandler(queue.Queue(queue_size))
+        state.handler = handler
+        # respect_handler_level: the writer's level applies on the writer thread
+        state.listener = QueueListener(handler.queue, output, respect_handler_level=True)
+        state.listener.start()
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    for name in SERVER_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.propagate = False
+    # Requests are logged, sampled, by the metrics middleware
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread; later records are
+    written directly."""
+    if state.listener is not None:
+        state.listener.stop()
+        (output,) = state.listener.handlers
+        for logger in [logging.getLogger()] + [logging.getLogger(name) for name in SERVER_LOGGERS]:
+            logger.handlers = [output if h is state.handler else h for h in logger.handlers]
+    state.handler = state.listener = None
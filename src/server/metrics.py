@@ -0,0 +1,167 @@
+"""
+Request metrics for the agent server in the Prometheus text format, served
+at /metrics: latency histograms, status counters and in-flight gauges per
+route, and event loop lag. Kept in-process and updated from the event loop
+only, so plain dicts suffice and no client library is needed.
+"""
+
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from time import perf_counter
+
+from starlette.routing import Match
+
+from ..admission import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds; agent turns run to tens of seconds, probes to milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+UNMATCHED = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str):
+        sep = "," if labels else ""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound}"}} {total}'
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def route_for(scope) -> str:
+    """The path template of the route ``scope`` is for, keeping label
+    cardinality bounded whatever paths clients send."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match is not Match.NONE:
+            return route.path
+    return UNMATCHED
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.latency: dict[tuple, Histogram] = {}
+        self.responses: dict[tuple, int] = {}
+        self.in_flight: dict[tuple, int] = {}
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.loop_lag_last = 0.0
+
+    def started(self, method: str, route: str):
+        key = (method, route)
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        self.in_flight[key] -= 1
+        if (histogram := self.latency.get(key)) is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        key = (method, route, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def lagged(self, seconds: float):
+        self.loop_lag_last = seconds
+        self.loop_lag.observe(seconds)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Time from request received to response fully sent.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines.extend(histogram.samples("http_request_duration_seconds", _labels(method=method, route=route)))
+        lines += [
+            "# HELP http_responses_total Responses sent, by status code.",
+            "# TYPE http_responses_total counter",
+        ]
+        for (method, route, status), count in sorted(self.responses.items()):
+            lines.append(f"http_responses_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for (method, route), count in sorted(self.in_flight.items()):
+            lines.append(f"http_requests_in_flight{{{_labels(method=method, route=route)}}} {count}")
+        lines += [
+            "# HELP event_loop_lag_seconds How late the event loop ran a timer, per check.",
+            "# TYPE event_loop_lag_seconds histogram",
+            *self.loop_lag.samples("event_loop_lag_seconds", ""),
+            "# HELP event_loop_lag_last_seconds Lag measured by the latest check.",
+            "# TYPE event_loop_lag_last_seconds gauge",
+            f"event_loop_lag_last_seconds {self.loop_lag_last}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+async def watch_event_loop(metrics: RequestMetrics, interval: float = 0.5):
+    """Measure how much later than asked the loop wakes a sleeping task;
+    anything blocking the loop shows up here before it shows in latency."""
+    while True:
+        start = perf_counter()
+        await asyncio.sleep(interval)
+        metrics.lagged(max(perf_counter() - start - interval, 0.0))
+
+
+class AccessLog:
+    """Request log lines, at most ``per_second`` a second (0: none).
+
+    Server errors and requests slower than ``slow`` seconds are always
+    logged. The number of lines skipped is reported on the next one, so
+    a busy server logs a steady trickle instead of a line per request.
+    """
+
+    def __init__(self, per_second: float = 20, slow: float = 10.0):
+        self.limiter = RateLimiter(per_second, max(per_second, 1)) if per_second > 0 else None
+        self.slow = slow
+        self.skipped = 0
+
+    def log(self, method: str, path: str, status: int, seconds: float, request_id: str | None):
+        important = status >= 500 or seconds >= self.slow
+        if not important and (self.limiter is None or self.limiter.take("")):
+            self.skipped += 1
+            return
+        line = f"{method} {path} {status} {seconds * 1000:.2f}ms rid={request_id}"
+        if self.skipped:
+            line += f" (+{self.skipped} not logged)"
+            self.skipped = 0
+        if status >= 500:
+            logger.error(line)
+        elif status >= 400:
+            logger.warning(line)
+        else:
+            logger.info(line)
+
+
+metrics = RequestMetrics()
+access_log = AccessLog(
+    float(os.environ.get("ACCESS_LOG_PER_SECOND", "20")),
+    float(os.environ.get("ACCESS_LOG_SLOW_MS", "10000")) / 1000,
+)
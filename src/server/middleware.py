@@ -1,35 +1,116 @@
 import logging
-from time import time
+import math
+from time import perf_counter
 
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+from ..admission import THREAD_HEADER, Rejected, admission, client_key
+from ..llm_cache import BYPASS_HEADER, bypass
+from .metrics import access_log, metrics, route_for
 
 logger = logging.getLogger(__name__)
 
 
+class AdmissionMiddleware:
+    """Admission control for POSTs (agent runs); see ``src.admission``.
+
+    Plain ASGI so the slot is held until a streamed response has been sent
+    in full, not just until its headers are ready.
+    """
+
+    def __init__(self, app, controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        try:
+            await self.controller.acquire(
+                client_key(headers, client[0] if client else None), headers.get(THREAD_HEADER)
+            )
+        except Rejected as e:
+            response = JSONResponse(
+                {"error": str(e)},
+                status_code=429,
+                headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))},
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+class MetricsMiddleware:
+    """Per-route latency, status and in-flight metrics plus the access log.
+
+    Plain ASGI so the clock stops when a streamed response's last chunk is
+    sent, not when its headers are ready.
+    """
+
+    def __init__(self, app, metrics=metrics, access_log=access_log):
+        self.app = app
+        self.metrics = metrics
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = perf_counter()
+        method, route = scope["method"], route_for(scope)
+        status = 500
+        request_id = None
+
+        async def send_wrapper(message):
+            nonlocal status, request_id
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = Headers(raw=message.get("headers", []))
+                request_id = headers.get("X-Request-Id") or headers.get("X-Blaxel-Request-Id")
+            await send(message)
+
+        self.metrics.started(method, route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = perf_counter() - start
+            self.metrics.finished(method, route, status, seconds)
+            self.access_log.log(method, scope["path"], status, seconds, request_id)
+
+
+class LLMCacheBypassMiddleware:
+    """Sets ``bypass`` for requests sent with ``X-LLM-Cache: bypass``.
+
+    Plain ASGI so the flag is set in the request's own context, which crew
+    threads and streamed response bodies then copy.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or Headers(scope=scope).get(BYPASS_HEADER, "").lower() != "bypass":
+            return await self.app(scope, receive, send)
+        token = bypass.set(True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            bypass.reset(token)
+
+
 def init_middleware(app: FastAPI):
+    if admission:
+        app.add_middleware(AdmissionMiddleware, controller=admission)
     app.add_middleware(CorrelationIdMiddleware)
 
     # REMOVED: The middleware that was removing authentication headers
     # This was causing authentication errors in production
     
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time()
-
-        response: Response = await call_next(request)
-
-        process_time = (time() - start_time) * 1000
-        formatted_process_time = "{0:.2f}".format(process_time)
-        rid_header = response.headers.get("X-Request-Id")
-        request_id = rid_header or response.headers.get("X-Blaxel-Request-Id")
-        if response.status_code >= 400:
-            logger.error(
-                f"{request.method} {request.url.path} {response.status_code} {formatted_process_time}ms rid={request_id}"
-            )
-        else:
-            logger.info(
-                f"{request.method} {request.url.path} {response.status_code} {formatted_process_time}ms rid={request_id}"
-            )
-
-        return response
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(LLMCacheBypassMiddleware)
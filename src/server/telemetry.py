@@ -0,0 +1,23 @@
+import logging
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+def load_telemetry():
+    """Import the OpenTelemetry instrumentation; slow, so run it off the loop."""
+    try:
+        import opentelemetry.instrumentation.fastapi  # noqa: F401
+    except ImportError as e:
+        logger.warning(f"OpenTelemetry instrumentation unavailable: {e}")
+
+
+def instrument_app(app: FastAPI):
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    except ImportError:
+        return
+    FastAPIInstrumentor.instrument_app(app, exclude_spans=["receive", "send"])
+    # Starlette rebuilds the middleware stack, now with tracing, on the next request
+    app.middleware_stack = None
@@ -0,0 +1,181 @@
+import asyncio
+from contextvars import ContextVar
+from logging import getLogger
+from uuid import uuid4
+
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, LLMResult
+from langchain_core.runnables.config import get_async_callback_manager_for_config
+
+from . import tracing
+
+logger = getLogger(__name__)
+
+# Set per crew run; the copied context carries it into the kickoff thread, so
+# CrewAI events from concurrent crews reach the right request
+_sink: ContextVar = ContextVar("crew_stream_sink", default=None)
+_installed = False
+
+# CrewAI's ReAct marker (crewai.agents.parser.FINAL_ANSWER_ACTION); what an
+# LLM call writes before it is thought and tool use, not reply text
+FINAL_ANSWER = "Final Answer:"
+
+
+def _install_handlers():
+    global _installed
+    if _installed:
+        return
+    from crewai.utilities.events import (
+        LLMCallStartedEvent,
+        LLMStreamChunkEvent,
+        TaskCompletedEvent,
+        TaskStartedEvent,
+        crewai_event_bus,
+    )
+
+    def forward(kind, payload):
+        if sink := _sink.get():
+            sink(kind, payload)
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        forward("task_started", {"task": _task_name(event.task)})
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_call_started(source, event):
+        forward("llm_started", None)
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_chunk(source, event):
+        if event.chunk:
+            forward("token", event.chunk)
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        forward("task_completed", {"task": _task_name(event.task), "output": event.output.raw})
+
+    _installed = True
+
+
+class FinalAnswer:
+    """Picks the final answer out of one LLM call's stream chunks.
+
+    Chunks are held back until ``Final Answer:`` appears; the text after it
+    and every later chunk are passed on. A call that never gets there (a
+    ``Thought:``/``Action:``/``Action Input:`` step) passes nothing on.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._pending = ""
+        self._answering = False
+        self._leading = True
+
+    def feed(self, chunk: str) -> str:
+        if not self._answering:
+            self._pending += chunk
+            start = self._pending.find(FINAL_ANSWER)
+            if start < 0:
+                return ""
+            self._answering = True
+            chunk, self._pending = self._pending[start + len(FINAL_ANSWER):], ""
+        if self._leading:
+            chunk = chunk.lstrip()
+            self._leading = not chunk
+        return chunk
+
+
+def _task_name(task) -> str:
+    return getattr(task, "name", None) or (task.description or "").strip().split("\n")[0]
+
+
+async def stream_crew(crews, inputs: dict, config, name: str) -> list[AIMessage]:
+    """Run a pooled crew, streaming its progress as LangGraph events.
+
+    Each task's final answer is streamed as a chat model run named
+    ``name``, so its tokens arrive as ``on_chat_model_stream`` events through
+    CopilotKit; the ReAct steps before it are not streamed.
+    Task boundaries are also dispatched as ``crew_task_started`` and
+    ``crew_task_completed`` custom events. Returns one message per task,
+    with the ids used while streaming.
+    """
+    _install_handlers()
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def sink(kind, payload):
+        loop.call_soon_threadsafe(events.put_nowait, (kind, payload))
+
+    token = _sink.set(sink)
+    try:
+        # create_task copies the context, including the sink and the crew span
+        with tracing.crew_span(config, name) as span:
+            run = asyncio.create_task(crews.run(inputs))
+    finally:
+        _sink.reset(token)
+    run.add_done_callback(lambda _: events.put_nowait(("done", None)))
+
+    callbacks = get_async_callback_manager_for_config(config)
+    messages = []
+    manager = message_id = None
+    answer = FinalAnswer()
+    try:
+        while True:
+            kind, payload = await events.get()
+            if kind == "done":
+                break
+            if kind == "task_started":
+                message_id = f"run-{uuid4()}"
+                (manager,) = await callbacks.on_chat_model_start(
+                    {"name": name}, [[]], name=name
+                )
+                await adispatch_custom_event("crew_task_started", payload, config=config)
+            elif kind == "llm_started":
+                answer.reset()
+            elif kind == "token" and manager and (text := answer.feed(payload)):
+                await manager.on_llm_new_token(
+                    text,
+                    chunk=ChatGenerationChunk(
+                        message=AIMessageChunk(content=text, id=message_id)
+                    ),
+                )
+            elif kind == "task_completed" and manager:
+                message = AIMessage(content=payload["output"], id=message_id, name=name)
+                await manager.on_llm_end(
+                    LLMResult(generations=[[ChatGeneration(message=message)]])
+                )
+                await adispatch_custom_event("crew_task_completed", payload, config=config)
+                messages.append(message)
+                manager = None
+        result = await run
+    except BaseException as e:
+        run.cancel()
+        tracing.end_crew(span, e)
+        if manager:
+            await manager.on_llm_error(e)
+        raise
+    tracing.end_crew(span)
+
+    if not messages:
+        # No task events arrived (e.g. a stubbed crew); fall back to the result
+        messages.append(AIMessage(content=result.raw, name=name))
+    return messages
+
+
+async def replay(contents: list[str], config, name: str) -> list[AIMessage]:
+    """Stream already-known task outputs the way ``stream_crew`` would."""
+    callbacks = get_async_callback_manager_for_config(config)
+    messages = []
+    for content in contents:
+        message = AIMessage(content=content, id=f"run-{uuid4()}", name=name)
+        (manager,) = await callbacks.on_chat_model_start({"name": name}, [[]], name=name)
+        await manager.on_llm_new_token(
+            content,
+            chunk=ChatGenerationChunk(message=AIMessageChunk(content=content, id=message.id)),
+        )
+        await manager.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+        messages.append(message)
+    return messages
@@ -0,0 +1,271 @@
+import json
+import math
+import os
+import re
+import shutil
+from collections import Counter
+from functools import lru_cache
+from logging import getLogger
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+# Free-text columns of the ``vehicles`` table that are indexed
+FIELDS = ["description", "dealer_notes", "features"]
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "with",
+}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words, plural ``s`` stripped, plus adjacent-word bigrams.
+
+    Bigrams make phrases like "third row" outrank listings that merely
+    mention "third" and "row" apart.
+    """
+    words = []
+    for word in _TOKEN.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def document(row: dict) -> list[str]:
+    """Terms of a ``vehicles`` row; features are tokenized one at a time."""
+    terms = []
+    for field in FIELDS:
+        value = row.get(field)
+        if isinstance(value, str) and field == "features":
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        if isinstance(value, dict):
+            value = [f"{k} {v}" if not isinstance(v, bool) else k for k, v in value.items() if v]
+        for chunk in value if isinstance(value, list) else [value]:
+            if chunk:
+                terms += tokenize(str(chunk))
+    return terms
+
+
+def title(row: dict) -> str:
+    name = " ".join(str(row[f]) for f in ("year", "make", "model", "trim") if row.get(f))
+    price = row.get("sale_price") if row.get("is_on_sale") else row.get("price")
+    return f"{name} (${float(price):,.0f})" if price not in (None, "") else name
+
+
+class TextIndex:
+    """BM25 inverted index over vehicle descriptions, notes and features.
+
+    Postings live in a compacted base segment (term -> doc slots and term
+    frequencies, stored contiguously) plus an in-memory delta for listings
+    added since. Removing a listing only marks its slot dead; ``compact``
+    folds the delta into the base and drops dead slots. ``save`` writes the
+    base as raw ``.npy`` arrays that ``open`` memory-maps, so a restart
+    reads only the postings that queries touch.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: list[str] = []
+        self.titles: list[str] = []
+        self.slots: dict[str, int] = {}
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._total_length = 0.0
+        # Base segment: term -> postings range in docs/tfs
+        self._vocab: dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.uint16)
+        # Delta segment: term -> ([slots], [tfs])
+        self._delta: dict[str, tuple[list, list]] = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, doc_id: str, row: dict):
+        """Index ``row`` under ``doc_id``, replacing any earlier version."""
+        self.remove(doc_id)
+        terms = document(row)
+        slot = len(self.ids)
+        self.ids.append(doc_id)
+        self.titles.append(title(row))
+        self.slots[doc_id] = slot
+        if slot >= len(self._lengths):
+            grow = max(slot, 1024)
+            self._lengths = np.concatenate([self._lengths, np.zeros(grow, dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._lengths[slot] = len(terms)
+        self._alive[slot] = True
+        self._total_length += len(terms)
+        for term, tf in Counter(terms).items():
+            slots, tfs = self._delta.setdefault(term, ([], []))
+            slots.append(slot)
+            tfs.append(min(tf, 65535))
+
+    def remove(self, doc_id: str):
+        slot = self.slots.pop(doc_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+            self._total_length -= float(self._lengths[slot])
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Listings ranked by BM25 score for ``query``, best first."""
+        n = len(self.slots)
+        if not n:
+            return []
+        avgdl = max(self._total_length / n, 1.0)
+        matched, scores = [], []
+        for term in set(tokenize(query)):
+            slots, tfs = self._postings(term)
+            live = self._alive[slots]
+            df = int(live.sum())
+            if not df:
+                continue
+            slots, tfs = slots[live], tfs[live].astype(np.float32)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[slots] / avgdl)
+            matched.append(slots)
+            scores.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not matched:
+            return []
+        # Dense accumulation beats sorting matches for common terms
+        totals = np.bincount(
+            np.concatenate(matched), weights=np.concatenate(scores), minlength=len(self.ids)
+        )
+        hits = np.flatnonzero(totals)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-totals[hits], limit)[:limit]]
+        hits = hits[np.argsort(-totals[hits], kind="stable")]
+        return [
+            {"id": self.ids[i], "title": self.titles[i], "score": round(float(totals[i]), 3)}
+            for i in hits
+        ]
+
+    def compact(self):
+        """Merge the delta into the base segment and drop removed listings."""
+        count = len(self.ids)
+        alive = self._alive[:count]
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        terms = sorted(set(self._vocab) | set(self._delta))
+        vocab, offsets, docs, tfs = {}, [0], [], []
+        for term in terms:
+            slots, freqs = self._postings(term)
+            keep = alive[slots]
+            if not keep.any():
+                continue
+            vocab[term] = len(vocab)
+            docs.append(remap[slots[keep]].astype(np.int32))
+            tfs.append(np.asarray(freqs[keep], dtype=np.uint16))
+            offsets.append(offsets[-1] + int(keep.sum()))
+
+        self.ids = [d for d, a in zip(self.ids, alive) if a]
+        self.titles = [t for t, a in zip(self.titles, alive) if a]
+        self.slots = {doc_id: slot for slot, doc_id in enumerate(self.ids)}
+        self._lengths = np.array(self._lengths[:count][alive], dtype=np.float32)
+        self._alive = np.ones(len(self.ids), dtype=bool)
+        self._vocab = vocab
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int32)
+        self._tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.uint16)
+        self._delta = {}
+
+    def save(self, path: str):
+        """Compact and write the index to directory ``path``, replacing it."""
+        self.compact()
+        staging = f"{path}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        np.save(os.path.join(staging, "offsets.npy"), self._offsets)
+        np.save(os.path.join(staging, "docs.npy"), self._docs)
+        np.save(os.path.join(staging, "tfs.npy"), self._tfs)
+        np.save(os.path.join(staging, "lengths.npy"), self._lengths)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(
+                {"k1": self.k1, "b": self.b, "terms": list(self._vocab),
+                 "ids": self.ids, "titles": self.titles},
+                f,
+            )
+        if os.path.exists(path):
+            shutil.move(path, f"{path}.old")
+        os.replace(staging, path)
+        shutil.rmtree(f"{path}.old", ignore_errors=True)
+
+    @classmethod
+    def open(cls, path: str) -> "TextIndex":
+        """Load an index written by ``save``; postings stay memory-mapped."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["k1"], meta["b"])
+        index.ids, index.titles = meta["ids"], meta["titles"]
+        index.slots = {doc_id: slot for slot, doc_id in enumerate(index.ids)}
+        index._vocab = {term: i for i, term in enumerate(meta["terms"])}
+        index._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        index._docs = np.load(os.path.join(path, "docs.npy"), mmap_mode="r")
+        index._tfs = np.load(os.path.join(path, "tfs.npy"), mmap_mode="r")
+        # Small and grows with additions, so held in memory
+        index._lengths = np.array(np.load(os.path.join(path, "lengths.npy")), dtype=np.float32)
+        index._alive = np.ones(len(index.ids), dtype=bool)
+        index._total_length = float(index._lengths.sum())
+        return index
+
+    def _postings(self, term):
+        slots, tfs = [], []
+        if (i := self._vocab.get(term)) is not None:
+            start, stop = self._offsets[i], self._offsets[i + 1]
+            slots.append(self._docs[start:stop])
+            tfs.append(self._tfs[start:stop])
+        if term in self._delta:
+            delta_slots, delta_tfs = self._delta[term]
+            slots.append(np.array(delta_slots, dtype=np.int32))
+            tfs.append(np.array(delta_tfs, dtype=np.uint16))
+        if not slots:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint16)
+        if len(slots) == 1:
+            return np.asarray(slots[0]), np.asarray(tfs[0])
+        return np.concatenate(slots), np.concatenate(tfs)
+
+
+def build(rows: list[dict]) -> TextIndex:
+    index = TextIndex()
+    for row in rows:
+        if row.get("id") is not None and (row.get("status") or "available") == "available":
+            index.add(str(row["id"]), row)
+    index.compact()
+    return index
+
+
+@lru_cache(maxsize=None)
+def text_index() -> TextIndex | None:
+    """The listing text index, loaded on first use.
+
+    Memory-maps ``TEXT_INDEX_PATH`` when it exists. Otherwise builds from the
+    ``INVENTORY_PATH`` export and, if ``TEXT_INDEX_PATH`` is set, saves there
+    for the next start.
+    """
+    from .inventory import read_rows
+
+    path = os.environ.get("TEXT_INDEX_PATH")
+    try:
+        if path and os.path.exists(path):
+            index = TextIndex.open(path)
+            logger.info(f"Opened text index of {len(index)} listings at {path}")
+            return index
+        if not (source := os.environ.get("INVENTORY_PATH")):
+            return None
+        index = build(read_rows(source))
+        logger.info(f"Indexed {len(index)} listings from {source}")
+        if path:
+            index.save(path)
+        return index
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Failed to load text index: {e}", exc_info=e)
+        return None
@@ -0,0 +1,131 @@
+import json
+
+from crewai.tools import tool
+
+from . import financing
+from .dealer_index import KM_PER_MILE, dealer_index
+from .inventory import inventory
+from .text_index import text_index
+
+MAX_QUOTES = 60
+
+
+@tool("Search vehicle inventory")
+def search_inventory(
+    make: str | None = None,
+    model: str | None = None,
+    body_type: str | None = None,
+    fuel_type: str | None = None,
+    condition: str | None = None,
+    year_min: int | None = None,
+    year_max: int | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    mileage_max: int | None = None,
+    sort: str = "price",
+    descending: bool = False,
+    limit: int = 10,
+) -> str:
+    """Search available vehicle listings in the marketplace inventory.
+
+    Filters are optional and combined: make, model, body_type (SUV, Sedan,
+    Truck...), fuel_type (Gasoline, Electric, Hybrid, Diesel), condition
+    (New, Used, Certified), year range, price range in dollars and maximum
+    mileage. Results are sorted by price, year or mileage. Returns the total
+    number of matches and the listings as JSON.
+    """
+    listings = inventory()
+    if listings is None:
+        return "Inventory is not available; do not quote specific listings."
+    result = listings.search(
+        make=make,
+        model=model,
+        body_type=body_type,
+        fuel_type=fuel_type,
+        condition=condition,
+        year_min=year_min,
+        year_max=year_max,
+        price_min=price_min,
+        price_max=price_max,
+        mileage_max=mileage_max,
+        sort=sort if sort in ("price", "year", "mileage") else "price",
+        descending=descending,
+        limit=max(1, min(limit, 50)),
+    )
+    return json.dumps(result)
+
+
+@tool("Find nearby dealers")
+def find_dealers(
+    latitude: float,
+    longitude: float,
+    radius_miles: float | None = None,
+    brand: str | None = None,
+    service: str | None = None,
+    limit: int = 5,
+) -> str:
+    """Find marketplace dealers near a customer's location.
+
+    Pass the approximate latitude and longitude of the customer's city or
+    address. With radius_miles, returns dealers within that distance;
+    otherwise the nearest ones. Optionally filter by a brand sold (Toyota,
+    BMW...) or a service offered (Sales, Service, Financing, Leasing,
+    Trade-In, Warranty). Returns dealers as JSON, nearest first, with
+    their distance, rating, brands, services and contact details.
+    """
+    dealers = dealer_index()
+    if dealers is None:
+        return "Dealer directory is not available; do not quote specific dealers."
+    limit = max(1, min(limit, 25))
+    if radius_miles:
+        found = dealers.within(
+            latitude, longitude, radius_miles * KM_PER_MILE,
+            brand=brand, service=service, limit=limit,
+        )
+    else:
+        found = dealers.nearest(latitude, longitude, limit, brand=brand, service=service)
+    return json.dumps(found)
+
+
+@tool("Search listing descriptions")
+def search_listings(query: str, limit: int = 10) -> str:
+    """Full-text search of vehicle listings' descriptions, dealer notes and
+    features, e.g. "heated seats, third row, towing package". Returns the
+    best-matching available listings as JSON (id, title with price, and
+    relevance score), best first.
+    """
+    index = text_index()
+    if index is None:
+        return "Listing search is not available; do not quote specific listings."
+    return json.dumps(index.search(query, limit=max(1, min(limit, 50))))
+
+
+@tool("Calculate financing options")
+def calculate_financing(
+    prices: list[float],
+    terms_months: list[int] = [36, 48, 60, 72],
+    rates_percent: list[float] = [4.9, 6.9, 8.9],
+    down_payments: list[float] = [0.1],
+    vehicle_ids: list[str] | None = None,
+) -> str:
+    """Compute amortized auto loan quotes for every combination of vehicle
+    price, term in months, annual interest rate (APR, percent) and down
+    payment. Down payments of 1 or less are a fraction of the price (0.2 is
+    20%), larger ones are dollars. Returns JSON with, per vehicle, the
+    lowest total cost and lowest monthly payment options and the interest
+    they save, plus every quote (monthly payment, total interest, total
+    cost). Use this instead of doing loan arithmetic yourself.
+    """
+    if vehicle_ids is not None and len(vehicle_ids) != len(prices):
+        return "vehicle_ids must match prices one to one."
+    try:
+        quotes = financing.quote(prices, terms_months, rates_percent, down_payments, vehicle_ids)
+    except ValueError as e:
+        return f"Invalid financing inputs: {e}"
+    columns = financing.COLUMNS + ["total_interest", "total_cost"]
+    return json.dumps({
+        "summary": financing.compare(quotes),
+        # Enough to compare options without flooding the context window
+        "quotes": financing.as_rows(quotes, columns)[:MAX_QUOTES],
+        "total_quotes": len(quotes["monthly_payment"]),
+    })
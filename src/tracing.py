@@ -0,0 +1,458 @@
+"""
+OpenTelemetry spans and metrics for agent runs: every LangGraph node,
+supervisor handoff, tool and chat model call, every crew run, crew task
+and crew LLM call, with latency, token counts and cache hits.
+
+LangGraph runs are traced by a LangChain callback handler added to every
+run; crews by CrewAI event handlers, nested under the graph node that
+started them. Spans go to the exporters named by ``TRACE_EXPORTER``:
+``otlp`` (a local collector, configured by the standard
+``OTEL_EXPORTER_OTLP_*`` variables) and/or ``memory`` (a ring buffer served
+at ``/traces``). With neither, spans go to the global provider, which is
+Blaxel's when its telemetry is enabled.
+"""
+
+import os
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from time import perf_counter
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import get_async_callback_manager_for_config
+from opentelemetry import context as otel_context, metrics, trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.trace import Status, StatusCode
+
+logger = getLogger(__name__)
+
+TRACING = os.environ.get("TRACING", "true").lower() == "true"
+EXPORTERS = {
+    name.strip() for name in os.environ.get("TRACE_EXPORTER", "memory").split(",") if name.strip()
+}
+BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "2048"))
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the last ``size`` finished spans in memory."""
+
+    def __init__(self, size: int = 2048):
+        self._spans = deque(maxlen=size)
+
+    def export(self, spans):
+        self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def spans(self, limit: int | None = None) -> list:
+        spans = list(self._spans)
+        return spans[-limit:] if limit else spans
+
+    def clear(self):
+        self._spans.clear()
+
+    def shutdown(self):
+        pass
+
+
+def span_dict(span) -> dict:
+    return {
+        "name": span.name,
+        "trace_id": f"{span.context.trace_id:032x}",
+        "span_id": f"{span.context.span_id:016x}",
+        "parent_id": f"{span.parent.span_id:016x}" if span.parent else None,
+        "start": span.start_time / 1e9,
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 2),
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes),
+    }
+
+
+def summarize(spans) -> dict:
+    """Count, latency percentiles and token totals by span name."""
+    groups = {}
+    for span in spans:
+        groups.setdefault(span.name, []).append(span)
+    summary = {}
+    for name, group in sorted(groups.items()):
+        durations = sorted((s.end_time - s.start_time) / 1e6 for s in group)
+
+        def at(q):
+            return round(durations[min(int(q * len(durations)), len(durations) - 1)], 2)
+
+        summary[name] = {
+            "count": len(group),
+            "errors": sum(s.status.status_code is StatusCode.ERROR for s in group),
+            "p50_ms": at(0.5),
+            "p95_ms": at(0.95),
+            "max_ms": durations[-1],
+            "input_tokens": sum(s.attributes.get("gen_ai.usage.input_tokens", 0) for s in group),
+            "output_tokens": sum(s.attributes.get("gen_ai.usage.output_tokens", 0) for s in group),
+            "cache_hits": sum(bool(s.attributes.get("cache.hit")) for s in group),
+        }
+    return summary
+
+
+class Instruments:
+    """The spans' metric counterparts, recorded as each span ends."""
+
+    def __init__(self, meter):
+        self.duration = meter.create_histogram(
+            "agent.span.duration", unit="ms", description="Agent span latency by kind and name"
+        )
+        self.tokens = meter.create_counter(
+            "gen_ai.client.token.usage", unit="{token}", description="LLM tokens by type and model"
+        )
+        self.cache_hits = meter.create_counter(
+            "agent.cache.hits", description="Answers served from the LLM or semantic cache"
+        )
+
+    def record(self, kind: str, name: str, seconds: float, attributes: dict, error: bool = False):
+        self.duration.record(seconds * 1000, {"kind": kind, "name": name, "error": error})
+        model = attributes.get("gen_ai.request.model", name)
+        for key, type_ in (("gen_ai.usage.input_tokens", "input"), ("gen_ai.usage.output_tokens", "output")):
+            if tokens := attributes.get(key):
+                self.tokens.add(tokens, {"kind": kind, "type": type_, "model": model})
+
+
+class Tracing:
+    """The tracer, meter and exporters configured for this process."""
+
+    def __init__(self, exporters=frozenset(), buffer_size: int = 2048):
+        self.buffer = None
+        if exporters:
+            provider = TracerProvider()
+            if "memory" in exporters:
+                self.buffer = RingBufferExporter(buffer_size)
+                # Appending to a deque is cheaper than handing off to a thread
+                provider.add_span_processor(SimpleSpanProcessor(self.buffer))
+            if "otlp" in exporters:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            self.tracer = provider.get_tracer(__name__)
+        else:
+            self.tracer = trace.get_tracer(__name__)
+        self.instruments = Instruments(self._meter(exporters))
+
+    @staticmethod
+    def _meter(exporters):
+        if "otlp" not in exporters:
+            return metrics.get_meter(__name__)
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+        reader = PeriodicExportingMetricReader(OTLPMetricExporter())
+        return MeterProvider(metric_readers=[reader]).get_meter(__name__)
+
+    def start(self, kind: str, name: str, parent=None, attributes: dict | None = None):
+        """Start a span named ``"{kind} {name}"``; pair with ``end``."""
+        span = self.tracer.start_span(
+            f"{kind} {name}", context=parent, attributes={"agent.kind": kind, **(attributes or {})}
+        )
+        return _Open(span, kind, name, perf_counter(), attributes or {})
+
+    def end(self, open_, attributes: dict | None = None, error: BaseException | None = None):
+        span = open_.span
+        if attributes:
+            span.set_attributes(attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+        self.instruments.record(
+            open_.kind, open_.name, perf_counter() - open_.started,
+            {**open_.attributes, **(attributes or {})}, error is not None,
+        )
+
+
+class _Open:
+    __slots__ = ("span", "kind", "name", "started", "attributes")
+
+    def __init__(self, span, kind, name, started, attributes):
+        self.span = span
+        self.kind = kind
+        self.name = name
+        self.started = started
+        self.attributes = attributes
+
+
+class GraphTracer(BaseCallbackHandler):
+    """LangChain callback handler turning LangGraph runs into spans.
+
+    Spans: the top-level graph, each node, each handoff and tool call, and
+    each chat model call with its token usage. Runs in between (channel
+    writes, routing functions) get no span; their children attach to the
+    nearest traced ancestor. Crew task streams reported through
+    ``src.streaming`` are not model calls and are left to the crew spans.
+    """
+
+    # Called on the event loop in the order LangChain reports runs
+    run_inline = True
+
+    def __init__(self, tracing: "Tracing"):
+        self.tracing = tracing
+        self._open = {}  # run id -> _Open
+        self._parent = {}  # run id -> nearest traced ancestor's run id (or None)
+
+    def _nearest(self, run_id):
+        while run_id is not None:
+            if (open_ := self._open.get(run_id)) is not None:
+                return open_
+            run_id = self._parent.get(run_id)
+        return None
+
+    def span_for(self, run_id):
+        """The span of ``run_id`` or its nearest traced ancestor, or None."""
+        open_ = self._nearest(run_id)
+        return open_.span if open_ is not None else None
+
+    def _start(self, run_id, parent_run_id, kind, name, attributes=None):
+        parent = self.span_for(parent_run_id)
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        self._open[run_id] = self.tracing.start(kind, name, context, attributes)
+
+    def _skip(self, run_id, parent_run_id):
+        self._parent[run_id] = parent_run_id if parent_run_id in self._open else self._parent.get(parent_run_id)
+
+    def _end(self, run_id, attributes=None, error=None):
+        self._parent.pop(run_id, None)
+        if (open_ := self._open.pop(run_id, None)) is not None:
+            self.tracing.end(open_, attributes, error)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "chain")
+        metadata = metadata or {}
+        if parent_run_id is None:
+            self._start(run_id, None, "graph", name, {"langgraph.thread_id": str(metadata.get("thread_id", ""))})
+        elif name == metadata.get("langgraph_node") and name != "__start__" and not self._is_subgraph(name, parent_run_id):
+            self._start(run_id, parent_run_id, "node", name, {"langgraph.step": metadata.get("langgraph_step", -1)})
+        else:
+            self._skip(run_id, parent_run_id)
+
+    def _is_subgraph(self, name, parent_run_id):
+        # A compiled subgraph run as a node reports itself under the node's name
+        parent = self._nearest(parent_run_id)
+        return parent is not None and parent.kind == "node" and parent.name == name
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # A handoff ends its node with a ParentCommand; that is routing, not failure
+        self._end(run_id, error=None if type(error).__name__ == "ParentCommand" else error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        if name.startswith(HANDOFF_PREFIX):
+            self._start(run_id, parent_run_id, "handoff", name[len(HANDOFF_PREFIX):])
+        else:
+            self._start(run_id, parent_run_id, "tool", name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        if metadata.get("ls_model_type") != "chat":
+            self._skip(run_id, parent_run_id)
+            return
+        model = metadata.get("ls_model_name") or kwargs.get("name") or (serialized or {}).get("name", "model")
+        self._start(run_id, parent_run_id, "llm", model, {
+            "gen_ai.request.model": model,
+            "gen_ai.system": metadata.get("ls_provider", ""),
+        })
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def context_for(self, config):
+        """OpenTelemetry context with the span of the node running ``config``."""
+        manager = get_async_callback_manager_for_config(config)
+        span = self.span_for(manager.parent_run_id)
+        return trace.set_span_in_context(span) if span is not None else None
+
+
+def usage(response) -> dict:
+    """Token counts from a LangChain ``LLMResult``."""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            if metadata := getattr(getattr(generation, "message", None), "usage_metadata", None):
+                input_tokens += metadata.get("input_tokens", 0)
+                output_tokens += metadata.get("output_tokens", 0)
+    if not (input_tokens or output_tokens) and response.llm_output:
+        token_usage = response.llm_output.get("token_usage") or {}
+        input_tokens = token_usage.get("prompt_tokens", 0)
+        output_tokens = token_usage.get("completion_tokens", 0)
+    return {"gen_ai.usage.input_tokens": input_tokens, "gen_ai.usage.output_tokens": output_tokens}
+
+
+def crew_usage(agent) -> tuple[int, int, int]:
+    """(prompt, completion, cached prompt) tokens the agent has used so far."""
+    process = getattr(agent, "_token_process", None)
+    if process is None:
+        return 0, 0, 0
+    return process.prompt_tokens, process.completion_tokens, process.cached_prompt_tokens
+
+
+# CrewAI reports tasks and LLM calls from the kickoff thread, in order. Each
+# kickoff runs in its own copied context, which keeps its open spans
+_crew_spans: ContextVar = ContextVar("crew_spans", default=None)
+
+
+def _install_crew_handlers(tracing: "Tracing"):
+    from crewai.utilities.events import (
+        LLMCallCompletedEvent,
+        LLMCallFailedEvent,
+        LLMCallStartedEvent,
+        TaskCompletedEvent,
+        TaskFailedEvent,
+        TaskStartedEvent,
+        crewai_event_bus,
+    )
+
+    from .streaming import _task_name
+
+    def push(open_, extra=None):
+        if (spans := _crew_spans.get()) is None:
+            _crew_spans.set(spans := [])
+        token = otel_context.attach(trace.set_span_in_context(open_.span))
+        spans.append((open_, token, extra))
+
+    def pop(kind):
+        """The innermost open ``kind`` span; spans opened inside it but never
+        closed (a call interrupted by an error) are ended first."""
+        spans = _crew_spans.get() or []
+        if not any(open_.kind == kind for open_, _, _ in spans):
+            return None, None
+        while True:
+            open_, token, extra = spans.pop()
+            otel_context.detach(token)
+            if open_.kind == kind:
+                return open_, extra
+            tracing.end(open_, error=RuntimeError("not completed"))
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        agent = getattr(event.task, "agent", None)
+        push(
+            tracing.start("task", _task_name(event.task), attributes={"crew.agent": getattr(agent, "role", "")}),
+            (agent, crew_usage(agent)),
+        )
+
+    def end_task(event, error=None):
+        open_, extra = pop("task")
+        if open_ is None:
+            return
+        agent, before = extra
+        after = crew_usage(agent)
+        tracing.end(open_, {
+            "gen_ai.usage.input_tokens": after[0] - before[0],
+            "gen_ai.usage.output_tokens": after[1] - before[1],
+            "gen_ai.usage.cached_input_tokens": after[2] - before[2],
+        }, error)
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        end_task(event)
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        end_task(event, RuntimeError(event.error))
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        model = str(getattr(source, "model", "llm"))
+        push(tracing.start("llm", model, attributes={"gen_ai.request.model": model, "cache.hit": False}))
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        if (open_ := pop("llm")[0]) is not None:
+            tracing.end(open_)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        if (open_ := pop("llm")[0]) is not None:
+            tracing.end(open_, error=RuntimeError(event.error))
+
+
+# Set once by ``install``; LangChain adds the handler to every run
+_handler: ContextVar = ContextVar("graph_tracer", default=None)
+_tracing: "Tracing | None" = None
+
+
+def install():
+    """Trace every LangGraph run and crew from now on. Idempotent."""
+    global _handler, _tracing
+    if _tracing is not None or not TRACING:
+        return
+    from langchain_core.tracers.context import register_configure_hook
+
+    _tracing = Tracing(EXPORTERS, BUFFER_SIZE)
+    # A default rather than a per-run value: one handler serves every run
+    _handler = ContextVar("graph_tracer", default=GraphTracer(_tracing))
+    register_configure_hook(_handler, inheritable=True)
+    _install_crew_handlers(_tracing)
+    logger.info(f"Agent tracing enabled (exporters: {', '.join(sorted(EXPORTERS)) or 'global'})")
+
+
+@contextmanager
+def crew_span(config, name: str):
+    """Span for one crew run, current while the crew is started.
+
+    Its parent is the graph node running ``config``; tasks and LLM calls
+    reported by the crew's thread nest under it. Yields the open span
+    (None when tracing is off) for ``end_crew``.
+    """
+    handler = _handler.get()
+    if handler is None:
+        yield None
+        return
+    open_ = _tracing.start("crew", name, handler.context_for(config))
+    token = otel_context.attach(trace.set_span_in_context(open_.span))
+    try:
+        yield open_
+    finally:
+        otel_context.detach(token)
+
+
+def end_crew(open_, error: BaseException | None = None):
+    if open_ is not None:
+        _tracing.end(open_, error=error)
+
+
+def cache_hit(kind: str, name: str, config=None):
+    """Record an answer served from a cache as a zero-work span.
+
+    ``kind`` is ``llm`` (an exact completion hit, under the current crew
+    task) or ``semantic`` (a reused crew answer, under ``config``'s node).
+    """
+    if _tracing is None:
+        return
+    handler = _handler.get()
+    parent = handler.context_for(config) if handler is not None and config is not None else None
+    attributes = {"cache.hit": True, "cache.kind": kind}
+    if kind == "llm":
+        attributes["gen_ai.request.model"] = name
+    _tracing.end(_tracing.start("llm" if kind == "llm" else "crew", name, parent, attributes))
+    _tracing.instruments.cache_hits.add(1, {"cache": kind, "name": name})
+
+
+def buffer() -> RingBufferExporter | None:
+    return _tracing.buffer if _tracing is not None else None
@@ -1,12 +1,13 @@
 from crewai import Agent, Crew, Task
 # from crewai_tools import SerperDevTool  # Temporarily disabled
-from langchain_openai import ChatOpenAI
 
+from .crew import CrewPool, llm, verbose
+from .tools import calculate_financing, search_inventory, search_listings
 
-async def agent():
+
+def build_crew():
     # Vehicle search and analysis agent
     # search_tool = SerperDevTool()  # Temporarily disabled
-    search_tool = []  # No tools for now
     
     vehicle_expert = Agent(
         role="Automotive Expert",
@@ -20,10 +21,11 @@ async def agent():
         - Common issues and maintenance costs
         
         You help customers find the perfect vehicle by understanding their needs,
-        budget, and preferences. You provide honest, unbiased recommendations.""",
-        tools=search_tool,  # Empty list for now
-        llm=ChatOpenAI(model="gpt-4", temperature=0.7),
-        verbose=True,
+        budget, and preferences. You provide honest, unbiased recommendations.
+        You recommend listings found in the marketplace inventory.""",
+        tools=[search_inventory, search_listings],
+        llm=llm(),
+        verbose=verbose("vehicle"),
     )
     
     pricing_analyst = Agent(
@@ -37,10 +39,11 @@ async def agent():
         - Depreciation rates
         - Best times to buy
         
-        You help customers understand if they're getting a good deal.""",
-        tools=search_tool,  # Empty list for now
-        llm=ChatOpenAI(model="gpt-4", temperature=0.7),
-        verbose=True,
+        You help customers understand if they're getting a good deal, and use
+        the financing calculator for every payment or interest figure.""",
+        tools=[calculate_financing],
+        llm=llm(),
+        verbose=verbose("vehicle"),
     )
     
     # Define tasks
@@ -86,7 +89,14 @@ async def agent():
     crew = Crew(
         agents=[vehicle_expert, pricing_analyst],
         tasks=[search_task, pricing_task],
-        verbose=True,
+        verbose=verbose("vehicle"),
     )
     
     return crew
+
+
+crews = CrewPool("vehicle", build_crew)
+
+
+async def agent():
+    return await crews.template()
@@ -0,0 +1,147 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.admission import AdmissionController, RateLimiter, Rejected, client_key
+from src.server.middleware import AdmissionMiddleware
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate_up_to_burst():
+    clock = Clock()
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.take("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("a") == pytest.approx(0.5)
+    assert limiter.take("b") == 0  # buckets are per key
+    clock.now = 0.5
+    assert limiter.take("a") == 0
+    clock.now = 100
+    assert [limiter.take("a") for _ in range(4)][-1] > 0
+
+
+def test_token_buckets_are_bounded():
+    limiter = RateLimiter(rate=1, burst=1, max_keys=2)
+    for key in "abc":
+        limiter.take(key)
+    assert list(limiter._buckets) == ["b", "c"]
+
+
+def test_queue_is_bounded_and_served_by_priority():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, queue_size=2, queue_timeout=5)
+        await controller.acquire("k")
+        order = []
+
+        async def request(name, priority=1):
+            try:
+                await controller.acquire(name, priority=priority)
+            except Rejected as e:
+                order.append((name, "rejected", str(e)))
+                return
+            order.append((name, "admitted"))
+            await asyncio.sleep(0)
+            controller.release()
+
+        new = [asyncio.create_task(request(f"new{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        # Queue full of new requests: a priority request displaces the newest
+        threaded = asyncio.create_task(request("threaded", priority=0))
+        await asyncio.sleep(0)
+        # ...and a further new request is refused outright
+        await request("late")
+        controller.release()
+        await asyncio.gather(*new, threaded)
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    outcomes = {name: rest for name, *rest in order}
+    assert "displaced" in outcomes["new1"][1]
+    assert "queue full" in outcomes["late"][1]
+    admitted = [name for name, outcome, *_ in order if outcome == "admitted"]
+    assert admitted == ["threaded", "new0"]
+    stats = controller.stats()
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert stats["admitted"] == 3
+    assert stats["rejected"]["displaced"] == 1 and stats["rejected"]["queue_full"] == 1
+    assert stats["queue_wait_ms"]["max"] >= 0
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(Rejected):
+            await controller.acquire()
+        controller.release()
+        await controller.acquire()  # the timed-out waiter left no stale slot
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.rejected["timed_out"] == 1
+    assert controller.running == 1 and controller.stats()["queued"] == 0
+
+
+def test_rate_limits_per_client_and_thread():
+    async def scenario():
+        controller = AdmissionController(
+            key_limiter=RateLimiter(rate=0.1, burst=2), thread_limiter=RateLimiter(rate=0.1, burst=1)
+        )
+        outcomes = []
+        for key, thread in [("a", None), ("a", None), ("a", None), ("b", "t"), ("c", "t")]:
+            try:
+                await controller.acquire(key, thread)
+                controller.release()
+                outcomes.append("ok")
+            except Rejected as e:
+                outcomes.append(round(e.retry_after))
+        return controller, outcomes
+
+    controller, outcomes = asyncio.run(scenario())
+    assert outcomes == ["ok", "ok", 10, "ok", 10]
+    assert controller.rejected["client_rate"] == 1 and controller.rejected["thread_rate"] == 1
+
+
+def test_client_key_uses_the_forwarded_user():
+    key = client_key({"x-forwarded-user": "alice@example.com"}, "1.2.3.4")
+    assert key.startswith("user:") and "alice" not in key
+    # The shared API key says nothing about who is calling
+    assert client_key({"authorization": "Bearer shared"}, "1.2.3.4") == "ip:1.2.3.4"
+    assert client_key({}, None) == "ip:unknown"
+
+
+def test_middleware_answers_429_and_holds_slots_while_streaming():
+    app = FastAPI()
+    controller = AdmissionController(max_concurrency=1, queue_size=0)
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.post("/run")
+    async def run():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"running": controller.running}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://agent") as client:
+            runs = [client.post("/run") for _ in range(2)]
+            health = client.get("/healthz")
+            return await asyncio.gather(*runs, health)
+
+    first, second, health = asyncio.run(scenario())
+    assert sorted([first.status_code, second.status_code]) == [200, 429]
+    rejected = first if first.status_code == 429 else second
+    assert rejected.headers["retry-after"] == "1"
+    assert health.json() == {"running": 1}  # GETs are never queued
+    assert controller.running == 0
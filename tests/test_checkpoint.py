@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+
+from src.checkpoint import BoundedMemorySaver
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build(checkpointer, reply="ok"):
+    graph = StateGraph(State)
+    graph.add_node("agent", lambda state: {"messages": [AIMessage(reply)]})
+    graph.set_entry_point("agent")
+    graph.add_edge("agent", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def turn(app, thread_id):
+    app.invoke({"messages": [HumanMessage("hi")]}, config(thread_id))
+
+
+def stored_bytes(saver):
+    total = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for namespaces in saver.storage.values()
+        for checkpoints in namespaces.values()
+        for checkpoint, metadata, _ in checkpoints.values()
+    )
+    total += sum(len(blob[1]) for blob in saver.blobs.values())
+    total += sum(len(w[2][1]) for writes in saver.writes.values() for w in writes.values())
+    return total
+
+
+def test_accounting_matches_stored_bytes():
+    saver = BoundedMemorySaver()
+    app = build(saver)
+    for thread in range(3):
+        for _ in range(3):
+            turn(app, f"t{thread}")
+    assert saver.stats()["bytes"] == stored_bytes(saver)
+
+    saver.delete_thread("t1")
+    assert saver.stats()["threads"] == 2
+    assert saver.stats()["bytes"] == stored_bytes(saver)
+
+
+def test_lru_evicts_least_recently_used_thread():
+    saver = BoundedMemorySaver(max_threads=2)
+    app = build(saver)
+    turn(app, "a")
+    turn(app, "b")
+    app.get_state(config("a"))
+    turn(app, "c")
+
+    assert set(saver.storage) == {"a", "c"}
+    assert saver.stats()["evictions"]["lru"] == 1
+    assert app.get_state(config("a")).values["messages"]
+
+
+def test_byte_budget_keeps_the_thread_being_written():
+    saver = BoundedMemorySaver(max_bytes=1)
+    app = build(saver, reply="x" * 1000)
+    turn(app, "a")
+    turn(app, "b")
+
+    assert set(saver.storage) == {"b"}
+    assert saver.stats()["evictions"]["bytes"] == 1
+    assert saver.stats()["bytes"] == stored_bytes(saver)
+
+
+def test_idle_threads_expire_on_reads_and_sweeps():
+    saver = BoundedMemorySaver(ttl_seconds=0.05)
+    app = build(saver)
+    turn(app, "a")
+    turn(app, "b")
+    time.sleep(0.1)
+
+    app.get_state(config("b"))
+    assert set(saver.storage) == {"b"}
+
+    time.sleep(0.1)
+    saver.sweep()
+    assert saver.stats()["threads"] == 0
+    assert saver.stats()["bytes"] == 0
+    assert saver.stats()["evictions"]["ttl"] == 2
+
+
+def test_sweep_forever_runs_without_traffic():
+    async def main():
+        saver = BoundedMemorySaver(ttl_seconds=0.02)
+        app = build(saver)
+        await app.ainvoke({"messages": [HumanMessage("hi")]}, config("a"))
+        sweeper = asyncio.create_task(saver.sweep_forever())
+        await asyncio.sleep(0.1)
+        sweeper.cancel()
+        assert saver.stats()["threads"] == 0
+
+    asyncio.run(main())
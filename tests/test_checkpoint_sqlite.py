@@ -0,0 +1,177 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.types import Send
+
+from src.checkpoint import SqliteSaver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THREAD = {"configurable": {"thread_id": "t1"}}
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build(checkpointer):
+    """Supervisor-shaped graph: a subgraph hop, then a Send fan-out."""
+    sub = StateGraph(State)
+    sub.add_node("crew", lambda state: {"messages": [AIMessage("crew")]})
+    sub.set_entry_point("crew")
+    sub.add_edge("crew", END)
+
+    graph = StateGraph(State)
+    # Large reply so the checkpoint crosses the compression threshold
+    graph.add_node("supervisor", lambda state: {"messages": [AIMessage("s" * 4000)]})
+    graph.add_node("vehicle_agent", sub.compile())
+    graph.add_node("dealer", lambda state: {"messages": [AIMessage("dealer")]})
+    graph.set_entry_point("supervisor")
+    graph.add_edge("supervisor", "vehicle_agent")
+    graph.add_conditional_edges(
+        "vehicle_agent", lambda state: [Send("dealer", state)] * 2, ["dealer"]
+    )
+    graph.add_edge("dealer", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_turns(checkpointer, turns=2):
+    app = build(checkpointer)
+    for turn in range(turns):
+        app.invoke({"messages": [HumanMessage(f"turn {turn}")]}, THREAD)
+    return app
+
+
+def snapshot(app):
+    state = app.get_state(THREAD)
+    history = [
+        (
+            h.metadata["source"],
+            h.metadata["step"],
+            h.next,
+            [m.content for m in h.values.get("messages", [])],
+        )
+        for h in app.get_state_history(THREAD)
+    ]
+    return [m.content for m in state.values["messages"]], state.next, history
+
+
+def test_matches_memory_saver(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    expected = snapshot(run_turns(MemorySaver()))
+    assert snapshot(run_turns(saver)) == expected
+    saver.close()
+
+
+def test_state_survives_process_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    script = (
+        "import sys; sys.path[:0] = [sys.argv[1], sys.argv[2]];"
+        "from src.checkpoint import SqliteSaver;"
+        "from test_checkpoint_sqlite import run_turns;"
+        "run_turns(SqliteSaver(sys.argv[3], flush_every=100))"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script, ROOT, os.path.join(ROOT, "tests"), path],
+        check=True,
+    )
+    saver = SqliteSaver(path)
+    expected = snapshot(run_turns(MemorySaver()))
+    assert snapshot(build(saver)) == expected
+    saver.close()
+
+
+def test_list_filter_limit_and_before(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    memory = MemorySaver()
+    run_turns(saver)
+    run_turns(memory)
+
+    def ids(checkpointer, config, **kwargs):
+        return [
+            # Subgraph namespaces embed a per-run task id; keep the node name
+            (t.config["configurable"]["checkpoint_ns"].split(":")[0], t.metadata["step"])
+            for t in checkpointer.list(config, **kwargs)
+        ]
+
+    root = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+    assert ids(saver, root) == ids(memory, root)
+    assert ids(saver, root, limit=3) == ids(memory, root, limit=3)
+    # Across namespaces only the set matters; ordering is per namespace
+    assert sorted(ids(saver, None, filter={"source": "input"})) == sorted(
+        ids(memory, None, filter={"source": "input"})
+    )
+    middle = list(saver.list(root))[3].config
+    assert len(list(saver.list(root, before=middle))) == len(ids(saver, root)) - 4
+    saver.close()
+
+
+def test_write_index_semantics(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    app = run_turns(saver, turns=1)
+    config = app.get_state(THREAD).config
+
+    # Regular writes keep the first value; special (negative index) ones overwrite
+    saver.put_writes(config, [("messages", "first")], "task")
+    saver.put_writes(config, [("messages", "second")], "task")
+    saver.put_writes(config, [("__error__", "boom")], "task")
+    saver.put_writes(config, [("__error__", "boom again")], "task")
+    writes = saver.get_tuple(config).pending_writes
+    assert ("task", "messages", "first") in writes
+    assert ("task", "__error__", "boom again") in writes
+    assert len([w for w in writes if w[0] == "task"]) == 2
+    saver.close()
+
+
+def test_compressed_payloads_round_trip(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"), compress_min=16)
+    run_turns(saver, turns=1)
+    types = {row[0] for row in saver.conn.execute("SELECT type FROM checkpoints")}
+    assert all(t.endswith("+zlib") for t in types)
+    assert snapshot(build(saver)) == snapshot(run_turns(MemorySaver(), turns=1))
+    saver.close()
+
+
+def test_buffered_writes_flush_on_a_timer(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    saver = SqliteSaver(path, flush_every=100, flush_interval=0.05)
+    run_turns(saver, turns=1)
+    time.sleep(0.2)
+
+    # A second connection stands in for another worker
+    other = SqliteSaver(path)
+    assert other.get_tuple(THREAD) is not None
+    assert saver.stats()["pending_checkpoints"] == 0
+    other.close()
+    saver.close()
+
+
+def test_buffering_writes_does_not_wait_for_a_commit(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": "c1"}}
+    committing, release = threading.Event(), threading.Event()
+
+    def slow_commit():
+        # Holds the connection the way a long flush does
+        with saver._db_lock:
+            committing.set()
+            release.wait()
+
+    thread = threading.Thread(target=slow_commit)
+    thread.start()
+    committing.wait()
+    started = time.perf_counter()
+    asyncio.run(saver.aput_writes(config, [("messages", "hi")], "task"))
+    assert time.perf_counter() - started < 0.1
+    assert saver.stats()["pending_writes"] == 1
+    release.set()
+    thread.join()
+    saver.close()
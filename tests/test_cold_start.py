@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+from benchmarks import cold_start
+
+# Budgets in seconds; loose enough for CI noise, far below the ~9 s it took
+# when every framework was imported eagerly
+IMPORT_BUDGET = float(os.environ.get("COLD_START_IMPORT_BUDGET_S", "2.0"))
+HEALTHZ_BUDGET = float(os.environ.get("COLD_START_HEALTHZ_BUDGET_S", "3.0"))
+
+HEAVY_MODULES = [
+    "crewai",
+    "langchain_openai",
+    "langgraph",
+    "langgraph_supervisor",
+    "copilotkit",
+    "opentelemetry.instrumentation.fastapi",
+    "blaxel",
+]
+
+
+def test_import_does_not_load_agent_frameworks():
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, src.main;"
+            f" print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        cwd=cold_start.ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_import_within_budget():
+    assert cold_start.import_seconds() < IMPORT_BUDGET
+
+
+def test_first_healthz_within_budget():
+    assert cold_start.healthz_seconds() < HEALTHZ_BUDGET
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+from src.crew import CrewExecutor, CrewPool
+
+
+class SlowCrew:
+    def __init__(self, seconds=0.2):
+        self.seconds = seconds
+        self.tasks = []
+        self.active = 0
+        self.overlapped = False
+        self._lock = threading.Lock()
+
+    def kickoff(self, inputs):
+        with self._lock:
+            self.active += 1
+            self.overlapped |= self.active > 1
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active -= 1
+        return inputs
+
+
+def test_executor_keeps_slot_until_cancelled_thread_finishes():
+    async def main():
+        executor = CrewExecutor(1)
+        first = asyncio.create_task(executor.kickoff(SlowCrew(), {}))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert executor.stats()["running"] == 1
+
+        second = asyncio.create_task(executor.kickoff(SlowCrew(0.01), {"n": 2}))
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued"] == 1
+        assert await second == {"n": 2}
+
+        stats = executor.stats()
+        assert stats["running"] == 0 and stats["queued"] == 0
+        assert stats["completed"] == 2
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_executor_calls_on_done_when_cancelled_while_queued():
+    async def main():
+        executor = CrewExecutor(1)
+        done = []
+        running = asyncio.create_task(executor.kickoff(SlowCrew(0.1), {}))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(
+            executor.kickoff(SlowCrew(), {}, on_done=lambda: done.append(True))
+        )
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.sleep(0.01)
+        assert done == [True]
+        await running
+        assert executor.stats()["completed"] == 1
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_pool_does_not_reuse_crew_still_running_after_cancel():
+    async def main():
+        crew = SlowCrew()
+        pool = CrewPool("test", lambda: crew, size=1)
+        await pool.warm()
+
+        first = asyncio.create_task(pool.run({}))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert pool.stats()["idle"] == 0
+
+        pool.factory = lambda: SlowCrew(0.01)
+        await pool.run({})
+        await asyncio.sleep(0.2)
+        assert not crew.overlapped
+        assert pool.stats()["idle"] == 1
+
+    asyncio.run(main())
+
+
+def test_verbosity_is_chosen_per_crew(monkeypatch):
+    from src import crew
+
+    monkeypatch.setattr(crew, "VERBOSE", {"dealer"})
+    assert crew.verbose("dealer") and not crew.verbose("vehicle")
+    monkeypatch.setattr(crew, "VERBOSE", {"all"})
+    assert crew.verbose("vehicle")
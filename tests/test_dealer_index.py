@@ -0,0 +1,68 @@
+import numpy as np
+
+from benchmarks.dealer_index import brute_force, synthetic
+from src.dealer_index import DealerIndex
+
+# Seed dealers from supabase_schema.sql
+SEED = [
+    {"id": "automax", "name": "AutoMax Denver", "latitude": 39.7392, "longitude": -104.9903,
+     "services": ["Sales", "Service", "Financing"], "brands": ["Honda", "Toyota", "Mazda"]},
+    {"id": "premium", "name": "Premium Motors", "latitude": 39.7294, "longitude": -104.8319,
+     "services": ["Sales", "Leasing", "Trade-In"], "brands": ["BMW", "Mercedes", "Audi"]},
+    {"id": "city", "name": "City Auto Sales", "latitude": 39.6133, "longitude": -104.9500,
+     "services": "{Sales,Financing,Warranty}", "brands": "{Ford,Chevrolet,GMC}"},
+    {"id": "closed", "name": "Closed Motors", "latitude": 39.74, "longitude": -104.99,
+     "is_active": False},
+    {"id": "unmapped", "name": "No Location"},
+]
+DOWNTOWN = (39.7420, -104.9915)
+
+
+def test_nearest_and_radius_with_filters():
+    index = DealerIndex(SEED)
+    assert index.size == 3
+
+    nearest = index.nearest(*DOWNTOWN, k=2)
+    assert [d["id"] for d in nearest] == ["automax", "premium"]
+    assert 0 < nearest[0]["distance_miles"] < 1
+    assert 8 < nearest[1]["distance_miles"] < 10
+
+    assert [d["id"] for d in index.nearest(*DOWNTOWN, k=5, service="financing")] == [
+        "automax", "city",
+    ]
+    assert [d["id"] for d in index.nearest(*DOWNTOWN, k=5, brand="GMC")] == ["city"]
+    assert index.nearest(*DOWNTOWN, k=5, brand="Tesla") == []
+    assert [d["id"] for d in index.within(*DOWNTOWN, 5)] == ["automax"]
+    assert [d["id"] for d in index.within(*DOWNTOWN, 20)] == ["automax", "premium", "city"]
+
+
+def test_nearest_matches_a_full_scan():
+    index = DealerIndex(synthetic(5_000, seed=3))
+    rng = np.random.default_rng(4)
+    # Includes points far from any dealer, which widen the search radius
+    for lat, lon in zip(rng.uniform(20, 60, 50), rng.uniform(-130, -60, 50)):
+        got = [d["id"] for d in index.nearest(lat, lon, 7, brand="Kia")]
+        expected = brute_force(index, lat, lon, 7, brand="Kia")
+        assert got == [index.rows[i]["id"] for i in expected]
+
+
+def test_sparse_filters_and_remote_points_scan_the_matches(monkeypatch):
+    rows = synthetic(5_000, seed=5)
+    for i in (10, 20, 30):
+        rows[i]["brands"] = ["Rare"]
+    index = DealerIndex(rows)
+    # Visiting cells would be far dearer than three distances
+    monkeypatch.setattr(index, "_candidates", None)
+    ocean = (0.0, -150.0)
+    got = [d["id"] for d in index.nearest(*ocean, 2, brand="rare")]
+    assert got == [index.rows[i]["id"] for i in brute_force(index, *ocean, 2, brand="Rare")]
+    assert len(index.within(*ocean, 20_000, brand="Rare")) == 3
+    assert len(index.nearest(*ocean, 10, brand="Rare")) == 3
+
+
+def test_search_wraps_around_the_antimeridian():
+    index = DealerIndex([
+        {"id": "east", "latitude": 0, "longitude": 179.95},
+        {"id": "west", "latitude": 0, "longitude": -179.95},
+    ])
+    assert [d["id"] for d in index.within(0, 179.99, 20)] == ["east", "west"]
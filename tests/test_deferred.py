@@ -0,0 +1,136 @@
+import asyncio
+import sys
+import types
+
+import copilotkit
+import pytest
+from copilotkit import Agent
+
+from src import main
+from src.dealer import crews as dealer_crews
+from src.deferred import DeferredAgent, DeferredBuild
+from src.vehicle import crews as vehicle_crews
+
+CONTEXT = {"properties": {}, "frontend_url": None, "headers": {}}
+
+
+class FakeAgent(Agent):
+    def __init__(self, *, name, description, graph):
+        super().__init__(name=name, description=description)
+        self.graph = graph
+
+    def execute(self, *, thread_id, **kwargs):
+        async def events():
+            yield f"{self.graph}:{thread_id}"
+
+        return events()
+
+    async def get_state(self, *, thread_id):
+        return {"threadId": thread_id, "graph": self.graph}
+
+
+@pytest.fixture
+def fake_sdk(monkeypatch):
+    """``get_sdk`` over fake graphs, with the warm-ups stubbed out. Returns
+    how often each graph was built, and the fake modules building them."""
+    builds = {"eager": 0, "lazy": 0}
+
+    def graph_module(name):
+        module = types.ModuleType(f"src.fake_{name}")
+
+        async def agent():
+            builds[name] += 1
+            await asyncio.sleep(0.05)
+            if module.fail:
+                raise RuntimeError("build failed")
+            return f"{name}-graph-{builds[name]}"
+
+        module.agent, module.fail = agent, False
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        return module
+
+    async def nothing(*args):
+        return None
+
+    modules = {name: graph_module(name) for name in builds}
+    monkeypatch.setattr(main, "AGENTS", [
+        ("eager-agent", "Built at boot", "fake_eager"),
+        ("lazy-agent", "Built on first use", "fake_lazy"),
+    ])
+    monkeypatch.setattr(main, "LAZY_AGENTS", {"lazy-agent"})
+    monkeypatch.setattr(copilotkit, "LangGraphAgent", FakeAgent)
+    monkeypatch.setattr(vehicle_crews, "warm", nothing)
+    monkeypatch.setattr(dealer_crews, "warm", nothing)
+    for module, name in (("src.inventory", "inventory"), ("src.dealer_index", "dealer_index"),
+                         ("src.text_index", "text_index")):
+        monkeypatch.setattr(f"{module}.{name}", lambda: None)
+    return builds, modules
+
+
+def execute(sdk, name, thread_id):
+    async def collect():
+        events = sdk.execute_agent(
+            context=CONTEXT, name=name, thread_id=thread_id, state={}, config={},
+            messages=[], actions=[], node_name=None,
+        )
+        return [event async for event in events]
+
+    return collect()
+
+
+def test_deferred_agents_are_listed_and_built_once_for_concurrent_first_requests(fake_sdk):
+    builds, _ = fake_sdk
+
+    async def run():
+        sdk = await main.get_sdk()
+        assert builds == {"eager": 1, "lazy": 0}
+        # Listed from the very first request, before the build finishes
+        listed = sdk.info(context=CONTEXT)["agents"]
+        assert [a["name"] for a in listed] == ["eager-agent", "lazy-agent"]
+        assert listed[1]["type"] == "langgraph"
+
+        first = await asyncio.gather(*(execute(sdk, "lazy-agent", f"t{i}") for i in range(3)))
+        state = await sdk.get_agent_state(context=CONTEXT, thread_id="t9", name="lazy-agent")
+        # Once built, the real agent replaces the placeholder
+        (lazy,) = [a for a in sdk.agents(CONTEXT) if a.name == "lazy-agent"]
+        return first, state, lazy
+
+    first, state, lazy = asyncio.run(run())
+    assert first == [["lazy-graph-1:t0"], ["lazy-graph-1:t1"], ["lazy-graph-1:t2"]]
+    assert state == {"threadId": "t9", "graph": "lazy-graph-1"}
+    assert isinstance(lazy, FakeAgent)
+    assert builds == {"eager": 1, "lazy": 1}
+
+
+def test_failed_deferred_build_is_retried_by_the_next_request(fake_sdk):
+    builds, modules = fake_sdk
+    modules["lazy"].fail = True
+
+    async def run():
+        sdk = await main.get_sdk()
+        with pytest.raises(RuntimeError, match="build failed"):
+            await execute(sdk, "lazy-agent", "t1")
+        assert isinstance(sdk.agents(CONTEXT)[1], DeferredAgent)
+        modules["lazy"].fail = False
+        return await execute(sdk, "lazy-agent", "t2")
+
+    assert asyncio.run(run()) == ["lazy-graph-2:t2"]
+    assert builds["lazy"] == 2
+
+
+def test_a_caller_going_away_does_not_cancel_the_shared_build():
+    finished = []
+
+    async def build():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def run():
+        deferred = DeferredBuild(build)
+        waiter = asyncio.ensure_future(deferred.wait())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await deferred.wait()
+
+    asyncio.run(run())
+    assert finished == [True]
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+from src.fake_llm import DEFAULT_SCRIPT, FakeChatModel, FakeLLM, Script, tokens
+
+
+@tool
+def transfer_to_dealer_agent() -> str:
+    """Hand off to the dealer agent."""
+    return "ok"
+
+
+@tool
+def transfer_to_vehicle_agent() -> str:
+    """Hand off to the vehicle agent."""
+    return "ok"
+
+
+def test_script_is_deterministic_and_rule_ordered():
+    script = Script(
+        rules=[{"match": "lease", "reply": "Leases start at $299."}, {"match": ".", "tool": "search"}],
+        replies=["a", "b", "c"],
+    )
+    assert script.respond("Any lease deals?") == ("Leases start at $299.", None)
+    assert script.respond("SUVs?", tools=["search"], from_user=True) == ("", {"name": "search", "args": {}})
+    # Tool rules only fire for a bound tool answering the user
+    assert script.respond("SUVs?", tools=["search"])[1] is None
+    assert script.respond("SUVs?") == script.respond("SUVs?")
+
+
+def test_chat_model_routes_through_bound_tools():
+    model = FakeChatModel(script=Script(**DEFAULT_SCRIPT)).bind_tools(
+        [transfer_to_dealer_agent, transfer_to_vehicle_agent]
+    )
+    routed = asyncio.run(model.ainvoke([HumanMessage("Book a test drive near Denver")]))
+    assert routed.tool_calls[0]["name"] == "transfer_to_dealer_agent"
+    # After the handoff comes back, it answers in text
+    history = [HumanMessage("Book a test drive"), routed,
+               ToolMessage("done", tool_call_id=routed.tool_calls[0]["id"])]
+    answer = asyncio.run(model.ainvoke(history))
+    assert isinstance(answer, AIMessage) and answer.content and not answer.tool_calls
+
+
+def test_chat_model_streams_tokens_with_latency():
+    model = FakeChatModel(script=Script(replies=["one two three four"]), token_latency=0.01)
+
+    async def collect():
+        return [chunk.content async for chunk in model.astream([HumanMessage("hi")])]
+
+    start = time.perf_counter()
+    chunks = asyncio.run(collect())
+    assert chunks == ["one ", "two ", "three ", "four"]
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_crew_llm_answers_in_react_format():
+    llm = FakeLLM(Script(replies=["Three SUVs fit."]), first_token_latency=0.01)
+    start = time.perf_counter()
+    answer = llm.call([{"role": "system", "content": "x"}, {"role": "user", "content": "SUVs?"}])
+    assert answer.endswith("Final Answer: Three SUVs fit.")
+    assert time.perf_counter() - start >= 0.01
+    assert tokens(answer)[-3:] == ["Three ", "SUVs ", "fit."]
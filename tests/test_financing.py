@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.financing import as_rows, compare, quote
+
+
+def annuity(loan, apr, months):
+    r = apr / 1200
+    return loan / months if r == 0 else loan * r / (1 - (1 + r) ** -months)
+
+
+def test_every_combination_matches_the_scalar_formula():
+    quotes = quote([30_000, 45_500], [36, 60, 72], [0, 4.9, 8.9], [0.2, 5_000])
+    assert len(quotes["monthly_payment"]) == 2 * 3 * 3 * 2
+
+    for row in as_rows(quotes, list(quotes)):
+        expected = annuity(row["loan_amount"], row["interest_rate"], row["term_months"])
+        assert abs(row["monthly_payment"] - expected) < 0.01
+        assert row["loan_amount"] == row["vehicle_price"] - row["down_payment"]
+    assert quotes["down_payment"][0] == 6_000  # 20% of 30k
+
+
+def test_known_payment_and_financing_quotes_shape():
+    rows = as_rows(quote([25_000], [60], [6.0], [5_000], vehicle_ids=["v1"]))
+    assert rows == [{
+        "vehicle_id": "v1",
+        "vehicle_price": 25_000.0,
+        "down_payment": 5_000.0,
+        "loan_amount": 20_000.0,
+        "term_months": 60,
+        "interest_rate": 6.0,
+        "monthly_payment": 386.66,
+    }]
+
+
+def test_down_payment_never_exceeds_price():
+    quotes = quote([10_000], [36], [5.0], [15_000])
+    assert quotes["loan_amount"][0] == 0
+    assert quotes["monthly_payment"][0] == 0
+    assert quotes["total_cost"][0] == 10_000
+
+
+def test_compare_picks_cheapest_and_lowest_monthly():
+    summary = compare(quote([30_000], [36, 72], [3.9, 7.9], [0], vehicle_ids=["suv"]))
+    assert summary[0]["vehicle_id"] == "suv"
+    assert summary[0]["lowest_total_cost"]["term_months"] == 36
+    assert summary[0]["lowest_total_cost"]["interest_rate"] == 3.9
+    assert summary[0]["lowest_monthly_payment"]["term_months"] == 72
+    assert summary[0]["interest_saved_vs_worst"] > 0
+
+
+def test_rejects_invalid_inputs():
+    with pytest.raises(ValueError):
+        quote([30_000], [0], [5.0])
+    with pytest.raises(ValueError):
+        quote([30_000], [36], [-1.0])
+    assert np.isfinite(quote([1], [1], [0])["monthly_payment"]).all()
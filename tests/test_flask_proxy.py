@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import blaxel_proxy_server  # noqa: E402
+from benchmarks.stub_upstream import serve  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    with serve("benchmarks.stub_upstream:app", {"STUB_CHUNKS": "3", "STUB_LATENCY_MS": "200"}) as url:
+        yield url
+
+
+@pytest.fixture
+def client(upstream, monkeypatch):
+    monkeypatch.setattr(blaxel_proxy_server, "BASE_URL", upstream + "/amo")
+    return blaxel_proxy_server.app.test_client()
+
+
+def test_streams_answers_over_the_pooled_session(client):
+    response = client.post("/api/agent", json={"inputs": "hi"}, buffered=False)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "text/event-stream"
+    assert response.headers["X-Accel-Buffering"] == "no"
+    chunks = list(response.response)
+    assert len(chunks) > 1
+    assert b"".join(chunks).endswith(b"data: [DONE]\n\n")
+    response.close()
+    pool = blaxel_proxy_server.session.get_adapter("http://").poolmanager
+    assert len(pool.pools) == 1  # connections reused, not one per call
+
+
+def test_times_out_with_504(client, monkeypatch):
+    monkeypatch.setattr(blaxel_proxy_server, "TIMEOUT", (5, 0.05))
+    response = client.post("/api/agent", json={"inputs": "hi"})
+    assert response.status_code == 504
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+
+from benchmarks.inventory import QUERIES, full_scan, synthetic
+from src.inventory import Inventory, load
+
+
+def test_matches_a_full_scan():
+    columns = synthetic(5_000, seed=1)
+    engine = Inventory(columns)
+    effective_price = np.where(columns["is_on_sale"], columns["sale_price"], columns["price"])
+    for query in QUERIES:
+        expected = full_scan(columns, effective_price, **query, limit=5_000)
+        result = engine.search(**query, limit=5_000)
+        assert result["total"] == len(expected)
+        assert sorted(v["id"] for v in result["vehicles"]) == sorted(columns["id"][expected])
+
+
+def test_rows_from_the_vehicles_table(tmp_path):
+    rows = [
+        {"id": "a", "make": "Toyota", "model": "RAV4", "year": 2021, "price": "28000.00",
+         "body_type": "SUV", "mileage": 30000},
+        {"id": "b", "make": "toyota", "model": "Camry", "year": 2019, "price": 21000,
+         "sale_price": 19500, "is_on_sale": True, "mileage": None},
+        {"id": "c", "make": "Honda", "model": "CR-V", "year": 2022, "price": 31000,
+         "status": "sold"},
+    ]
+    path = tmp_path / "vehicles.json"
+    path.write_text(json.dumps(rows))
+    inventory = load(str(path))
+
+    result = inventory.search(make="TOYOTA")
+    assert [v["id"] for v in result["vehicles"]] == ["b", "a"]  # by sale price
+    assert result["vehicles"][1]["year"] == 2021
+    assert inventory.search(price_max=20_000)["total"] == 1
+    assert inventory.search(mileage_max=50_000)["total"] == 1
+    assert inventory.search(body_type="suv", status=None)["total"] == 1
+    assert inventory.search(make="Honda")["total"] == 0
+    assert inventory.search(sort="year", descending=True, limit=1)["vehicles"][0]["id"] == "a"
@@ -0,0 +1,107 @@
+import time
+
+from crewai import LLM
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.llm import CachedLLM
+from src.llm_cache import LLMCache, MemoryStore, SqliteStore, bypass, cache_key
+from src.server.middleware import init_middleware
+
+
+def params(content="SUV under $30k", **overrides):
+    return {
+        "model": "gpt-4",
+        "temperature": 0.7,
+        "messages": [{"role": "user", "content": content}],
+        "api_key": "secret",
+        "stream": True,
+        **overrides,
+    }
+
+
+def test_key_covers_model_params_and_messages_only():
+    assert cache_key(params()) == cache_key(params(api_key="other", stream=False))
+    assert cache_key(params()) != cache_key(params("SUV under $40k"))
+    assert cache_key(params()) != cache_key(params(temperature=0))
+    assert cache_key(params()) != cache_key(params(model="gpt-4o"))
+
+
+def test_memory_store_evicts_lru_and_expired():
+    store = MemoryStore(max_entries=2)
+    store.set("a", "1", ttl=60)
+    store.set("b", "2", ttl=60)
+    store.get("a")
+    store.set("c", "3", ttl=60)
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+
+    store.set("d", "4", ttl=0.01)
+    time.sleep(0.02)
+    assert store.get("d") is None
+
+
+def test_disk_hits_survive_restart_and_warm_memory(tmp_path):
+    path = str(tmp_path / "llm.db")
+    LLMCache([MemoryStore(), SqliteStore(path)]).set("k", "answer")
+
+    memory = MemoryStore()
+    cache = LLMCache([memory, SqliteStore(path)])
+    assert cache.get("k") == "answer"
+    assert memory.get("k") == "answer"
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cached_llm_skips_model_on_hit_and_honours_bypass(monkeypatch):
+    calls = []
+    monkeypatch.setattr(LLM, "call", lambda self, messages, *a: calls.append(1) or "fresh")
+    cache = LLMCache([MemoryStore()])
+    llm = CachedLLM(model="gpt-4", cache=cache)
+
+    assert llm.call("hi") == "fresh"
+    assert llm.call("hi") == "fresh"
+    assert len(calls) == 1
+
+    token = bypass.set(True)
+    try:
+        llm.call("hi")
+    finally:
+        bypass.reset(token)
+    assert len(calls) == 2
+    assert cache.stats()["bypassed"] == 1
+
+    # Native tool calls may have side effects; never served from cache
+    llm.call("hi", tools=[{"name": "schedule"}])
+    assert len(calls) == 3
+
+
+def test_bypass_header_reaches_request_context():
+    app = FastAPI()
+    init_middleware(app)
+
+    @app.get("/probe")
+    async def probe():
+        return {"bypass": bypass.get()}
+
+    @app.get("/crew")
+    def crew():
+        # Sync routes run on a worker thread, like crew kickoffs
+        return {"bypass": bypass.get()}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield str(bypass.get())
+
+        return StreamingResponse(body())
+
+    client = TestClient(app)
+    assert client.get("/probe").json() == {"bypass": False}
+    headers = {"X-LLM-Cache": "bypass"}
+    assert client.get("/probe", headers=headers).json() == {"bypass": True}
+    assert client.get("/crew", headers=headers).json() == {"bypass": True}
+    assert client.get("/stream", headers=headers).text == "True"
+    assert client.get("/stream").text == "False"
@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+
+from benchmarks.load import compare, parse_mix, payload, run
+from benchmarks.stub_upstream import StubUpstream
+
+
+def drive(upstream, **kwargs):
+    async def scenario():
+        transport = httpx.ASGITransport(upstream)
+        async with httpx.AsyncClient(transport=transport, base_url="http://target") as client:
+            return await run(client, "/", **kwargs)
+
+    return asyncio.run(scenario())
+
+
+def test_closed_loop_threads_send_every_turn():
+    upstream = StubUpstream(chunks=2)
+    result = drive(upstream, concurrency=4, duration=0.2, mix={"thread": 1}, turns=3)
+    assert result["requests"] == upstream.requests == 3 * result["conversations"]
+    assert result["error_rate"] == 0 and result["status"] == {"200": result["requests"]}
+    assert result["ttfb_ms"]["p50"] <= result["latency_ms"]["p50"]
+    assert result["config"]["mode"] == "closed"
+
+
+def test_open_loop_arrivals_and_errors():
+    upstream = StubUpstream(latency=0.01, error_rate=0.5, seed=1)
+    result = drive(upstream, rate=200, duration=0.5, mix=parse_mix("single=3,thread=1"), turns=2)
+    assert 50 < result["conversations"] < 160
+    assert 0.3 < result["error_rate"] < 0.7
+    assert result["status"]["503"] == result["errors"] == result["shed"]
+    assert result["rate_limited"] == 0
+
+
+def test_copilotkit_paths_get_agent_execution_bodies():
+    body = payload("/copilotkit/agents/execute", "hi", "t1", "vehicle-agent")
+    assert body["name"] == "vehicle-agent" and body["threadId"] == "t1"
+    assert body["messages"][0]["content"] == "hi" and body["messages"][0]["role"] == "user"
+    assert payload("/", "hi", None) == {"inputs": "hi"}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "throughput_rps": 100.0, "error_rate": 0.0,
+        "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 30.0},
+        "ttfb_ms": {"p50": 5.0, "p95": None},
+    }
+    same = {**baseline, "throughput_rps": 95.0, "latency_ms": {"p50": 10.5, "p95": 21.0, "p99": 30.0}}
+    assert compare(same, baseline) == []
+    worse = {**baseline, "throughput_rps": 80.0, "error_rate": 0.05,
+             "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 45.0}}
+    assert compare(worse, baseline) == [
+        "throughput_rps 100.0 -> 80.0", "latency_ms.p99 30.0 -> 45.0", "error_rate 0.0 -> 0.05",
+    ]
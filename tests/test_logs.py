@@ -0,0 +1,129 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import pytest
+from asgi_correlation_id import correlation_id
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.server import error
+from src.server.error import ErrorLog, init_error_handlers
+from src.server.logs import SERVER_LOGGERS, AsyncQueueHandler, setup_logging, state, stop_logging
+
+
+@pytest.fixture
+def restore_logging():
+    loggers = [logging.getLogger()] + [logging.getLogger(name) for name in SERVER_LOGGERS]
+    saved = [(logger, logger.handlers[:], logger.level, logger.propagate) for logger in loggers]
+    yield
+    stop_logging()
+    for logger, handlers, level, propagate in saved:
+        logger.handlers, logger.level, logger.propagate = handlers, level, propagate
+
+
+def test_records_are_written_as_json_by_a_background_thread(restore_logging):
+    stream = io.StringIO()
+    setup_logging(stream, "json", "INFO")
+    writer_threads = []
+    original_emit = state.listener.handlers[0].emit
+
+    def emit(record):
+        writer_threads.append(threading.current_thread())
+        original_emit(record)
+
+    state.listener.handlers[0].emit = emit
+    logger = logging.getLogger("src.test")
+    token = correlation_id.set("req-1")
+    try:
+        logger.info("turn took %dms", 42, extra={"agent": "vehicle_agent"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("crew failed")
+    finally:
+        correlation_id.reset(token)
+    logger.debug("not at this level")
+    stop_logging()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "turn took 42ms"
+    assert first["agent"] == "vehicle_agent"
+    assert first["request_id"] == "req-1"
+    assert first["level"] == "INFO" and first["logger"] == "src.test"
+    assert second["level"] == "ERROR"
+    assert second["exception"].endswith("ValueError: boom")
+    assert threading.current_thread() not in writer_threads
+
+    # With the writer thread gone, records are written directly
+    logger.warning("after shutdown")
+    assert json.loads(stream.getvalue().splitlines()[-1])["message"] == "after shutdown"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = AsyncQueueHandler(queue.Queue(1))
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({"msg": f"line {i}", "levelno": logging.INFO}))
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == "line 0"
+
+
+def test_repeated_errors_are_logged_once_per_window(monkeypatch, caplog):
+    now = [0.0]
+    monkeypatch.setattr(error, "error_log", ErrorLog(window=60, per_minute=60, clock=lambda: now[0]))
+    app = FastAPI()
+    init_error_handlers(app)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        raise HTTPException(status_code=404, detail="no such item")
+
+    @app.get("/crash")
+    async def crash():
+        raise RuntimeError("backend down")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    with caplog.at_level(logging.WARNING, logger="src.server.error"):
+        for item_id in range(5):
+            assert client.get(f"/items/{item_id}").status_code == 404
+        assert client.get("/crash").status_code == 500
+        now[0] = 61
+        client.get("/items/9")
+
+    records = caplog.records
+    assert [r.levelname for r in records] == ["WARNING", "ERROR", "WARNING"]
+    # Client errors carry no traceback; server errors do
+    assert records[0].exc_info is None and records[1].exc_info is not None
+    assert records[2].getMessage().endswith("(repeated 4 times since last logged)")
+    assert error.error_log.stats() == {"logged": 3, "suppressed": 4}
+
+
+def test_repeats_are_counted_once_and_kept_when_the_summary_is_rate_limited(caplog):
+    now = [0.0]
+    error_log = ErrorLog(window=10, per_minute=1, clock=lambda: now[0])
+    request = type("Request", (), {"scope": {}, "method": "GET", "url": type("URL", (), {"path": "/"})})()
+    with caplog.at_level(logging.WARNING, logger="src.server.error"):
+        for now[0] in (0, 1, 2, 3):
+            error_log.log(logging.WARNING, request, ValueError("boom"))
+        # Past the window, but the line limit is spent: suppressed, not lost
+        now[0] = 11
+        error_log.log(logging.WARNING, request, ValueError("boom"))
+        now[0] = 61
+        error_log.log(logging.WARNING, request, ValueError("boom"))
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert len(messages) == 2
+    assert messages[1].endswith("(repeated 4 times since last logged)")
+    assert error_log.stats() == {"logged": 2, "suppressed": 4}
+
+
+def test_error_log_rate_limit_caps_distinct_errors(caplog):
+    error_log = ErrorLog(per_minute=2, clock=lambda: 0.0)
+    request = type("Request", (), {"scope": {}, "method": "GET", "url": type("URL", (), {"path": "/"})})()
+    with caplog.at_level(logging.WARNING, logger="src.server.error"):
+        for i in range(5):
+            error_log.log(logging.WARNING, request, ValueError(f"error {i}"))
+    assert len(caplog.records) == 2
+    assert error_log.stats() == {"logged": 2, "suppressed": 3}
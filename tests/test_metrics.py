@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.server.metrics import AccessLog, Histogram, RequestMetrics, watch_event_loop
+from src.server.middleware import MetricsMiddleware
+
+
+def instrumented_app(metrics, access_log):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics, access_log=access_log)
+    seen_in_flight = []
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield "a"
+            # Still in flight while the body streams
+            seen_in_flight.append(metrics.in_flight[("GET", "/stream")])
+            yield "b"
+
+        return StreamingResponse(body())
+
+    return app, seen_in_flight
+
+
+def test_routes_statuses_and_in_flight_are_recorded():
+    metrics = RequestMetrics()
+    app, seen_in_flight = instrumented_app(metrics, AccessLog(0))
+    client = TestClient(app)
+    for item_id in (1, 2):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/items/x").status_code == 422
+    assert client.get(f"/no/such/{time.time()}").status_code == 404
+    assert client.get("/stream").text == "ab"
+
+    assert seen_in_flight == [1]
+    assert metrics.latency[("GET", "/items/{item_id}")].count == 3
+    assert metrics.responses == {
+        ("GET", "/items/{item_id}", 200): 2,
+        ("GET", "/items/{item_id}", 422): 1,
+        ("GET", "unmatched", 404): 1,
+        ("GET", "/stream", 200): 1,
+    }
+    assert set(metrics.in_flight.values()) == {0}
+
+    text = metrics.render()
+    assert 'http_responses_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/stream"} 1' in text
+    assert 'http_requests_in_flight{method="GET",route="unmatched"} 0' in text
+    assert "# TYPE event_loop_lag_seconds histogram" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert list(histogram.samples("h", 'r="/"')) == [
+        'h_bucket{r="/",le="0.1"} 2',
+        'h_bucket{r="/",le="1"} 3',
+        'h_bucket{r="/",le="+Inf"} 4',
+        'h_sum{r="/"} 3.65',
+        'h_count{r="/"} 4',
+    ]
+
+
+def test_access_log_is_sampled_but_keeps_errors_and_slow_requests(caplog):
+    access_log = AccessLog(per_second=2, slow=1.0)
+    with caplog.at_level(logging.INFO, logger="src.server.metrics"):
+        for _ in range(10):
+            access_log.log("GET", "/", 200, 0.01, "rid")
+        access_log.log("POST", "/", 503, 0.01, "rid")
+        access_log.log("POST", "/", 200, 2.5, "rid")
+    lines = [record.getMessage() for record in caplog.records]
+    assert len(lines) == 4
+    assert lines[2].startswith("POST / 503") and lines[2].endswith("(+8 not logged)")
+    assert caplog.records[2].levelname == "ERROR"
+    assert lines[3].startswith("POST / 200 2500.00ms")
+
+
+def test_event_loop_lag_is_measured():
+    metrics = RequestMetrics()
+
+    async def main():
+        watcher = asyncio.create_task(watch_event_loop(metrics, interval=0.01))
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.02)
+        watcher.cancel()
+
+    asyncio.run(main())
+    assert metrics.loop_lag.count >= 2
+    assert metrics.loop_lag.sum >= 0.05
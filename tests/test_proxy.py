@@ -0,0 +1,341 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+import production_proxy
+from benchmarks.stub_upstream import StubUpstream
+
+PATH = "/proxy/agents/amo/template-copilot-kit-py"
+PROBER = production_proxy.prober
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    """The proxy app wired to an in-process stub upstream."""
+    upstream = StubUpstream()
+
+    async def no_probes(client):
+        pass
+
+    # Keep health probes out of the upstream request counts
+    monkeypatch.setattr(production_proxy, "prober", no_probes)
+    monkeypatch.setattr(
+        production_proxy,
+        "create_client",
+        lambda: httpx.AsyncClient(
+            base_url="http://upstream", transport=httpx.ASGITransport(upstream)
+        ),
+    )
+    return upstream
+
+
+@asynccontextmanager
+async def serving():
+    app = production_proxy.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://proxy") as client:
+            yield client
+
+
+async def call(method, path, **kwargs):
+    async with serving() as client:
+        return await getattr(client, method)(path, **kwargs)
+
+
+async def call_many(requests):
+    async with serving() as client:
+        return await asyncio.gather(*(client.post(PATH, **kwargs) for kwargs in requests))
+
+
+def test_forwards_inputs_and_reports_stats(proxy):
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.status_code == 200
+    assert response.json()["output"] == "ok"
+    assert proxy.requests == 1
+
+
+def test_forwards_the_request_body_byte_for_byte(proxy):
+    body = b'{"inputs":  "SUV under $30k",\n "extra": [1, 2.50]}'
+    asyncio.run(call("post", PATH, content=body))
+    assert proxy.bodies == [body]
+
+
+def test_streams_server_sent_events(proxy):
+    proxy.chunks = 3
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/event-stream"
+    assert response.headers["x-accel-buffering"] == "no"
+    events = [line for line in response.text.split("\n\n") if line]
+    assert events == [*(f'data: {{"chunk": {i}}}' for i in range(3)), "data: [DONE]"]
+    assert production_proxy.upstream_stats["in_flight"] == 0
+
+
+def test_buffered_mode(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "STREAMING", False)
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.json()["output"] == "ok"
+    assert response.headers["content-length"] == str(len(response.content))
+
+
+def test_upstream_errors_keep_their_status(proxy):
+    proxy.error_rate = 1.0
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.status_code == 503
+    assert "injected" in response.json()["detail"]
+    assert production_proxy.upstream_stats["in_flight"] == 0
+
+
+def test_rejects_missing_inputs_without_calling_upstream(proxy):
+    for body in ({"input": "hi"}, ["inputs"]):
+        response = asyncio.run(call("post", PATH, json=body))
+        assert response.status_code == 400
+    assert asyncio.run(call("post", PATH, content=b"{not json")).status_code == 400
+    assert proxy.requests == 0
+
+
+def test_coalesces_identical_requests_in_flight(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "COALESCE", True)
+    proxy.latency = 0.05
+    proxy.chunks = 3
+    coalesced = production_proxy.upstream_stats["coalesced"]
+    responses = asyncio.run(call_many([{"json": {"inputs": "hi"}}] * 5 + [{"json": {"inputs": "yo"}}]))
+    assert proxy.requests == 2
+    assert production_proxy.upstream_stats["coalesced"] - coalesced == 4
+    assert len({r.text for r in responses[:5]}) == 1
+    assert responses[0].text.endswith("data: [DONE]\n\n")
+    assert production_proxy.flights == {}
+    assert production_proxy.upstream_stats["in_flight"] == 0
+
+
+def test_thread_requests_are_not_coalesced(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "COALESCE", True)
+    proxy.latency = 0.05
+    headers = {"X-Blaxel-Thread-Id": "t1"}
+    responses = asyncio.run(call_many([{"json": {"inputs": "hi"}, "headers": headers}] * 3))
+    assert [r.status_code for r in responses] == [200] * 3
+    assert proxy.requests == 3
+
+
+def test_coalesced_requests_share_upstream_errors(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "COALESCE", True)
+    monkeypatch.setattr(production_proxy, "STREAMING", False)
+    monkeypatch.setattr(production_proxy, "MAX_RETRIES", 0)
+    proxy.latency = 0.05
+    proxy.error_rate = 1.0
+    responses = asyncio.run(call_many([{"json": {"inputs": "hi"}}] * 3))
+    assert [r.status_code for r in responses] == [503] * 3
+    assert proxy.requests == 1
+
+
+def test_requests_are_not_coalesced_by_default(proxy):
+    proxy.latency = 0.05
+    asyncio.run(call_many([{"json": {"inputs": "hi"}}] * 3))
+    assert proxy.requests == 3
+
+
+def test_shared_call_waits_for_its_slowest_reader():
+    async def main():
+        flight = production_proxy.Flight(buffer=2)
+        fast, slow = flight.join(), flight.join()
+
+        async def publish():
+            for i in range(5):
+                await flight.publish(i)
+            await flight.publish(production_proxy._END)
+
+        publisher = asyncio.create_task(publish())
+        await asyncio.sleep(0.01)
+        # The slow reader's queue is full, so the call is held back
+        assert slow.qsize() == 2 and not publisher.done()
+        received = asyncio.create_task(collect(flight.read(fast)))
+        await asyncio.sleep(0.01)
+        assert not publisher.done()
+        # A reader that goes away stops holding the call back
+        flight.leave(slow)
+        assert await received == [0, 1, 2, 3, 4]
+        await publisher
+        assert flight.readers == set()
+
+    asyncio.run(main())
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_cancelled_flight_fails_its_joiners_and_is_forgotten(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "COALESCE", True)
+    proxy.latency = 10
+
+    async def main():
+        async with serving() as client:
+            requests = [asyncio.create_task(client.post(PATH, json={"inputs": "hi"})) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            (flight,) = production_proxy.flights.values()
+            flight.task.cancel()
+            return await asyncio.gather(*requests)
+
+    responses = asyncio.run(main())
+    assert [r.status_code for r in responses] == [500] * 2
+    assert production_proxy.flights == {}
+    assert production_proxy.upstream_stats["in_flight"] == 0
+
+
+@pytest.fixture
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(production_proxy, "upstream_health", {
+        "status": "unknown", "blaxel_status": None, "latency_ms": None, "error": None,
+        "checked_at": None, "consecutive_failures": 0,
+    })
+    monkeypatch.setattr(production_proxy, "_checked_at", None)
+
+
+async def wait_for_probe():
+    while production_proxy._checked_at is None:
+        await asyncio.sleep(0.01)
+
+
+def test_health_is_probed_in_the_background(proxy, fresh_health, monkeypatch):
+    monkeypatch.setattr(production_proxy, "prober", PROBER)
+
+    async def scenario():
+        async with serving() as client:
+            not_ready = await client.get("/readyz")
+            await wait_for_probe()
+            return not_ready, await client.get("/health"), await client.get("/readyz")
+
+    not_ready, health, ready = asyncio.run(scenario())
+    assert not_ready.status_code in (200, 503)
+    assert health.json()["status"] == "healthy"
+    assert health.json()["stale"] is False
+    assert ready.status_code == 200
+    # Probed with a bodyless GET, not an agent run
+    assert proxy.requests == 1 and proxy.bodies == [b""]
+    assert asyncio.run(call("get", "/health")).json()["status"] in ("healthy", "stale")
+
+
+def test_unhealthy_and_stale_upstream_fail_readiness(proxy, fresh_health, monkeypatch):
+    proxy.error_rate = 1.0
+    client = httpx.AsyncClient(base_url="http://upstream", transport=httpx.ASGITransport(proxy))
+    assert asyncio.run(production_proxy.probe(client)) is False
+    snapshot = production_proxy.health_snapshot()
+    assert snapshot["status"] == "unhealthy" and snapshot["blaxel_status"] == 503
+    assert snapshot["consecutive_failures"] == 1
+
+    proxy.error_rate = 0.0
+    assert asyncio.run(production_proxy.probe(client)) is True
+    assert production_proxy.health_snapshot()["consecutive_failures"] == 0
+    monkeypatch.setattr(production_proxy, "HEALTH_STALE_AFTER", 0.0)
+    assert production_proxy.health_snapshot()["status"] == "stale"
+    assert asyncio.run(production_proxy.readyz()).status_code == 503
+    assert asyncio.run(production_proxy.livez()) == {"status": "alive"}
+
+
+def test_retries_a_transient_upstream_failure(proxy):
+    proxy.fail_first = 1
+    retries = production_proxy.upstream_stats["retries"]
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.status_code == 200
+    assert proxy.requests == 2
+    assert production_proxy.upstream_stats["retries"] - retries == 1
+
+
+def test_retries_stop_when_the_budget_is_spent(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "RETRY_RESERVE", 0)
+    proxy.fail_first = 1
+    response = asyncio.run(call("post", PATH, json={"inputs": "hi"}))
+    assert response.status_code == 503
+    assert proxy.requests == 1
+
+
+def test_circuit_opens_after_consecutive_failures(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "MAX_RETRIES", 0)
+    monkeypatch.setattr(production_proxy, "BREAKER_FAILURES", 2)
+    proxy.error_rate = 1.0
+
+    async def scenario():
+        async with serving() as client:
+            responses = [await client.post(PATH, json={"inputs": f"q{i}"}) for i in range(4)]
+            return responses, (await client.get("/stats")).json()
+
+    responses, stats = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [503] * 4
+    assert "injected" in responses[1].json()["detail"]
+    assert "circuit open" in responses[3].json()["detail"]
+    assert int(responses[3].headers["retry-after"]) >= 1
+    assert proxy.requests == 2
+    breaker = stats["breakers"]["/amo/agents/template-copilot-kit-py"]
+    assert breaker["state"] == "open" and breaker["refused"] == 2
+
+
+def test_hedges_a_request_slower_than_p95(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "HEDGE", True)
+    monkeypatch.setattr(production_proxy, "HEDGE_MIN_SAMPLES", 5)
+    # Five quick answers set the p95, then one stalls and its hedge is quick
+    latencies = iter([0.001] * 5 + [2.0, 0.001])
+    proxy.latency = lambda: next(latencies)
+    before = dict(production_proxy.upstream_stats)
+
+    async def scenario():
+        async with serving() as client:
+            for i in range(5):
+                await client.post(PATH, json={"inputs": f"warm {i}"})
+            started = time.monotonic()
+            response = await client.post(PATH, json={"inputs": "hi"})
+            return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert elapsed < 1.0
+    assert proxy.requests == 7
+    stats = production_proxy.upstream_stats
+    assert stats["hedged"] - before["hedged"] == 1
+    assert stats["hedge_wins"] - before["hedge_wins"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_sheds_requests_over_the_concurrency_limit(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "ADAPTIVE_CONCURRENCY", True)
+    monkeypatch.setattr(production_proxy, "CONCURRENCY_WAIT", 0)
+    proxy.latency = 0.05
+
+    async def scenario():
+        async with serving() as client:
+            production_proxy.app.state.limiter.limit = 1
+            return await asyncio.gather(
+                *(client.post(PATH, json={"inputs": f"q{i}"}) for i in range(3))
+            )
+
+    responses = asyncio.run(scenario())
+    assert sorted(r.status_code for r in responses) == [200, 503, 503]
+    assert proxy.requests == 1
+
+
+def test_requests_over_the_concurrency_limit_wait_for_a_slot(proxy, monkeypatch):
+    monkeypatch.setattr(production_proxy, "ADAPTIVE_CONCURRENCY", True)
+    proxy.latency = 0.05
+
+    async def scenario():
+        async with serving() as client:
+            limiter = production_proxy.app.state.limiter
+            limiter.limit = limiter.minimum = limiter.maximum = 1
+            return await asyncio.gather(
+                *(client.post(PATH, json={"inputs": f"q{i}"}) for i in range(3))
+            )
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * 3
+    assert proxy.peak_in_flight == 1
+
+
+def test_pool_stats_without_connections():
+    client = production_proxy.create_client()
+    stats = production_proxy.pool_stats(client)
+    assert stats["connections"] == 0
+    assert stats["max_connections"] == production_proxy.POOL_LIMITS.max_connections
+    asyncio.run(client.aclose())
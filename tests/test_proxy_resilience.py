@@ -0,0 +1,115 @@
+import asyncio
+import random
+
+import pytest
+
+from proxy_resilience import AdaptiveLimiter, CircuitBreaker, LatencyWindow, RetryBudget
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_and_recovers_through_a_trial():
+    clock = Clock()
+    breaker = CircuitBreaker(failures=3, reset_timeout=10, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() == 10
+
+    clock.now = 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 2
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    assert breaker.stats()["refused"] == 2
+
+
+def test_retry_budget_is_a_share_of_requests_plus_reserve():
+    budget = RetryBudget(ratio=0.25, reserve=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    for _ in range(4):
+        budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    for _ in range(100):
+        budget.deposit()
+    assert budget.balance == 2
+    assert budget.stats() == {"balance": 2, "spent": 3, "denied": 2}
+
+
+def test_latency_window_percentiles_follow_recent_samples():
+    window = LatencyWindow(size=100)
+    assert window.percentile(95) is None
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+    assert window.percentile(95) == pytest.approx(0.096)
+    for _ in range(100):
+        window.record(1.0)
+    assert len(window) == 100 and window.percentile(50) == 1.0
+
+
+def test_adaptive_limiter_ignores_noise_and_backs_off_on_sustained_slowdown():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=10, minimum=2, maximum=10)
+        for _ in range(10):
+            assert await limiter.acquire()
+        assert not await limiter.acquire() and limiter.refused == 1
+
+        # Ordinary variance around 100ms, with the odd 5x outlier
+        rng = random.Random(0)
+        for i in range(200):
+            limiter.update(0.5 if i % 20 == 0 else rng.uniform(0.05, 0.15))
+        assert limiter.limit == 10
+        # A sustained slowdown cuts the limit, but not below the floor
+        for _ in range(30):
+            limiter.update(1.0)
+        assert 2 <= limiter.limit < 6
+        for _ in range(20):
+            limiter.update(None, failed=True)
+        assert limiter.limit == 2
+        for _ in range(10):
+            limiter.release()
+        assert limiter.in_flight == 0
+
+        # Recovers once latency is back to normal and the limit is in use
+        for _ in range(2):
+            await limiter.acquire()
+        for _ in range(50):
+            limiter.update(0.1)
+        assert limiter.limit > 2
+        return limiter
+
+    asyncio.run(scenario())
+
+
+def test_adaptive_limiter_queues_briefly_before_refusing():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire(timeout=1))
+        await asyncio.sleep(0)
+        assert not await limiter.acquire(timeout=0.01)
+        limiter.release()
+        assert await waiting and limiter.in_flight == 1
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.waited == 2 and limiter.refused == 1
+    assert limiter.stats()["waiting"] == 0
@@ -0,0 +1,76 @@
+import time
+
+from src.semantic_cache import SemanticCache, entities
+
+
+def test_rewordings_hit_and_different_questions_miss():
+    cache = SemanticCache("vehicle_agent")
+    cache.put("cheap reliable sedan", ["sedans", "Corolla"])
+
+    assert cache.get("Find me a reliable budget sedan please") == ["sedans", "Corolla"]
+    assert cache.get("fast sports car") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_numbers_must_match_exactly():
+    cache = SemanticCache("vehicle_agent")
+    cache.put("SUV under $30k", ["30k SUVs"])
+
+    assert cache.get("show me SUVs under $30k") == ["30k SUVs"]
+    assert cache.get("SUV under $40k") is None
+    assert cache.get("SUV under") is None
+
+
+def test_places_makes_and_attributes_must_match_exactly():
+    assert entities("Toyota SUVs under $30k near Denver. Also hybrids?") == (
+        "$30k", "denver", "hybrid", "suv", "toyota"
+    )
+    cache = SemanticCache("vehicle_agent")
+    cache.put("reliable family SUV with good mileage in Denver", ["Denver SUVs"])
+    cache.put("red Toyota sedan", ["red Toyotas"])
+
+    assert cache.get("reliable family SUV with good mileage in denver") == ["Denver SUVs"]
+    assert cache.get("reliable family SUV with good mileage in Boulder") is None
+    assert cache.get("reliable family SUV with great mileage in Denver") is None
+    assert cache.get("red Honda sedan") is None
+    assert cache.get("blue Toyota sedan") is None
+
+
+def test_entries_are_allocated_as_they_are_added():
+    cache = SemanticCache("vehicle_agent", max_entries=40)
+    assert cache._vectors.shape[0] == 0
+    for i in range(20):
+        cache.put(f"question {i}", [i])
+    assert cache._vectors.shape[0] == 32
+    for i in range(20, 50):
+        cache.put(f"question {i}", [i])
+    assert cache._vectors.shape[0] == 40
+    assert cache.get("question 49") == [49] and cache.get("question 0") is None
+    assert cache.stats()["evictions"] == 10
+
+
+def test_least_recently_used_entry_is_replaced_when_full():
+    cache = SemanticCache("vehicle_agent", max_entries=2)
+    cache.put("electric truck", ["a"])
+    cache.put("hybrid minivan", ["b"])
+    time.sleep(0.01)
+    cache.get("electric truck")
+    cache.put("diesel sedan", ["c"])
+
+    assert cache.get("hybrid minivan") is None
+    assert cache.get("electric truck") == ["a"]
+    assert cache.get("diesel sedan") == ["c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_miss_and_free_their_slot():
+    cache = SemanticCache("vehicle_agent", max_entries=1, ttl_seconds=0.01)
+    cache.put("electric truck", ["a"])
+    time.sleep(0.02)
+
+    assert cache.get("electric truck") is None
+    cache.put("hybrid minivan", ["b"])
+    assert cache.stats() == {
+        "entries": 1, "hits": 0, "misses": 1, "evictions": 0, "hit_rate": 0.0
+    }
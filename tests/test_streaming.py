@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import MessagesState
+
+from src.crew import CrewExecutor, CrewPool
+from src.streaming import FinalAnswer, stream_crew
+
+
+class StreamingCrew:
+    """Emits the CrewAI events a streaming two-task crew would."""
+
+    def __init__(self):
+        agent = SimpleNamespace(role="tester")
+        self.tasks = [
+            SimpleNamespace(id=1, name="search", description="", agent=agent, output=None),
+            SimpleNamespace(id=2, name="summarize", description="", agent=agent, output=None),
+        ]
+
+    def kickoff(self, inputs):
+        from crewai.utilities.events import (
+            LLMCallStartedEvent,
+            LLMStreamChunkEvent,
+            TaskCompletedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+
+        for task in self.tasks:
+            # Tasks are the event source, as in CrewAI; construct skips
+            # validation of the stand-in task objects
+            crewai_event_bus.emit(
+                task, TaskStartedEvent.model_construct(task=task, type="task_started")
+            )
+            # A tool step, then the answer with its marker split across chunks
+            calls = [
+                ["Thought: look it up\nAction: search", "\nAction Input: {}"],
+                ["Thought: I now know the final answer\nFinal Ans", "wer: ", f"{task.name} ", "done"],
+            ]
+            for chunks in calls:
+                crewai_event_bus.emit(task, LLMCallStartedEvent.model_construct(type="llm_call_started"))
+                for chunk in chunks:
+                    crewai_event_bus.emit(task, LLMStreamChunkEvent(chunk=chunk))
+            output = SimpleNamespace(raw=f"{task.name} done")
+            crewai_event_bus.emit(
+                task,
+                TaskCompletedEvent.model_construct(
+                    output=output, task=task, type="task_completed"
+                ),
+            )
+        return SimpleNamespace(raw="summarize done")
+
+
+def test_crew_final_answers_stream_as_chat_model_events(monkeypatch):
+    monkeypatch.setattr("src.crew.executor", CrewExecutor(2))
+    crews = CrewPool("streaming-test", StreamingCrew, size=1)
+
+    async def node(state, config):
+        return {"messages": await stream_crew(crews, {}, config, "vehicle_expert")}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("crew", node)
+    graph.set_entry_point("crew")
+    graph.add_edge("crew", END)
+    graph = graph.compile()
+
+    async def main():
+        tokens, custom = [], []
+        async for event in graph.astream_events(
+            {"messages": [HumanMessage(content="hi")]}, version="v2"
+        ):
+            if event["event"] == "on_chat_model_stream":
+                tokens.append(event["data"]["chunk"].content)
+            elif event["event"] == "on_custom_event":
+                custom.append(event["name"])
+            elif event["event"] == "on_chain_end" and event["name"] == "LangGraph":
+                output = event["data"]["output"]
+        return tokens, custom, output
+
+    tokens, custom, output = asyncio.run(main())
+    assert tokens == ["search ", "done", "summarize ", "done"]
+    assert custom == ["crew_task_started", "crew_task_completed"] * 2
+    assert [m.content for m in output["messages"][1:]] == ["search done", "summarize done"]
+    assert crews.stats()["idle"] == 1
+
+
+def test_final_answer_skips_react_steps():
+    answer = FinalAnswer()
+    assert answer.feed("Thought: check\nAction: search\nAction Input: {}") == ""
+    answer.reset()
+    assert [answer.feed(c) for c in ["Thought: done\nFinal Answer:", " ", " Two", " cars"]] == [
+        "", "", "Two", " cars",
+    ]
@@ -0,0 +1,58 @@
+from src.text_index import TextIndex, build
+
+ROWS = [
+    {"id": "highlander", "year": 2021, "make": "Toyota", "model": "Highlander", "price": 38000,
+     "description": "Family SUV with third row seating.",
+     "features": ["Heated Seats", "Third Row", "Towing Package"]},
+    {"id": "civic", "year": 2020, "make": "Honda", "model": "Civic", "price": 18000,
+     "description": "Compact sedan with heated mirrors.", "features": '["Bluetooth"]'},
+    {"id": "f150", "year": 2019, "make": "Ford", "model": "F-150", "price": 31000,
+     "description": "Work truck, towing package.",
+     "dealer_notes": "One owner. New row of tires."},
+    {"id": "sold", "description": "Third row, heated seats", "status": "sold"},
+]
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+def test_ranks_phrases_and_skips_unavailable_listings():
+    index = build(ROWS)
+    results = index.search("heated seats, third row, towing package")
+    assert ids(results) == ["highlander", "f150", "civic"]
+    assert results[0]["title"] == "2021 Toyota Highlander ($38,000)"
+    assert index.search("sunroof") == []
+
+
+def test_incremental_add_replace_and_remove():
+    index = build(ROWS)
+    index.remove("highlander")
+    assert ids(index.search("third row")) == ["f150"]
+
+    index.add("pilot", {"description": "Third row SUV"})
+    index.add("f150", {"description": "Work truck"})
+    assert ids(index.search("third row")) == ["pilot"]
+    assert len(index) == 3
+
+    index.compact()
+    assert ids(index.search("third row")) == ["pilot"]
+    assert ids(index.search("truck")) == ["f150"]
+
+
+def test_saved_index_memory_maps_and_keeps_scores(tmp_path):
+    index = build(ROWS)
+    index.add("pilot", {"description": "Third row SUV, heated seats"})
+    index.remove("civic")
+    expected = index.search("heated seats third row")
+
+    index.save(str(tmp_path / "index"))
+    opened = TextIndex.open(str(tmp_path / "index"))
+    assert opened.search("heated seats third row") == expected
+    assert type(opened._docs).__name__ == "memmap"
+
+    # Still incremental after a restart
+    opened.add("civic", {"description": "heated seats"})
+    assert "civic" in ids(opened.search("heated seats"))
+    opened.save(str(tmp_path / "index"))
+    assert "civic" in ids(TextIndex.open(str(tmp_path / "index")).search("heated seats"))
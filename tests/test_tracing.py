@@ -0,0 +1,132 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import MessagesState
+from langgraph_supervisor import create_supervisor
+
+from src import tracing
+from src.crew import CrewExecutor, CrewPool
+from src.fake_llm import DEFAULT_SCRIPT, FakeChatModel, Script
+from src.streaming import stream_crew
+
+
+class TracedCrew:
+    """Emits the task and LLM call events of a two-task crew."""
+
+    def __init__(self):
+        self.agent = SimpleNamespace(role="tester", _token_process=SimpleNamespace(
+            prompt_tokens=0, completion_tokens=0, cached_prompt_tokens=0
+        ))
+        self.tasks = [
+            SimpleNamespace(id=1, name="search", description="", agent=self.agent, output=None),
+            SimpleNamespace(id=2, name="pricing", description="", agent=self.agent, output=None),
+        ]
+
+    def kickoff(self, inputs):
+        from crewai.utilities.events import (
+            LLMCallCompletedEvent,
+            LLMCallStartedEvent,
+            LLMCallType,
+            TaskCompletedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+
+        llm = SimpleNamespace(model="test-model")
+        for task in self.tasks:
+            crewai_event_bus.emit(task, TaskStartedEvent.model_construct(task=task, type="task_started"))
+            crewai_event_bus.emit(llm, LLMCallStartedEvent(messages="hi"))
+            self.agent._token_process.prompt_tokens += 100
+            self.agent._token_process.completion_tokens += 20
+            crewai_event_bus.emit(llm, LLMCallCompletedEvent(response="ok", call_type=LLMCallType.LLM_CALL))
+            output = SimpleNamespace(raw=f"{task.name} done")
+            crewai_event_bus.emit(
+                task, TaskCompletedEvent.model_construct(output=output, task=task, type="task_completed")
+            )
+        return SimpleNamespace(raw="pricing done")
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    monkeypatch.setattr(tracing, "EXPORTERS", {"memory"})
+    tracing.install()
+    tracing.buffer().clear()
+    monkeypatch.setattr("src.crew.executor", CrewExecutor(2))
+    return tracing.buffer()
+
+
+def crew_graph(name, crews):
+    async def node(state, config):
+        return {"messages": await stream_crew(crews, {}, config, name)}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node(name, node)
+    graph.set_entry_point(name)
+    graph.add_edge(name, END)
+    return graph.compile(name=name)
+
+
+def tree(buffer):
+    """Span names, each with the name of its parent span."""
+    spans = buffer.spans()
+    names = {span.context.span_id: span.name for span in spans}
+    return {span.name: names.get(span.parent.span_id) if span.parent else None for span in spans}, spans
+
+
+def test_supervisor_turn_traces_nodes_handoffs_crews_and_llm_calls(spans):
+    crews = CrewPool("tracing-test", TracedCrew, size=1)
+    model = FakeChatModel(script=Script(**DEFAULT_SCRIPT))
+    graph = create_supervisor(
+        [crew_graph("vehicle_agent", crews)], model=model, supervisor_name="supervisor"
+    ).compile()
+
+    asyncio.run(graph.ainvoke({"messages": [HumanMessage("Find me an SUV")]}))
+
+    parents, finished = tree(spans)
+    assert parents["handoff vehicle_agent"] == "node tools"
+    assert parents["node tools"] == "node supervisor"
+    assert parents["llm FakeChatModel"] == "node agent"
+    assert parents["crew vehicle_agent"] == "node vehicle_agent"
+    assert parents["task search"] == parents["task pricing"] == "crew vehicle_agent"
+    assert parents["llm test-model"] in ("task search", "task pricing")
+    assert len({span.context.trace_id for span in finished}) == 1
+
+    summary = tracing.summarize(finished)
+    assert summary["task search"]["input_tokens"] == 100
+    assert summary["task pricing"]["output_tokens"] == 20
+    assert summary["llm test-model"]["count"] == 2
+    assert summary["llm FakeChatModel"]["input_tokens"] > 0
+    assert summary["node supervisor"]["errors"] == 0
+
+
+def test_failed_node_and_cache_hits_are_recorded(spans):
+    async def failing(state, config):
+        tracing.cache_hit("semantic", "vehicle_agent", config)
+        raise ValueError("boom")
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("search", failing)
+    graph.set_entry_point("search")
+    graph.add_edge("search", END)
+
+    with pytest.raises(ValueError):
+        asyncio.run(graph.compile().ainvoke({"messages": [HumanMessage("hi")]}))
+    tracing.cache_hit("llm", "gpt-4")
+
+    parents, finished = tree(spans)
+    assert parents["crew vehicle_agent"] == "node search"
+    summary = tracing.summarize(finished)
+    assert summary["node search"]["errors"] == 1
+    assert summary["crew vehicle_agent"]["cache_hits"] == summary["llm gpt-4"]["cache_hits"] == 1
+    assert tracing.span_dict(finished[-1])["attributes"]["cache.kind"] == "llm"
+
+
+def test_ring_buffer_keeps_the_newest_spans():
+    buffer = tracing.RingBufferExporter(size=2)
+    buffer.export(["a", "b"])
+    buffer.export(["c"])
+    assert buffer.spans() == ["b", "c"]
+    assert buffer.spans(limit=1) == ["c"]